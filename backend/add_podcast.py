@@ -2,10 +2,16 @@
 """
 Command line script to add a new podcast to the database
 Usage: python add_podcast.py
+       python add_podcast.py list
+       python add_podcast.py import catalog.opml   (or a .csv with an rss_url column)
 """
 
+import asyncio
+import time
 from app.database import SessionLocal
 from app.models import Podcast
+from app.services.feed_fetcher import FeedFetcher
+from app.services.podcast_import import IMPORT_CREATED, IMPORT_FAILED, CatalogError, import_catalog, parse_catalog
 from app.services.rss_parser import RSSParser
 
 
@@ -109,10 +115,55 @@ def list_podcasts():
         db.close()
 
 
+def import_podcasts(path: str):
+    """Add every feed of an OPML or CSV catalog, without prompting"""
+    try:
+        with open(path, 'rb') as catalog:
+            feeds = parse_catalog(catalog.read(), path)
+    except (OSError, CatalogError, UnicodeDecodeError) as e:
+        print(f"❌ Could not read catalog: {str(e)}")
+        return
+    
+    print(f"📥 Importing {len(feeds)} feeds from {path}...")
+    
+    async def run():
+        fetcher = FeedFetcher(cache_ttl=0)
+        try:
+            return await import_catalog(db, feeds, fetcher)
+        finally:
+            await fetcher.aclose()
+    
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(run())
+        
+        for result in results:
+            if result['status'] == IMPORT_CREATED:
+                print(f"✅ {result['name']} (ID: {result['podcast_id']})")
+            elif result['status'] == IMPORT_FAILED:
+                print(f"❌ {result['rss_url']}: {result['error']}")
+            else:
+                print(f"⏭️  {result['rss_url']} already exists")
+        
+        created = sum(1 for result in results if result['status'] == IMPORT_CREATED)
+        failed = sum(1 for result in results if result['status'] == IMPORT_FAILED)
+        print(f"\n📊 {created} added, {len(results) - created - failed} skipped, "
+              f"{failed} failed in {time.perf_counter() - started:.1f}s")
+    
+    except Exception as e:
+        print(f"❌ Error importing podcasts: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1 and sys.argv[1] == "list":
         list_podcasts()
+    elif len(sys.argv) > 2 and sys.argv[1] == "import":
+        import_podcasts(sys.argv[2])
     else:
         add_podcast_interactive()
\ No newline at end of file
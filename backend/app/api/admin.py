@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import json
+from ..config import settings
 from ..database import get_db
-from ..models import Podcast
-from ..services.rss_parser import RSSParser
+from ..models import NewsletterDraft, Podcast
+from ..queries import near_duplicates_query, transcription_savings_query, transcription_savings_totals_query
+from ..services.blob_store import get_blob_store
+from ..services.feed_fetcher import FeedError, feed_fetcher
+from ..services.podcast_import import IMPORT_CREATED, IMPORT_FAILED, CatalogError, import_catalog, parse_catalog
+from .pagination import Page, encode_cursor, decode_cursor
+from .podcasts import invalidate_podcast_listing
 from pydantic import BaseModel, HttpUrl
-import feedparser
 
 router = APIRouter()
 
@@ -29,6 +39,48 @@ class PodcastUpdate(BaseModel):
     is_active: bool | None = None
 
 
+class BulkImportResult(BaseModel):
+    rss_url: str
+    status: str  # created, exists or failed
+    podcast_id: int | None = None
+    name: str | None = None
+    error: str | None = None
+
+
+class BulkImportResponse(BaseModel):
+    created: int
+    skipped: int
+    failed: int
+    results: List[BulkImportResult]
+
+
+class NearDuplicateResponse(BaseModel):
+    score: float
+    episode_id: int
+    episode_title: str | None
+    podcast_name: str
+    duplicate_episode_id: int
+    duplicate_title: str | None
+    duplicate_podcast_name: str
+
+
+class EpisodeSavings(BaseModel):
+    processing_id: int
+    episode_id: int | None
+    title: str | None
+    podcast_name: str
+    audio_minutes: float
+    minutes_saved: float
+    skipped: List[Tuple[float, float]]  # seconds into the original audio
+
+
+class TranscriptionSavingsResponse(BaseModel):
+    episodes: int
+    audio_minutes: float
+    minutes_saved: float
+    items: List[EpisodeSavings]
+
+
 class PodcastResponse(BaseModel):
     id: int
     name: str
@@ -42,7 +94,7 @@ class PodcastResponse(BaseModel):
 
 
 @router.post("/podcasts", response_model=PodcastResponse)
-async def create_podcast(podcast: PodcastCreate, db: Session = Depends(get_db)):
+def create_podcast(podcast: PodcastCreate, db: Session = Depends(get_db)):
     """Add a new podcast to the system"""
     # Check if RSS URL already exists
     existing = db.query(Podcast).filter(Podcast.rss_url == str(podcast.rss_url)).first()
@@ -59,70 +111,108 @@ async def create_podcast(podcast: PodcastCreate, db: Session = Depends(get_db)):
     db.add(db_podcast)
     db.commit()
     db.refresh(db_podcast)
+    invalidate_podcast_listing()
+    
+    return db_podcast
+
+
+def save_podcast_from_feed(db: Session, rss_url: str, metadata: Dict) -> Podcast:
+    existing = db.query(Podcast).filter(Podcast.rss_url == rss_url).first()
+    if existing:
+        raise HTTPException(status_code=400, detail="Podcast with this RSS URL already exists")
+    
+    db_podcast = Podcast(
+        name=metadata['title'] or 'Unknown Podcast',
+        description=metadata['description'],
+        rss_url=rss_url,
+        cover_image_url=metadata['cover_image_url'],
+        is_active=True
+    )
+    
+    db.add(db_podcast)
+    db.commit()
+    db.refresh(db_podcast)
+    invalidate_podcast_listing()
     
     return db_podcast
 
 
 @router.post("/podcasts/from-rss", response_model=PodcastResponse)
 async def create_podcast_from_rss(podcast: PodcastCreateFromRSS, db: Session = Depends(get_db)):
-    """Add a new podcast by automatically parsing RSS feed information"""
+    """Add a new podcast by automatically parsing RSS feed information
+    
+    The feed is fetched asynchronously with a timeout and only its channel
+    header is parsed; the database work runs in the threadpool.
+    """
     rss_url = str(podcast.rss_url)
     
-    # Check if RSS URL already exists
-    existing = db.query(Podcast).filter(Podcast.rss_url == rss_url).first()
+    # Fail fast on duplicates before fetching anything
+    existing = await run_in_threadpool(
+        lambda: db.query(Podcast.id).filter(Podcast.rss_url == rss_url).first()
+    )
     if existing:
         raise HTTPException(status_code=400, detail="Podcast with this RSS URL already exists")
     
     try:
-        # Parse RSS feed to get podcast information
-        feed = feedparser.parse(rss_url)
-        
-        if not feed.feed:
-            raise HTTPException(status_code=400, detail="Invalid RSS feed or feed not accessible")
-        
-        # Extract podcast information from RSS feed
-        podcast_name = feed.feed.get('title', 'Unknown Podcast')
-        podcast_description = feed.feed.get('description', feed.feed.get('subtitle', ''))
-        
-        # Try to get cover image from various possible fields
-        cover_image_url = None
-        if hasattr(feed.feed, 'image') and feed.feed.image:
-            cover_image_url = feed.feed.image.get('href')
-        elif hasattr(feed.feed, 'logo'):
-            cover_image_url = feed.feed.logo
-        elif hasattr(feed.feed, 'itunes_image') and feed.feed.itunes_image:
-            cover_image_url = feed.feed.itunes_image.get('href')
-        
-        # Create new podcast with extracted information
-        db_podcast = Podcast(
-            name=podcast_name,
-            description=podcast_description,
-            rss_url=rss_url,
-            cover_image_url=cover_image_url,
-            is_active=True
-        )
-        
-        db.add(db_podcast)
-        db.commit()
-        db.refresh(db_podcast)
-        
-        return db_podcast
-        
-    except Exception as e:
-        if "RSS URL already exists" in str(e):
-            raise e
+        metadata = await feed_fetcher.fetch_channel(rss_url)
+    except FeedError as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse RSS feed: {str(e)}")
+    
+    return await run_in_threadpool(save_podcast_from_feed, db, rss_url, metadata)
+
 
+@router.post("/podcasts/bulk", response_model=BulkImportResponse)
+async def bulk_import_podcasts(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Import an OPML or CSV catalog of feeds
 
-@router.get("/podcasts", response_model=List[PodcastResponse])
-async def list_all_podcasts(db: Session = Depends(get_db)):
-    """Get all podcasts (including inactive ones)"""
-    podcasts = db.query(Podcast).all()
-    return podcasts
+    Every new feed is validated concurrently, then all valid ones are added
+    in one transaction. RSS URLs that already exist are skipped.
+    """
+    content = await file.read()
+    try:
+        feeds = parse_catalog(content, file.filename)
+    except (CatalogError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read catalog: {str(e)}")
+    if not feeds:
+        raise HTTPException(status_code=400, detail="No feeds found in catalog")
+    
+    results = await import_catalog(db, feeds, feed_fetcher)
+    created = sum(1 for result in results if result["status"] == IMPORT_CREATED)
+    failed = sum(1 for result in results if result["status"] == IMPORT_FAILED)
+    if created:
+        invalidate_podcast_listing()
+    
+    return BulkImportResponse(
+        created=created,
+        skipped=len(results) - created - failed,
+        failed=failed,
+        results=results,
+    )
+
+
+@router.get("/podcasts", response_model=Page[PodcastResponse])
+def list_all_podcasts(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get all podcasts (including inactive ones), keyset-paginated by id"""
+    query = db.query(Podcast)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Podcast.id > last_id)
+    
+    podcasts = query.order_by(Podcast.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(podcasts) > limit:
+        podcasts = podcasts[:limit]
+        next_cursor = encode_cursor(podcasts[-1].id)
+    
+    return {"items": podcasts, "next_cursor": next_cursor}
 
 
 @router.put("/podcasts/{podcast_id}", response_model=PodcastResponse)
-async def update_podcast(podcast_id: int, podcast: PodcastUpdate, db: Session = Depends(get_db)):
+def update_podcast(podcast_id: int, podcast: PodcastUpdate, db: Session = Depends(get_db)):
     """Update an existing podcast"""
     db_podcast = db.query(Podcast).filter(Podcast.id == podcast_id).first()
     if not db_podcast:
@@ -142,12 +232,13 @@ async def update_podcast(podcast_id: int, podcast: PodcastUpdate, db: Session =
     
     db.commit()
     db.refresh(db_podcast)
+    invalidate_podcast_listing()
     
     return db_podcast
 
 
 @router.delete("/podcasts/{podcast_id}")
-async def delete_podcast(podcast_id: int, db: Session = Depends(get_db)):
+def delete_podcast(podcast_id: int, db: Session = Depends(get_db)):
     """Delete a podcast (or mark as inactive)"""
     db_podcast = db.query(Podcast).filter(Podcast.id == podcast_id).first()
     if not db_podcast:
@@ -156,5 +247,68 @@ async def delete_podcast(podcast_id: int, db: Session = Depends(get_db)):
     # Mark as inactive instead of deleting
     db_podcast.is_active = False
     db.commit()
+    invalidate_podcast_listing()
     
-    return {"message": "Podcast deactivated successfully"}
\ No newline at end of file
+    return {"message": "Podcast deactivated successfully"}
+
+
+@router.get("/near-duplicates", response_model=List[NearDuplicateResponse])
+def list_near_duplicates(
+    limit: int = Query(100, ge=1, le=1000),
+    min_score: float = Query(None, ge=0, le=1),
+    db: Session = Depends(get_db),
+):
+    """Episodes cross-posted between shows: pairs from different podcasts
+    whose transcripts and summaries are nearly identical"""
+    if min_score is None:
+        min_score = settings.related_duplicate_score
+    rows = db.execute(near_duplicates_query(min_score, limit)).all()
+    return [row._asdict() for row in rows]
+
+
+@router.get("/transcription-savings", response_model=TranscriptionSavingsResponse)
+def transcription_savings(
+    days: int = Query(7, ge=1, le=365),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Audio minutes that recurring-segment skipping kept from Whisper, per
+    episode and in total"""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    episodes, audio_seconds, skipped_seconds = db.execute(transcription_savings_totals_query(since)).one()
+    rows = db.execute(transcription_savings_query(since, limit)).all()
+    return {
+        "episodes": episodes,
+        "audio_minutes": round(audio_seconds / 60, 1),
+        "minutes_saved": round(skipped_seconds / 60, 1),
+        "items": [
+            {
+                "processing_id": row.processing_id,
+                "episode_id": row.episode_id,
+                "title": row.title,
+                "podcast_name": row.podcast_name,
+                "audio_minutes": round(row.audio_seconds / 60, 1),
+                "minutes_saved": round((row.skipped_seconds or 0) / 60, 1),
+                "skipped": json.loads(row.skipped_spans or "[]"),
+            }
+            for row in rows
+        ],
+    }
+
+
+@router.get("/newsletter/draft", response_class=HTMLResponse)
+def newsletter_draft(db: Session = Depends(get_db)):
+    """The next issue as it stands (or the last published one, before the
+    next draft has started), rendered exactly as it will be sent"""
+    draft = db.scalars(
+        select(NewsletterDraft)
+        .where(NewsletterDraft.content_key.isnot(None))
+        .order_by(NewsletterDraft.published_at.isnot(None), NewsletterDraft.id.desc())
+        .limit(1)
+    ).first()
+    if not draft:
+        raise HTTPException(status_code=404, detail="No newsletter draft yet")
+    return HTMLResponse(
+        get_blob_store().get_text(draft.content_key),
+        headers={"X-Draft-Episodes": str(draft.episode_count), "X-Draft-Updated": str(draft.updated_at or "")},
+    )
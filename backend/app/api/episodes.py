@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..config import settings
+from ..database import get_db
+from ..models import Episode, SummaryTranslation
+from ..queries import episode_page_query, related_episodes_query
+from ..services.blob_store import get_blob_store
+from .pagination import Page, encode_cursor, decode_cursor
+from pydantic import BaseModel
+
+router = APIRouter()
+
+
+class EpisodeResponse(BaseModel):
+    id: int
+    podcast_id: int
+    podcast_name: str
+    title: str | None
+    audio_url: str | None
+    publish_date: datetime
+    summary_mandarin: str | None
+
+
+class RelatedEpisodeResponse(BaseModel):
+    id: int
+    podcast_id: int
+    podcast_name: str
+    title: str | None
+    audio_url: str | None
+    publish_date: datetime | None
+    score: float
+    near_duplicate: bool  # most likely the same episode cross-posted
+
+
+@router.get("/episodes", response_model=Page[EpisodeResponse])
+def list_episodes(
+    podcast_id: Optional[int] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Processed episodes of active podcasts, newest first
+
+    Pages are keyset-paginated on (publish_date, id), so any page costs the
+    same index range scan as the first one.
+    """
+    after = decode_cursor(cursor, datetime, int) if cursor else None
+    
+    # Fetch one extra row to learn whether another page exists
+    rows = db.execute(episode_page_query(
+        limit + 1,
+        podcast_id=podcast_id,
+        published_after=published_after,
+        published_before=published_before,
+        after=after,
+    )).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].publish_date, rows[-1].id)
+    
+    summaries = get_blob_store().get_texts(row.summary_key for row in rows)
+    return Page[EpisodeResponse](
+        items=[
+            EpisodeResponse(
+                id=row.id,
+                podcast_id=row.podcast_id,
+                podcast_name=row.podcast_name,
+                title=row.title,
+                audio_url=row.audio_url,
+                publish_date=row.publish_date,
+                summary_mandarin=summaries.get(row.summary_key),
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/episodes/{episode_id}/related", response_model=List[RelatedEpisodeResponse])
+def related_episodes(
+    episode_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """Episodes with the most similar transcripts and summaries
+
+    Neighbours are precomputed by the related-episodes index job, so this is
+    a single primary-key range read.
+    """
+    rows = db.execute(related_episodes_query(episode_id, limit)).all()
+    if not rows and db.get(Episode, episode_id) is None:
+        raise HTTPException(status_code=404, detail="Episode not found")
+    
+    return [
+        RelatedEpisodeResponse(
+            **row._asdict(),
+            near_duplicate=row.score >= settings.related_duplicate_score,
+        )
+        for row in rows
+    ]
+
+
+@router.get("/episodes/{episode_id}/summaries", response_model=Dict[str, str])
+def episode_summaries(
+    episode_id: int,
+    db: Session = Depends(get_db),
+):
+    """The episode's summary in every language it has been translated into,
+    keyed by language code ("en" is the source of the translations)
+
+    Episodes summarized before English summaries were kept have their other
+    languages translated from the Mandarin one.
+    """
+    episode = db.get(Episode, episode_id)
+    if episode is None:
+        raise HTTPException(status_code=404, detail="Episode not found")
+    
+    keys = {"zh": episode.summary_key}
+    if episode.english_summary_key:
+        keys["en"] = episode.english_summary_key
+    source_key = episode.english_summary_key or episode.summary_key
+    for language, summary_key in db.execute(
+        select(SummaryTranslation.language, SummaryTranslation.summary_key)
+        .where(SummaryTranslation.source_key == source_key)
+    ):
+        keys.setdefault(language, summary_key)
+    
+    texts = get_blob_store().get_texts(keys.values())
+    return {language: texts[key] for language, key in keys.items() if key in texts}
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from ..config import settings
 from ..database import get_db
 from ..models import Podcast
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+import hashlib
+import threading
+import time
 
 router = APIRouter()
 
@@ -18,8 +22,85 @@ class PodcastResponse(BaseModel):
         from_attributes = True
 
 
+class PodcastListingCache:
+    """Pre-serialized body and ETag of the public podcast listing
+
+    The cache is per process. Admin writes invalidate it in the process
+    that handled them, and the TTL bounds how stale the other API
+    processes can get. Each invalidation starts a new generation, and a
+    body read from the database before it is never stored after it.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self._expires_at = 0.0
+        self._generation = 0
+    
+    @property
+    def generation(self) -> int:
+        """Capture before querying; pass to set() with the result"""
+        with self._lock:
+            return self._generation
+    
+    def get(self):
+        with self._lock:
+            if self._body is not None and time.monotonic() < self._expires_at:
+                return self._body, self._etag
+            return None
+    
+    def set(self, body: bytes, generation: int) -> str:
+        etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while the body was being built; it may be stale
+                return etag
+            self._body = body
+            self._etag = etag
+            self._expires_at = time.monotonic() + self.ttl
+        return etag
+    
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._body = None
+            self._etag = None
+
+
+podcast_listing_cache = PodcastListingCache(ttl=settings.podcast_listing_cache_ttl)
+podcast_list_adapter = TypeAdapter(List[PodcastResponse])
+
+
+def invalidate_podcast_listing():
+    """Drop the cached public listing; call after any podcast write"""
+    podcast_listing_cache.invalidate()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
 @router.get("/podcasts", response_model=List[PodcastResponse])
-async def get_podcasts(db: Session = Depends(get_db)):
+def get_podcasts(request: Request, db: Session = Depends(get_db)):
     """Get all active podcasts for display on the website"""
-    podcasts = db.query(Podcast).filter(Podcast.is_active == True).all()
-    return podcasts
\ No newline at end of file
+    cached = podcast_listing_cache.get()
+    if cached:
+        body, etag = cached
+    else:
+        generation = podcast_listing_cache.generation
+        podcasts = db.query(Podcast).filter(Podcast.is_active == True).all()
+        body = podcast_list_adapter.dump_json(podcast_list_adapter.validate_python(podcasts))
+        etag = podcast_listing_cache.set(body, generation)
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,13 +5,39 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./test.db"
+    # Connection pool (per process: each API worker and Celery worker has its own)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds; below server/proxy idle timeouts
+    db_pool_pre_ping: bool = True
+    # SQLite only: how long a writer waits on a locked database before failing
+    sqlite_busy_timeout_ms: int = 5000
     
-    # OpenAI
-    openai_api_key: str
+    # OpenAI: only the transcribe and summarize workers need it
+    openai_api_key: Optional[str] = None
+    openai_base_url: str = "https://api.openai.com/v1"  # or a compatible proxy / local stand-in
+    # Backfills summarize through the Batch API: one job per batch of episodes
+    # at half the price, with results within 24 hours
+    summary_batch_size: int = 500  # requests per job (the API takes up to 50,000)
+    summary_batch_max_wait_minutes: int = 30  # submit a smaller job once the oldest waited this long
+    summary_batch_poll_seconds: int = 300
+    # Episodes are summarized once in English, then translated into each of
+    # these (comma-separated language codes; Mandarin, "zh", is always on)
+    summary_languages: str = "zh"
+    translation_concurrency: int = 8  # translation requests in flight per task
     
     # Beehiiv
     beehiiv_api_key: Optional[str] = None
     beehiiv_publication_id: Optional[str] = None
+    beehiiv_max_connections: int = 20
+    beehiiv_max_retries: int = 3
+    
+    # Subscription outbox: signups are queued locally and flushed to Beehiiv
+    subscription_flush_batch_size: int = 100
+    subscription_flush_rate: float = 5.0  # Beehiiv requests started per second
+    subscription_flush_concurrency: int = 4
+    subscription_max_attempts: int = 8
     
     # Redis
     redis_url: str = "redis://localhost:6379"
@@ -20,11 +46,71 @@ class Settings(BaseSettings):
     app_name: str = "Podcast Digest"
     debug: bool = False
     frontend_url: str = "http://localhost:3000"
+    podcast_listing_cache_ttl: int = 300  # seconds
+    # Feed import: per-request timeout, and how long fetched channel metadata
+    # is reused before it is revalidated with a conditional GET
+    feed_fetch_timeout: float = 10.0
+    feed_metadata_cache_ttl: int = 300
+    feed_import_concurrency: int = 20  # feeds fetched at once by bulk imports
+    # Worker threads for the sync (database) route handlers; requests beyond
+    # the DB connection pool just wait for a connection, so keep them close
+    api_threadpool_size: int = 40
     
     # Celery
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
     
+    # Feed polling: each feed is polled shortly after its next expected
+    # release (learned from its history), backing off while it is overdue
+    feed_poll_default_minutes: int = 60  # feeds with too little history
+    feed_poll_min_minutes: int = 15
+    feed_poll_max_hours: int = 24
+    feed_release_grace_minutes: int = 5
+    feed_poll_batch_size: int = 500  # polls dispatched per scheduler tick
+    feed_refresh_batch_size: int = 250  # feeds per refresh_feeds task
+    feed_refresh_concurrency: int = 200  # requests in flight per refresh
+    feed_refresh_per_host: int = 8  # many shows share a hosting platform
+    feed_parse_processes: int = 2  # 0 parses in threads instead
+    
+    # Related episodes: TF-IDF over transcripts and summaries, built locally
+    related_index_path: str = "./media/related_index.npz"
+    related_top_k: int = 10  # neighbours stored per episode
+    related_min_score: float = 0.1
+    related_duplicate_score: float = 0.9  # cross-posted episodes score close to 1
+    related_max_terms: int = 400  # distinct terms kept per episode
+    related_index_batch_size: int = 500
+    newsletter_related_per_episode: int = 2
+    # Seconds between refreshes of the next issue's draft (also refreshed after each podcast run)
+    newsletter_draft_refresh_seconds: int = 300
+    
+    # Episode pipeline
+    media_dir: str = "./media"  # must be shared by download and transcribe workers
+    # Transcripts and summaries, stored once per distinct content: "local"
+    # (a directory every API and worker process shares) or "s3"
+    blob_store_backend: str = "local"
+    blob_store_dir: str = "./media/blobs"
+    blob_store_s3_bucket: Optional[str] = None
+    blob_store_s3_prefix: str = "blobs/"
+    blob_store_s3_endpoint_url: Optional[str] = None  # for MinIO, R2 and other S3-compatibles
+    blob_cache_mb: int = 32  # per process; blobs never change, so it never goes stale
+    # Transcription engine: "openai" (hosted Whisper) or "local" (faster-whisper
+    # on the worker's own CPU, no API limits; pip install faster-whisper)
+    transcription_engine: str = "openai"
+    local_whisper_model: str = "small.en"
+    local_whisper_compute_type: str = "int8"
+    local_whisper_threads: int = 0  # 0 uses every core
+    local_whisper_beam_size: int = 5
+    transcribe_rate_limit: Optional[str] = "20/m"
+    summarize_rate_limit: Optional[str] = "60/m"
+    # Recurring ad reads and intros, found by fingerprinting the audio against
+    # the podcast's recent episodes, are cut before transcription (needs ffmpeg)
+    skip_recurring_audio: bool = True
+    recurring_history_episodes: int = 6
+    recurring_min_seconds: float = 8.0  # shorter matches are jingles or chance
+    recurring_max_fraction: float = 0.5  # more than this matching means a rerun
+    # Port each Celery worker serves Prometheus metrics on (off when unset)
+    worker_metrics_port: Optional[int] = None
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
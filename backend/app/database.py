@@ -1,14 +1,62 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
 from .config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {},
-)
+
+def engine_options(database_url: str) -> dict:
+    """create_engine() keyword arguments for the configured backend"""
+    if database_url.startswith("sqlite"):
+        # The API threadpool, Celery and the CLI all share the file; locking
+        # is SQLite's job, not the connection's owning thread
+        return {
+            "connect_args": {"check_same_thread": False},
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+        }
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Let readers and one writer work concurrently instead of failing with
+    "database is locked": WAL journal, fsync only at checkpoints, and wait
+    for locks rather than erroring immediately"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+
+def create_app_engine(database_url: str):
+    """Engine with the pool and pragma profile for the given database"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # One shared in-memory database; pool sizing and WAL don't apply
+        return create_engine(database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    
+    new_engine = create_engine(database_url, **engine_options(database_url))
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", set_sqlite_pragmas)
+    return new_engine
+
+
+engine = create_app_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -20,4 +68,52 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def insert_ignoring_conflicts(model, rows, index_elements):
+    """Multi-row INSERT ... ON CONFLICT DO NOTHING for the configured backend"""
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(model).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def upsert(model, rows, index_elements, update_columns):
+    """Multi-row INSERT ... ON CONFLICT DO UPDATE of `update_columns` for the
+    configured backend"""
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(model).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration_ms: float = 0.0
+
+
+@contextmanager
+def track_queries(bind=None):
+    """Count the statements this thread executes, and the time they take"""
+    bind = bind or engine
+    stats = QueryStats()
+    owner = threading.get_ident()
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+    
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        if threading.get_ident() == owner:
+            stats.count += 1
+            stats.duration_ms += (time.perf_counter() - started) * 1000
+    
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    event.listen(bind, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield stats
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+        event.remove(bind, "after_cursor_execute", after_cursor_execute)
@@ -1,18 +1,43 @@
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from .config import settings
-from .api import podcasts, admin, newsletter
+from .api import podcasts, admin, newsletter, episodes
 from .database import engine
-from .models import Base
+from .metrics import MetricsMiddleware, instrument_engine, render_metrics
+from .services.feed_fetcher import feed_fetcher
+
+# The schema is managed by Alembic (`alembic upgrade head` as a deploy step),
+# so importing the app does no DDL and doesn't touch the database at all
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Route handlers that use the database are plain `def`, so FastAPI runs
+    # them in AnyIO's worker threads instead of blocking the event loop
+    to_thread.current_default_thread_limiter().total_tokens = settings.api_threadpool_size
+    yield
+    await feed_fetcher.aclose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.app_name,
+    lifespan=lifespan,
     debug=settings.debug,
+    default_response_class=ORJSONResponse,
 )
 
+# Compress responses; episode pages with Mandarin summaries are large.
+# Brotli (with gzip fallback for older clients) when brotli-asgi is installed.
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=1000, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,8 +47,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latencies include compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
 # Include routers
 app.include_router(podcasts.router, prefix="/api", tags=["podcasts"])
+app.include_router(episodes.router, prefix="/api", tags=["episodes"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 app.include_router(newsletter.router, prefix="/api/newsletter", tags=["newsletter"])
 
@@ -33,6 +63,13 @@ async def health_check():
     return {"status": "healthy", "service": "pod_digest"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Podcast Digest API"}
\ No newline at end of file
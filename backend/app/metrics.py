@@ -0,0 +1,186 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess,
+    start_http_server,
+)
+from sqlalchemy import event
+from .database import QueryStats
+
+
+# Processes that share a port or a parent (uvicorn --workers, Celery prefork)
+# aggregate through files in PROMETHEUS_MULTIPROC_DIR when it is set
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# External APIs and pipeline stages run for minutes (Whisper on an hour of audio)
+SLOW_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database statements executed per API request",
+    ["route"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in the database per API request",
+    ["route"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Duration of each database statement",
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_duration_seconds", "Latency of calls to external services",
+    ["service", "operation", "outcome"], buckets=SLOW_BUCKETS,
+)
+TASK_RUNTIME_SECONDS = Histogram(
+    "celery_task_runtime_seconds", "Celery task execution time",
+    ["task", "state"], buckets=SLOW_BUCKETS,
+)
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "celery_task_queue_wait_seconds", "Time from publishing a task to a worker starting it",
+    ["task", "queue"], buckets=SLOW_BUCKETS,
+)
+TASK_RETRIES = Counter(
+    "celery_task_retries", "Celery task retries", ["task"],
+)
+TRANSCRIPTION_AUDIO_SECONDS = Counter(
+    "transcription_audio_seconds", "Episode audio reaching the transcribe stage, sent to Whisper or cut as recurring",
+    ["outcome"],
+)
+
+# Statements of the current API request; route handlers run in worker
+# threads with a copy of the request's context, so they share this object
+current_request_queries: ContextVar[Optional[QueryStats]] = ContextVar("current_request_queries", default=None)
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = current_request_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration_ms += elapsed * 1000
+
+
+def instrument_engine(engine):
+    """Time every statement on the engine, and charge it to the API request
+    it runs for, if any"""
+    if not event.contains(engine, "before_cursor_execute", start_query_timer):
+        event.listen(engine, "before_cursor_execute", start_query_timer)
+        event.listen(engine, "after_cursor_execute", record_query)
+
+
+@contextmanager
+def observe_external(service: str, operation: str):
+    """Record how long a call to an external service took, and whether it raised"""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(service, operation, outcome).observe(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """Per-route latency and database usage of every HTTP request
+    
+    Routes are labelled by their template (`/api/podcasts/{podcast_id}`),
+    so the number of series stays bounded.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        stats = QueryStats()
+        token = current_request_queries.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_queries.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            if route_path != "/metrics":
+                HTTP_REQUEST_SECONDS.labels(scope["method"], route_path, str(status)).observe(elapsed)
+                HTTP_REQUEST_DB_QUERIES.labels(route_path).observe(stats.count)
+                HTTP_REQUEST_DB_SECONDS.labels(route_path).observe(stats.duration_ms / 1000)
+
+
+def metrics_registry():
+    """The registry to export: this process's, or all processes' in multiprocess mode"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics():
+    """(body, content type) of the Prometheus text exposition"""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def instrument_celery(celery_app, metrics_port: Optional[int] = None):
+    """Task runtime, queue wait and retries from Celery's signals, served on
+    `metrics_port` by each worker
+    
+    Publishing stamps each message with its send time, so the wait covers
+    broker and prefetch time; pipeline stages report as separate tasks.
+    """
+    from celery import signals
+    
+    @signals.worker_init.connect(weak=False)
+    def serve_metrics(**kwargs):
+        if metrics_port:
+            start_http_server(metrics_port, registry=metrics_registry())
+    
+    @signals.before_task_publish.connect(weak=False)
+    def stamp_published_at(headers=None, **kwargs):
+        if headers is not None:
+            headers.setdefault("published_at", time.time())
+    
+    @signals.task_prerun.connect(weak=False)
+    def start_timer(task_id=None, task=None, **kwargs):
+        task.request.metrics_started = time.perf_counter()
+        published_at = getattr(task.request, "published_at", None)
+        if published_at:
+            queue = (task.request.delivery_info or {}).get("routing_key") or "unknown"
+            TASK_QUEUE_WAIT_SECONDS.labels(task.name, queue).observe(max(0.0, time.time() - published_at))
+    
+    @signals.task_postrun.connect(weak=False)
+    def stop_timer(task_id=None, task=None, state=None, **kwargs):
+        started = getattr(task.request, "metrics_started", None)
+        if started is not None:
+            TASK_RUNTIME_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+    
+    @signals.task_retry.connect(weak=False)
+    def count_retry(sender=None, **kwargs):
+        TASK_RETRIES.labels(sender.name).inc()
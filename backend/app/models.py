@@ -1,10 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
-
-Base = declarative_base()
+from .database import Base
 
 
 class Podcast(Base):
@@ -28,14 +26,112 @@ class Episode(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     podcast_id = Column(Integer, ForeignKey("podcasts.id"))
+    guid = Column(String(512))  # feed GUID, or normalized enclosure URL
     title = Column(String(255))
     audio_url = Column(Text)
     publish_date = Column(DateTime(timezone=True))
-    summary_mandarin = Column(Text)
+    # Blob store keys; the texts themselves stay out of row scans
+    transcript_key = Column(String(64))
+    summary_key = Column(String(64))  # Mandarin
+    english_summary_key = Column(String(64))  # source of every translation
     processed_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
     podcast = relationship("Podcast", back_populates="episodes")
+    
+    __table_args__ = (
+        Index("ux_episodes_podcast_guid", "podcast_id", "guid", unique=True),
+        Index("ix_episodes_processed_at", "processed_at"),
+        Index("ix_episodes_publish_date_id", "publish_date", "id"),
+        Index("ix_episodes_podcast_publish_date_id", "podcast_id", "publish_date", "id"),
+        Index("ix_episodes_podcast_audio_url", "podcast_id", "audio_url"),
+    )
+
+
+# Episode pipeline stages, in order. EpisodeProcessing.stage holds the last
+# stage that finished successfully.
+STAGE_PENDING = "pending"
+STAGE_DOWNLOADED = "downloaded"
+STAGE_TRANSCRIBED = "transcribed"
+STAGE_SUMMARIZED = "summarized"
+PIPELINE_STAGES = [STAGE_PENDING, STAGE_DOWNLOADED, STAGE_TRANSCRIBED, STAGE_SUMMARIZED]
+
+
+class EpisodeProcessing(Base):
+    __tablename__ = "episode_processing"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    podcast_id = Column(Integer, ForeignKey("podcasts.id"), nullable=False)
+    guid = Column(String(512), nullable=False)
+    title = Column(String(255))
+    audio_url = Column(Text, nullable=False)
+    publish_date = Column(DateTime(timezone=True))
+    stage = Column(String(20), nullable=False, default=STAGE_PENDING)
+    
+    # Artifact references for the stages that have finished
+    audio_path = Column(Text)
+    transcript_key = Column(String(64))
+    english_summary_key = Column(String(64))
+    episode_id = Column(Integer, ForeignKey("episodes.id"))
+    
+    # Audio fingerprint (blob key) and the recurring spans cut before
+    # transcription, as a JSON list of [start, end] seconds
+    fingerprint_key = Column(String(64))
+    audio_seconds = Column(Float)
+    skipped_seconds = Column(Float)
+    skipped_spans = Column(Text)
+    
+    # Backfilled episodes are summarized in Batch API jobs rather than one call each
+    batch_summary = Column(Boolean, nullable=False, default=False)
+    summary_batch_id = Column(Integer, ForeignKey("summary_batches.id"))
+    
+    # Held by the run that dispatched the pipeline and renewed by each stage;
+    # the episode is only re-dispatched once it has expired or a stage failed
+    claimed_until = Column(DateTime(timezone=True))
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    podcast = relationship("Podcast")
+    episode = relationship("Episode")
+    
+    __table_args__ = (
+        Index("ux_episode_processing_podcast_guid", "podcast_id", "guid", unique=True),
+        Index("ix_episode_processing_summary_batch", "summary_batch_id"),
+    )
+    
+    def reached(self, stage: str) -> bool:
+        """Whether the given pipeline stage has already finished"""
+        return PIPELINE_STAGES.index(self.stage) >= PIPELINE_STAGES.index(stage)
+
+
+# Summary batch statuses: the Batch API's own, plus "submitting" until the
+# job has been created
+BATCH_SUBMITTING = "submitting"
+BATCH_COMPLETED = "completed"
+BATCH_FAILED = "failed"
+BATCH_FINAL_STATUSES = [BATCH_COMPLETED, BATCH_FAILED, "expired", "cancelled"]
+
+
+class SummaryBatch(Base):
+    """One Batch API job summarizing many backfilled episodes"""
+    __tablename__ = "summary_batches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    provider_batch_id = Column(String(64))
+    status = Column(String(20), nullable=False, default=BATCH_SUBMITTING)
+    request_count = Column(Integer, nullable=False)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("ix_summary_batches_status", "status"),
+    )
 
 
 class Newsletter(Base):
@@ -45,4 +141,122 @@ class Newsletter(Base):
     beehiiv_post_id = Column(String(255))
     sent_at = Column(DateTime(timezone=True))
     episode_count = Column(Integer)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class NewsletterDraft(Base):
+    """The next issue, kept rendered as episodes finish processing; the
+    Sunday job publishes it and the next refresh starts a new one"""
+    __tablename__ = "newsletter_drafts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_key = Column(String(64))  # blob store key of the rendered HTML
+    episode_ids = Column(Text)  # JSON list, in newsletter order
+    episode_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True))
+    published_at = Column(DateTime(timezone=True))
+    newsletter_id = Column(Integer, ForeignKey("newsletters.id"))
+    # True while unpublished, NULL after; unique, so there is one open draft
+    is_open = Column(Boolean)
+    # Lease: a refresh pushes it forward while it rebuilds the draft
+    refreshing_until = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("ix_newsletter_drafts_published_at", "published_at"),
+        Index("ux_newsletter_drafts_open", "is_open", unique=True),
+    )
+
+
+class NewsletterFragment(Base):
+    """An episode's rendered newsletter section, reused while the data it
+    was rendered from stays the same"""
+    __tablename__ = "newsletter_fragments"
+    
+    episode_id = Column(Integer, ForeignKey("episodes.id"), primary_key=True)
+    inputs_hash = Column(String(64), nullable=False)
+    fragment_key = Column(String(64), nullable=False)  # blob store key of the HTML
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Subscription outbox statuses
+OUTBOX_PENDING = "pending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+
+class SubscriptionOutbox(Base):
+    __tablename__ = "subscription_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String(320), nullable=False, unique=True)
+    name = Column(String(255))
+    utm_source = Column(String(100))
+    utm_medium = Column(String(100))
+    status = Column(String(20), nullable=False, default=OUTBOX_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    # Also used as a lease: a flush pushes it forward while it holds the row
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    beehiiv_subscription_id = Column(String(255))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("ix_subscription_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class FeedState(Base):
+    """Per-podcast polling state: conditional-request validators and the
+    publishing cadence learned from the feed"""
+    __tablename__ = "feed_states"
+    
+    podcast_id = Column(Integer, ForeignKey("podcasts.id"), primary_key=True)
+    etag = Column(Text)
+    last_modified = Column(String(64))
+    
+    # Median gap between releases, its median deviation, and the newest
+    # release seen in the feed
+    cadence_seconds = Column(Integer)
+    release_spread_seconds = Column(Integer)
+    last_published_at = Column(DateTime(timezone=True))
+    
+    last_polled_at = Column(DateTime(timezone=True))
+    last_changed_at = Column(DateTime(timezone=True))
+    # Also used as a lease: poll_due_feeds pushes it forward when it dispatches a poll
+    next_poll_at = Column(DateTime(timezone=True), server_default=func.now())
+    polls = Column(Integer, nullable=False, default=0)
+    not_modified_polls = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    
+    podcast = relationship("Podcast")
+    
+    __table_args__ = (
+        Index("ix_feed_states_next_poll_at", "next_poll_at"),
+    )
+
+
+class RelatedEpisode(Base):
+    """One of an episode's nearest neighbours by transcript and summary
+    similarity, as computed by the related-episodes index"""
+    __tablename__ = "related_episodes"
+    
+    episode_id = Column(Integer, ForeignKey("episodes.id"), primary_key=True)
+    related_episode_id = Column(Integer, ForeignKey("episodes.id"), primary_key=True)
+    score = Column(Float, nullable=False)  # cosine similarity of TF-IDF vectors
+    
+    __table_args__ = (
+        Index("ix_related_episodes_score", "score"),
+    )
+
+
+class SummaryTranslation(Base):
+    """A summary translated into one language, keyed by the blob key of the
+    text it was translated from: each (text, language) is translated once"""
+    __tablename__ = "summary_translations"
+    
+    source_key = Column(String(64), primary_key=True)
+    language = Column(String(16), primary_key=True)
+    summary_key = Column(String(64), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
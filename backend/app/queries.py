@@ -0,0 +1,212 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import aliased
+from .models import Podcast, Episode, EpisodeProcessing, RelatedEpisode, SummaryTranslation
+
+
+def weekly_newsletter_query(since: datetime, limit: int = 10):
+    """Newsletter rows (id, podcast_name, title, audio_url, summary_key) for
+    the latest episodes of active podcasts processed since `since`
+
+    The processed_at range is materialized first, with only the columns
+    needed for ordering, so the planner walks ix_episodes_processed_at.
+    Written as a plain join, SQLite (which keeps no range statistics) scans
+    every active podcast's episodes through the podcast_id index instead.
+    Summary keys are only read for the rows that make the cut.
+    """
+    recent = (
+        select(Episode.id, Episode.podcast_id, Episode.publish_date)
+        .where(Episode.processed_at >= since)
+        .cte("recent_episodes")
+        .prefix_with("MATERIALIZED")
+    )
+    latest = (
+        select(recent.c.id, recent.c.publish_date, Podcast.name.label("podcast_name"))
+        .join(Podcast, Podcast.id == recent.c.podcast_id)
+        .where(Podcast.is_active == True)
+        .order_by(recent.c.publish_date.desc())
+        .limit(limit)
+        .subquery("latest")
+    )
+    
+    return (
+        select(Episode.id, latest.c.podcast_name, Episode.title, Episode.audio_url, Episode.summary_key)
+        .join(latest, latest.c.id == Episode.id)
+        .order_by(latest.c.publish_date.desc())
+    )
+
+
+def episode_page_query(
+    limit: int,
+    podcast_id: Optional[int] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+):
+    """One page of processed episodes of active podcasts, newest first
+
+    Keyset-paginated on (publish_date, id): `after` is the key of the last
+    row of the previous page, so every page is an index range scan on
+    ix_episodes_publish_date_id (or ix_episodes_podcast_publish_date_id when
+    filtered by podcast) instead of an OFFSET that reads all earlier rows.
+    """
+    query = (
+        select(
+            Episode.id,
+            Episode.podcast_id,
+            Podcast.name.label("podcast_name"),
+            Episode.title,
+            Episode.audio_url,
+            Episode.publish_date,
+            Episode.summary_key,
+        )
+        .join(Podcast, Podcast.id == Episode.podcast_id)
+        .where(Podcast.is_active == True, Episode.publish_date.isnot(None))
+    )
+    
+    if podcast_id is not None:
+        query = query.where(Episode.podcast_id == podcast_id)
+    if published_after:
+        query = query.where(Episode.publish_date >= published_after)
+    if published_before:
+        query = query.where(Episode.publish_date < published_before)
+    if after:
+        query = query.where(tuple_(Episode.publish_date, Episode.id) < after)
+    
+    return query.order_by(Episode.publish_date.desc(), Episode.id.desc()).limit(limit)
+
+
+def related_episodes_query(episode_id: int, limit: int):
+    """An episode's most similar episodes of active podcasts, best first:
+    one range scan of the related_episodes primary key"""
+    return (
+        select(
+            Episode.id,
+            Episode.podcast_id,
+            Podcast.name.label("podcast_name"),
+            Episode.title,
+            Episode.audio_url,
+            Episode.publish_date,
+            RelatedEpisode.score,
+        )
+        .join(Episode, Episode.id == RelatedEpisode.related_episode_id)
+        .join(Podcast, Podcast.id == Episode.podcast_id)
+        .where(RelatedEpisode.episode_id == episode_id, Podcast.is_active == True)
+        .order_by(RelatedEpisode.score.desc())
+        .limit(limit)
+    )
+
+
+def newsletter_related_query(episode_ids: List[int], per_episode: int, max_score: float):
+    """Rows (episode_id, podcast_name, title, audio_url) of up to
+    `per_episode` related episodes for each newsletter episode, leaving out
+    the newsletter's own episodes and near-duplicates (score >= `max_score`)"""
+    ranked = (
+        select(
+            RelatedEpisode.episode_id,
+            RelatedEpisode.related_episode_id,
+            func.row_number().over(
+                partition_by=RelatedEpisode.episode_id,
+                order_by=RelatedEpisode.score.desc(),
+            ).label("rank"),
+        )
+        .join(Episode, Episode.id == RelatedEpisode.related_episode_id)
+        .join(Podcast, Podcast.id == Episode.podcast_id)
+        .where(
+            RelatedEpisode.episode_id.in_(episode_ids),
+            RelatedEpisode.related_episode_id.notin_(episode_ids),
+            RelatedEpisode.score < max_score,
+            Podcast.is_active == True,
+        )
+        .subquery("ranked")
+    )
+    return (
+        select(ranked.c.episode_id, Podcast.name.label("podcast_name"), Episode.title, Episode.audio_url)
+        .join(Episode, Episode.id == ranked.c.related_episode_id)
+        .join(Podcast, Podcast.id == Episode.podcast_id)
+        .where(ranked.c.rank <= per_episode)
+        .order_by(ranked.c.episode_id, ranked.c.rank)
+    )
+
+
+def near_duplicates_query(min_score: float, limit: int):
+    """Pairs of episodes from different podcasts whose content is nearly
+    identical (cross-posts), most similar first; each pair appears once"""
+    duplicate = aliased(Episode)
+    duplicate_podcast = aliased(Podcast)
+    return (
+        select(
+            RelatedEpisode.score,
+            Episode.id.label("episode_id"),
+            Episode.title.label("episode_title"),
+            Podcast.name.label("podcast_name"),
+            duplicate.id.label("duplicate_episode_id"),
+            duplicate.title.label("duplicate_title"),
+            duplicate_podcast.name.label("duplicate_podcast_name"),
+        )
+        .join(Episode, Episode.id == RelatedEpisode.episode_id)
+        .join(Podcast, Podcast.id == Episode.podcast_id)
+        .join(duplicate, duplicate.id == RelatedEpisode.related_episode_id)
+        .join(duplicate_podcast, duplicate_podcast.id == duplicate.podcast_id)
+        .where(
+            RelatedEpisode.score >= min_score,
+            RelatedEpisode.episode_id < RelatedEpisode.related_episode_id,
+            Episode.podcast_id != duplicate.podcast_id,
+        )
+        .order_by(RelatedEpisode.score.desc())
+        .limit(limit)
+    )
+
+
+def transcription_savings_query(since: datetime, limit: int):
+    """Per-episode audio length and recurring audio cut before transcription,
+    for pipeline rows fingerprinted since `since`, newest first"""
+    return (
+        select(
+            EpisodeProcessing.id.label("processing_id"),
+            EpisodeProcessing.episode_id,
+            EpisodeProcessing.title,
+            Podcast.name.label("podcast_name"),
+            EpisodeProcessing.audio_seconds,
+            EpisodeProcessing.skipped_seconds,
+            EpisodeProcessing.skipped_spans,
+        )
+        .join(Podcast, Podcast.id == EpisodeProcessing.podcast_id)
+        .where(EpisodeProcessing.audio_seconds.isnot(None), EpisodeProcessing.updated_at >= since)
+        .order_by(EpisodeProcessing.id.desc())
+        .limit(limit)
+    )
+
+
+def transcription_savings_totals_query(since: datetime):
+    """(episodes, audio_seconds, skipped_seconds) over the same rows"""
+    return (
+        select(
+            func.count(),
+            func.coalesce(func.sum(EpisodeProcessing.audio_seconds), 0),
+            func.coalesce(func.sum(EpisodeProcessing.skipped_seconds), 0),
+        )
+        .where(EpisodeProcessing.audio_seconds.isnot(None), EpisodeProcessing.updated_at >= since)
+    )
+
+
+def untranslated_summaries_query(language: str, limit: int, translate_mandarin: bool = True):
+    """Rows (id, source_key) of up to `limit` episodes, newest first, with no
+    summary in `language` yet; the source is the English summary, or the
+    Mandarin one for episodes summarized before English summaries were kept
+    (left out when `translate_mandarin` is false)"""
+    source_key = (
+        func.coalesce(Episode.english_summary_key, Episode.summary_key)
+        if translate_mandarin else Episode.english_summary_key
+    )
+    return (
+        select(Episode.id, source_key.label("source_key"))
+        .outerjoin(
+            SummaryTranslation,
+            (SummaryTranslation.source_key == source_key) & (SummaryTranslation.language == language),
+        )
+        .where(source_key.isnot(None), SummaryTranslation.source_key.is_(None))
+        .order_by(Episode.id.desc())
+        .limit(limit)
+    )
@@ -0,0 +1,255 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from ..config import settings
+
+
+# Audio is decoded once at Whisper's own rate; fingerprints use half of it
+SAMPLE_RATE = 16000
+FINGERPRINT_RATE = 8000
+# 256 ms frames every 16 ms: fine steps keep fingerprints stable when the
+# same clip lands at an arbitrary sample offset in another episode
+FRAME_SIZE = 2048
+HOP_SIZE = 128
+FRAME_SECONDS = HOP_SIZE / FINGERPRINT_RATE
+# 33 log-spaced bands over the speech range give 32 bits per frame
+BAND_EDGES_HZ = np.geomspace(300, 2000, 34)
+FRAMES_PER_CHUNK = 4096
+
+# Hashes this common in an episode (silence, steady tones) say nothing about alignment
+MAX_HASH_HITS = 16
+# Exact hash hits needed before an alignment is checked bit by bit
+MIN_ALIGNMENT_VOTES = 8
+MAX_ALIGNMENTS = 32
+# Bit error rate, averaged over SMOOTHING_SECONDS, below which audio is the same clip
+MAX_BIT_ERROR_RATE = 0.3
+SMOOTHING_SECONDS = 2.0
+# Matched spans closer than this are one span
+MERGE_GAP_SECONDS = 1.0
+# Kept on both sides of a cut, so speech next to an ad isn't clipped; smoothing
+# already widens a match by about a quarter of its window on each side
+EDGE_PADDING_SECONDS = 0.25 + SMOOTHING_SECONDS / 4
+
+FFMPEG = shutil.which("ffmpeg")
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class AudioDecodeError(Exception):
+    """ffmpeg is missing or couldn't read or write the audio"""
+
+
+def run_ffmpeg(args: List[str], input_bytes: Optional[bytes] = None) -> bytes:
+    if FFMPEG is None:
+        raise AudioDecodeError("ffmpeg is not installed")
+    result = subprocess.run(
+        [FFMPEG, "-hide_banner", "-loglevel", "error", "-nostdin", *args],
+        input=input_bytes, capture_output=True,
+    )
+    if result.returncode != 0:
+        raise AudioDecodeError(result.stderr.decode(errors="replace").strip() or "ffmpeg failed")
+    return result.stdout
+
+
+def decode_audio(path: str) -> np.ndarray:
+    """Mono float32 samples at SAMPLE_RATE"""
+    pcm = run_ffmpeg(["-i", path, "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-"])
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768
+
+
+def encode_audio(samples: np.ndarray, path: str):
+    """Write mono samples at SAMPLE_RATE as a speech-quality MP3"""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+    run_ffmpeg(
+        ["-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-i", "-", "-b:a", "48k", "-y", path],
+        input_bytes=pcm,
+    )
+
+
+def fingerprint(samples: np.ndarray) -> np.ndarray:
+    """One 32-bit sub-fingerprint per frame (Haitsma-Kalker): the signs of
+    band-energy differences across neighbouring bands and frames, which
+    survive re-encoding, level changes and light mixing"""
+    # Averaging sample pairs low-passes well enough for bands below 2 kHz
+    samples = samples[:len(samples) // 2 * 2].reshape(-1, 2).mean(axis=1)
+    if len(samples) < FRAME_SIZE + HOP_SIZE:
+        return np.empty(0, dtype=np.uint32)
+    
+    frames = sliding_window_view(samples, FRAME_SIZE)[::HOP_SIZE]
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    edges = np.round(BAND_EDGES_HZ * FRAME_SIZE / FINGERPRINT_RATE).astype(int)
+    energies = np.empty((len(frames), len(edges) - 1), dtype=np.float32)
+    for start in range(0, len(frames), FRAMES_PER_CHUNK):
+        spectrum = np.fft.rfft(frames[start:start + FRAMES_PER_CHUNK] * window, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        energies[start:start + FRAMES_PER_CHUNK] = np.add.reduceat(
+            power[:, edges[0]:edges[-1]], edges[:-1] - edges[0], axis=1
+        )
+    
+    band_differences = energies[:, :-1] - energies[:, 1:]
+    bits = (band_differences[1:] - band_differences[:-1]) > 0
+    return np.packbits(bits, axis=1, bitorder="little").view("<u4").ravel()
+
+
+def bit_errors(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Differing bits between aligned sub-fingerprints"""
+    return POPCOUNT[np.bitwise_xor(a, b).view(np.uint8)].reshape(-1, 4).sum(axis=1)
+
+
+def candidate_alignments(prints: np.ndarray, past: np.ndarray) -> np.ndarray:
+    """Offsets (past frame - frame) at which many sub-fingerprints match exactly"""
+    order = np.argsort(past, kind="stable")
+    sorted_past = past[order]
+    left = np.searchsorted(sorted_past, prints, side="left")
+    counts = np.searchsorted(sorted_past, prints, side="right") - left
+    usable = (counts > 0) & (counts <= MAX_HASH_HITS)
+    if not usable.any():
+        return np.empty(0, dtype=np.int64)
+    
+    # Expand every (frame, past frame) pair with an equal hash
+    counts = counts[usable]
+    frames = np.repeat(np.nonzero(usable)[0], counts)
+    within = np.arange(len(frames)) - np.repeat(np.cumsum(counts) - counts, counts)
+    past_frames = order[np.repeat(left[usable], counts) + within]
+    
+    offsets, votes = np.unique(past_frames - frames, return_counts=True)
+    best = np.argsort(-votes, kind="stable")[:MAX_ALIGNMENTS]
+    return offsets[best][votes[best] >= MIN_ALIGNMENT_VOTES]
+
+
+def matched_frames(prints: np.ndarray, history: Sequence[np.ndarray]) -> np.ndarray:
+    """Mask of the frames that also occur in any of the past episodes"""
+    matched = np.zeros(len(prints), dtype=bool)
+    smoothing = max(1, int(SMOOTHING_SECONDS / FRAME_SECONDS))
+    kernel = np.ones(smoothing, dtype=np.float32) / (32 * smoothing)
+    for past in history:
+        for offset in candidate_alignments(prints, past):
+            start, end = max(0, -offset), min(len(prints), len(past) - offset)
+            if end - start < smoothing:
+                continue
+            errors = bit_errors(prints[start:end], past[start + offset:end + offset]).astype(np.float32)
+            matched[start:end] |= np.convolve(errors, kernel, mode="same") < MAX_BIT_ERROR_RATE
+    return matched
+
+
+def mask_to_spans(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) frame ranges of the True runs"""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return list(zip(np.nonzero(edges == 1)[0].tolist(), np.nonzero(edges == -1)[0].tolist()))
+
+
+def recurring_spans(prints: np.ndarray, history: Sequence[np.ndarray], duration: float,
+                    min_seconds: float, max_fraction: float) -> List[Tuple[float, float]]:
+    """(start, end) seconds of the episode's audio that recurs in past
+    episodes, padded inwards; nothing when most of the episode matches,
+    which means a rerun rather than ads"""
+    spans = []
+    for start, end in mask_to_spans(matched_frames(prints, history)):
+        start_s, end_s = start * FRAME_SECONDS, min(duration, end * FRAME_SECONDS)
+        if spans and start_s - spans[-1][1] < MERGE_GAP_SECONDS:
+            spans[-1] = (spans[-1][0], end_s)
+        else:
+            spans.append((start_s, end_s))
+    
+    spans = [
+        (round(start + EDGE_PADDING_SECONDS, 2), round(end - EDGE_PADDING_SECONDS, 2))
+        for start, end in spans
+        if end - start >= min_seconds
+    ]
+    if sum(end - start for start, end in spans) > max_fraction * duration:
+        return []
+    return spans
+
+
+@dataclass
+class SkipPlan:
+    """Which spans of an episode's audio are cut before transcription, and
+    where the kept audio sits in the original timeline"""
+    duration: float
+    skipped: List[Tuple[float, float]]
+    fingerprint: np.ndarray = field(repr=False)
+    audio_path: Optional[str] = None  # trimmed audio, when anything was cut
+    
+    @property
+    def skipped_seconds(self) -> float:
+        return sum(end - start for start, end in self.skipped)
+    
+    @property
+    def kept(self) -> List[Tuple[float, float]]:
+        kept, position = [], 0.0
+        for start, end in self.skipped:
+            if start > position:
+                kept.append((position, start))
+            position = end
+        if position < self.duration:
+            kept.append((position, self.duration))
+        return kept
+    
+    def to_original(self, seconds: float) -> float:
+        """Map a time in the trimmed audio back to the original episode"""
+        elapsed = 0.0
+        for start, end in self.kept:
+            if seconds < elapsed + (end - start):
+                return start + seconds - elapsed
+            elapsed += end - start
+        return self.duration
+
+
+def plan_skips(audio_path: str, history: Sequence[np.ndarray], out_dir: str) -> SkipPlan:
+    """Fingerprint an episode and, when it shares spans with past episodes
+    of the podcast, write the audio without them to `out_dir`"""
+    samples = decode_audio(audio_path)
+    duration = len(samples) / SAMPLE_RATE
+    prints = fingerprint(samples)
+    skipped = recurring_spans(
+        prints, history, duration,
+        min_seconds=settings.recurring_min_seconds,
+        max_fraction=settings.recurring_max_fraction,
+    )
+    plan = SkipPlan(duration=duration, skipped=skipped, fingerprint=prints)
+    if not skipped:
+        return plan
+    
+    kept = np.concatenate([
+        samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] for start, end in plan.kept
+    ])
+    os.makedirs(out_dir, exist_ok=True)
+    fd, plan.audio_path = tempfile.mkstemp(suffix=".mp3", dir=out_dir)
+    os.close(fd)
+    try:
+        encode_audio(kept, plan.audio_path)
+    except AudioDecodeError:
+        os.remove(plan.audio_path)
+        raise
+    return plan
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def annotate_transcript(segments: Sequence[Tuple[float, float, str]], plan: SkipPlan) -> str:
+    """Transcript of the trimmed audio with a marker wherever a recurring
+    span was cut, at its place in the original timeline"""
+    parts = []
+    pending = list(plan.skipped)
+    for start, _, text in segments:
+        original = plan.to_original(start)
+        while pending and pending[0][0] <= original:
+            skip_start, skip_end = pending.pop(0)
+            parts.append(f"\n[Skipped {format_timestamp(skip_start)}-{format_timestamp(skip_end)}: recurring segment]\n")
+        parts.append(text.strip())
+    for skip_start, skip_end in pending:
+        parts.append(f"\n[Skipped {format_timestamp(skip_start)}-{format_timestamp(skip_end)}: recurring segment]\n")
+    return " ".join(parts).replace(" \n", "\n").replace("\n ", "\n").strip()
+
+
+def load_fingerprint(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4")
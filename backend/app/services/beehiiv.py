@@ -2,18 +2,73 @@ import httpx
 from datetime import datetime
 from typing import Dict, List, Optional
 from ..config import settings
+from ..metrics import observe_external
+from .http import request_with_retry
+
+
+BEEHIIV_API_URL = "https://api.beehiiv.com/v2"
+
+
+def create_beehiiv_client() -> httpx.AsyncClient:
+    """Connection-pooled client for the Beehiiv API, meant to be shared"""
+    return httpx.AsyncClient(
+        base_url=BEEHIIV_API_URL,
+        headers={
+            "Authorization": f"Bearer {settings.beehiiv_api_key}",
+            "Content-Type": "application/json"
+        },
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=settings.beehiiv_max_connections,
+            max_keepalive_connections=settings.beehiiv_max_connections,
+            keepalive_expiry=60.0
+        ),
+    )
 
 
 class BeehiivService:
-    def __init__(self):
-        self.api_key = settings.beehiiv_api_key
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.publication_id = settings.beehiiv_publication_id
-        self.base_url = "https://api.beehiiv.com/v2"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
+        self.max_retries = settings.beehiiv_max_retries
+        # Share the application's client when given one; otherwise own a client
+        self._owns_client = client is None
+        self.client = client or create_beehiiv_client()
+    
+    async def aclose(self):
+        if self._owns_client:
+            await self.client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def create_subscription(self, email: str, name: str = "", utm_source: str = "website",
+                                  utm_medium: str = "organic") -> httpx.Response:
+        """Subscribe an email address; the caller interprets the response"""
+        subscriber_data = {
+            "email": email,
+            "reactivate_existing": True,
+            "send_welcome_email": True,
+            "utm_source": utm_source,
+            "utm_medium": utm_medium
         }
-        self.client = httpx.Client(headers=self.headers, timeout=httpx.Timeout(30.0))
+        
+        # Add name as custom field if provided
+        if name.strip():
+            subscriber_data["custom_fields"] = [
+                {"name": "name", "value": name.strip()}
+            ]
+        
+        # Re-subscribing the same email is a no-op, so this is safe to retry
+        with observe_external("beehiiv", "create_subscription"):
+            return await request_with_retry(
+                self.client, "POST", f"/publications/{self.publication_id}/subscriptions",
+                json=subscriber_data,
+                idempotent=True,
+                max_retries=self.max_retries
+            )
     
     async def create_post(self, title: str, content: str, send_at: Optional[datetime] = None) -> Dict:
         """Create a new post/newsletter in Beehiiv"""
@@ -28,10 +83,14 @@ class BeehiivService:
                 "authors": ["Podcast Digest"],
             }
             
-            response = self.client.post(
-                f"{self.base_url}/publications/{self.publication_id}/posts",
-                json=payload
-            )
+            # Not idempotent: a retried timeout could create a second post
+            with observe_external("beehiiv", "create_post"):
+                response = await request_with_retry(
+                    self.client, "POST", f"/publications/{self.publication_id}/posts",
+                    json=payload,
+                    idempotent=False,
+                    max_retries=self.max_retries
+                )
             response.raise_for_status()
             return response.json()
             
@@ -39,9 +98,9 @@ class BeehiivService:
             print(f"Error creating Beehiiv post: {str(e)}")
             raise
     
-    def format_newsletter_content(self, episodes: List[Dict]) -> str:
-        """Format episodes into newsletter HTML content"""
-        content = """
+    @staticmethod
+    def format_newsletter_header() -> str:
+        return """
 <div style="font-family: 'Helvetica Neue', Arial, sans-serif; max-width: 600px; margin: 0 auto;">
     <h1 style="color: #333; text-align: center; margin-bottom: 30px;">
         🎙️ 本周播客精选
@@ -51,9 +110,11 @@ class BeehiivService:
         欢迎阅读本周的播客摘要！我们为您精选了最有价值的英文播客内容，并翻译成中文摘要。
     </p>
 """
-        
-        for episode in episodes:
-            content += f"""
+    
+    @staticmethod
+    def format_episode_fragment(episode: Dict) -> str:
+        """One episode's section of the newsletter"""
+        content = f"""
     <div style="border-bottom: 1px solid #eee; padding: 20px 0; margin-bottom: 20px;">
         <h2 style="color: #333; margin-bottom: 10px;">
             📻 {episode['podcast_name']}
@@ -69,10 +130,27 @@ class BeehiivService:
                 🎧 收听原版播客
             </a>
         </p>
-    </div>
 """
-        
+        if episode.get('related'):
+            links = "".join(
+                f"""
+            <li><a href="{related['audio_url']}" style="color: #007bff; text-decoration: none;">{related['title']}</a>
+                <span style="color: #999;">· {related['podcast_name']}</span></li>"""
+                for related in episode['related']
+            )
+            content += f"""
+        <p style="color: #666; font-size: 14px; margin-bottom: 5px;">🔗 相关节目</p>
+        <ul style="color: #666; font-size: 14px; line-height: 1.6; margin-top: 0;">{links}
+        </ul>
+"""
         content += """
+    </div>
+"""
+        return content
+    
+    @staticmethod
+    def format_newsletter_footer() -> str:
+        return """
     <div style="text-align: center; margin-top: 40px; padding: 20px 0; border-top: 1px solid #eee;">
         <p style="color: #999; font-size: 14px;">
             感谢您的阅读！下周见 👋
@@ -83,8 +161,19 @@ class BeehiivService:
     </div>
 </div>
 """
-        return content
     
-    def __del__(self):
-        if hasattr(self, 'client'):
-            self.client.close()
\ No newline at end of file
+    @staticmethod
+    def format_newsletter_content(episodes: List[Dict]) -> str:
+        """Format episodes into newsletter HTML content"""
+        return BeehiivService.assemble_newsletter(
+            BeehiivService.format_episode_fragment(episode) for episode in episodes
+        )
+    
+    @staticmethod
+    def assemble_newsletter(fragments) -> str:
+        """Newsletter HTML from already rendered episode sections"""
+        return (
+            BeehiivService.format_newsletter_header()
+            + "".join(fragments)
+            + BeehiivService.format_newsletter_footer()
+        )
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+from ..config import settings
+
+
+class BlobNotFound(Exception):
+    """No blob is stored under the key"""
+
+
+def blob_key(data: bytes) -> str:
+    """Content address of a blob: the hex SHA-256 of its uncompressed bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """Immutable blobs (transcripts, summaries) addressed by content hash
+    
+    Blobs are zlib-compressed at rest. Storing content that is already there
+    writes nothing, so identical transcripts take space once. A key's
+    content can never change, so reads are cached in memory (up to
+    `cache_bytes`) without any invalidation.
+    """
+    
+    def __init__(self, cache_bytes: int = 0):
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+    
+    def put(self, data: bytes) -> str:
+        key = blob_key(data)
+        if not self._exists(key):
+            self._write(key, zlib.compress(data, 6))
+        return key
+    
+    def get(self, key: str) -> bytes:
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+        
+        data = zlib.decompress(self._read(key))
+        self._remember(key, data)
+        return data
+    
+    def put_text(self, text: str) -> str:
+        return self.put(text.encode("utf-8"))
+    
+    def get_text(self, key: str) -> str:
+        return self.get(key).decode("utf-8")
+    
+    def get_texts(self, keys: Iterable[Optional[str]]) -> Dict[str, str]:
+        """Texts of several keys; empty and missing keys are left out"""
+        texts = {}
+        for key in set(filter(None, keys)):
+            try:
+                texts[key] = self.get_text(key)
+            except BlobNotFound:
+                print(f"Blob {key} is missing from the blob store")
+        return texts
+    
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.cache_bytes // 8:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = data
+            self._cached_bytes += len(data)
+            while self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+    
+    @abstractmethod
+    def _exists(self, key: str) -> bool:
+        ...
+    
+    @abstractmethod
+    def _write(self, key: str, compressed: bytes):
+        ...
+    
+    @abstractmethod
+    def _read(self, key: str) -> bytes:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under `root`, fanned out as ab/cd/abcd...; the
+    directory must be shared by every API and worker process"""
+    
+    def __init__(self, root: str, cache_bytes: int = 0):
+        super().__init__(cache_bytes)
+        self.root = root
+    
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+    
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+    
+    def _write(self, key: str, compressed: bytes):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write aside and rename, so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _read(self, key: str) -> bytes:
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects in an S3-compatible bucket (AWS, MinIO, R2, ...)"""
+    
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 cache_bytes: int = 0):
+        super().__init__(cache_bytes)
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("The S3 blob store needs boto3: pip install boto3")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+    
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+    
+    def _write(self, key: str, compressed: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=compressed)
+    
+    def _read(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            raise BlobNotFound(key)
+
+
+@lru_cache(maxsize=None)
+def get_blob_store() -> BlobStore:
+    """The configured blob store, built on first use"""
+    cache_bytes = settings.blob_cache_mb * 1024 * 1024
+    if settings.blob_store_backend == "s3":
+        return S3BlobStore(
+            settings.blob_store_s3_bucket,
+            prefix=settings.blob_store_s3_prefix,
+            endpoint_url=settings.blob_store_s3_endpoint_url,
+            cache_bytes=cache_bytes,
+        )
+    return LocalBlobStore(settings.blob_store_dir, cache_bytes=cache_bytes)
@@ -0,0 +1,111 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+import anyio
+import httpx
+from ..config import settings
+from ..metrics import observe_external
+from .rss_parser import FIRST_ENTRY_PATTERN, parse_channel_metadata
+
+
+# Stop downloading once this much of a feed arrived without reaching an item
+CHANNEL_HEADER_LIMIT = 512 * 1024
+
+
+class FeedError(Exception):
+    """The feed couldn't be fetched or isn't an RSS/Atom feed"""
+
+
+@dataclass
+class CachedFeed:
+    metadata: Dict
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class FeedFetcher:
+    """Fetches channel metadata without blocking the event loop
+    
+    Downloads only up to the first episode, parses it in a worker thread,
+    and remembers the result per URL: within `cache_ttl` no request is made,
+    after it the feed is revalidated with a conditional GET.
+    """
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None,
+                 cache_ttl: Optional[float] = None, max_cache_entries: int = 2048):
+        self._client = client
+        self.cache_ttl = settings.feed_metadata_cache_ttl if cache_ttl is None else cache_ttl
+        self.max_cache_entries = max_cache_entries
+        self._cache: "OrderedDict[str, CachedFeed]" = OrderedDict()
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.feed_fetch_timeout, connect=5.0),
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=settings.feed_import_concurrency),
+                headers={"User-Agent": "PodDigest/1.0 (+feed import)"},
+            )
+        return self._client
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _remember(self, rss_url: str, entry: CachedFeed):
+        self._cache[rss_url] = entry
+        self._cache.move_to_end(rss_url)
+        while len(self._cache) > self.max_cache_entries:
+            self._cache.popitem(last=False)
+    
+    async def fetch_channel(self, rss_url: str) -> Dict:
+        """Title, description and cover image of the feed at rss_url"""
+        cached = self._cache.get(rss_url)
+        if cached and time.monotonic() - cached.fetched_at < self.cache_ttl:
+            return cached.metadata
+        
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        
+        try:
+            # The client timeout bounds each socket read; this bounds the whole fetch,
+            # so a feed that trickles bytes cannot hold the request open
+            with anyio.fail_after(settings.feed_fetch_timeout), observe_external("feed_host", "channel"):
+                async with self.client.stream("GET", rss_url, headers=headers) as response:
+                    if response.status_code == 304 and cached:
+                        cached.fetched_at = time.monotonic()
+                        return cached.metadata
+                    response.raise_for_status()
+                    
+                    head = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        # Look back a little so a tag split across chunks is still found
+                        search_from = max(0, len(head) - 16)
+                        head += chunk
+                        if FIRST_ENTRY_PATTERN.search(head, search_from) or len(head) >= CHANNEL_HEADER_LIMIT:
+                            break
+                    etag = response.headers.get("etag")
+                    last_modified = response.headers.get("last-modified")
+        except (TimeoutError, httpx.TimeoutException):
+            raise FeedError("Timed out fetching the feed")
+        except httpx.HTTPStatusError as e:
+            raise FeedError(f"Feed returned HTTP {e.response.status_code}")
+        except httpx.HTTPError as e:
+            raise FeedError(f"Could not fetch the feed: {e}")
+        
+        metadata = await anyio.to_thread.run_sync(parse_channel_metadata, bytes(head))
+        if metadata is None:
+            raise FeedError("Not an RSS or Atom feed")
+        
+        self._remember(rss_url, CachedFeed(metadata, etag, last_modified, time.monotonic()))
+        return metadata
+
+
+feed_fetcher = FeedFetcher()
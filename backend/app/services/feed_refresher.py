@@ -0,0 +1,119 @@
+import asyncio
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
+from ..config import settings
+from ..metrics import observe_external
+from .rss_parser import FeedResponse, parse_episodes
+
+# HTTP/2 lets one connection per feed host carry all of that host's requests
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class FeedRequest:
+    podcast_id: int
+    rss_url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class FeedRefresh:
+    """Outcome of one feed: episodes is None unless the feed changed"""
+    podcast_id: int
+    feed: Optional[FeedResponse] = None
+    episodes: Optional[List[Dict]] = None
+    error: Optional[str] = None
+
+
+def create_refresh_client(concurrency: int) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(settings.feed_fetch_timeout, connect=5.0),
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        follow_redirects=True,
+        headers={"User-Agent": "PodDigest/1.0 (+feed refresh)"},
+    )
+
+
+class FeedRefresher:
+    """Conditionally fetches many feeds concurrently and parses the changed
+    ones in a process pool
+    
+    At most `concurrency` requests are in flight overall and `per_host` to
+    any one host, since many shows share a hosting platform.
+    """
+    
+    def __init__(self, concurrency: Optional[int] = None, per_host: Optional[int] = None,
+                 parse_processes: Optional[int] = None):
+        self.concurrency = concurrency or settings.feed_refresh_concurrency
+        self.per_host = per_host or settings.feed_refresh_per_host
+        self.parse_processes = settings.feed_parse_processes if parse_processes is None else parse_processes
+        self.client: Optional[httpx.AsyncClient] = None
+        self.executor: Optional[Executor] = None
+    
+    async def __aenter__(self):
+        self.client = create_refresh_client(self.concurrency)
+        # Daemonic processes (e.g. Celery prefork children) can't fork a
+        # pool of their own; parse in threads there instead
+        if self.parse_processes and not multiprocessing.current_process().daemon:
+            self.executor = ProcessPoolExecutor(max_workers=self.parse_processes)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+    
+    async def refresh(self, requests: List[FeedRequest]) -> List[FeedRefresh]:
+        overall = asyncio.Semaphore(self.concurrency)
+        hosts = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        
+        async def refresh_one(request: FeedRequest) -> FeedRefresh:
+            # Wait for the host first so a busy host doesn't hold global slots
+            async with hosts[urlsplit(request.rss_url).netloc.lower()], overall:
+                try:
+                    feed = await self.fetch(request)
+                except httpx.HTTPError as e:
+                    return FeedRefresh(request.podcast_id, error=str(e) or e.__class__.__name__)
+            
+            if feed.not_modified:
+                return FeedRefresh(request.podcast_id, feed=feed)
+            try:
+                episodes = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, parse_episodes, feed.content
+                )
+            except Exception as e:
+                return FeedRefresh(request.podcast_id, error=f"Failed to parse feed: {e}")
+            return FeedRefresh(request.podcast_id, feed=feed, episodes=episodes)
+        
+        return await asyncio.gather(*(refresh_one(request) for request in requests))
+    
+    async def fetch(self, request: FeedRequest) -> FeedResponse:
+        headers = {}
+        if request.etag:
+            headers["If-None-Match"] = request.etag
+        if request.last_modified:
+            headers["If-Modified-Since"] = request.last_modified
+        
+        with observe_external("feed_host", "fetch"):
+            response = await self.client.get(request.rss_url, headers=headers)
+        if response.status_code == 304:
+            return FeedResponse(not_modified=True, etag=request.etag, last_modified=request.last_modified)
+        response.raise_for_status()
+        
+        return FeedResponse(
+            not_modified=False,
+            content=response.content,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
@@ -0,0 +1,87 @@
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Tuple
+from ..config import settings
+
+
+# Releases used to learn a feed's cadence; older ones say little about today
+CADENCE_HISTORY = 20
+# Fewer gaps than this and the feed is polled at the default interval
+MIN_CADENCE_SAMPLES = 3
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite hands timestamps back naive; treat those as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def learn_cadence(publish_dates: Iterable[Optional[datetime]]) -> Tuple[Optional[int], Optional[int], Optional[datetime]]:
+    """(cadence, spread, newest release) from a feed's publish dates
+    
+    Cadence is the median number of seconds between releases and spread the
+    median deviation from it, so the odd bonus episode or hiatus doesn't
+    skew either. No cadence when the feed has too little history to tell.
+    """
+    dates = sorted({as_utc(date) for date in publish_dates if date}, reverse=True)[:CADENCE_HISTORY + 1]
+    if not dates:
+        return None, None, None
+    
+    # Same-day double drops would drag the median towards zero
+    gaps = [
+        (newer - older).total_seconds()
+        for newer, older in zip(dates, dates[1:])
+        if (newer - older).total_seconds() >= 3600
+    ]
+    if len(gaps) < MIN_CADENCE_SAMPLES:
+        return None, None, dates[0]
+    
+    cadence = statistics.median(gaps)
+    spread = statistics.median(abs(gap - cadence) for gap in gaps)
+    return int(cadence), int(spread), dates[0]
+
+
+def next_poll_time(cadence_seconds: Optional[int], spread_seconds: Optional[int],
+                   last_published_at: Optional[datetime], now: datetime) -> datetime:
+    """When to poll a feed next
+    
+    Regular feeds are left alone until shortly before the next expected
+    release (last release plus the cadence), polled every few minutes around
+    it, and backed off if it is late, returning for each later slot in case
+    a release was skipped. Feeds too irregular to predict are polled at a
+    fraction of their cadence. Nothing waits longer than FEED_POLL_MAX_HOURS.
+    """
+    minimum = timedelta(minutes=settings.feed_poll_min_minutes)
+    maximum = timedelta(hours=settings.feed_poll_max_hours)
+    
+    if not cadence_seconds or not last_published_at:
+        delay = timedelta(minutes=settings.feed_poll_default_minutes)
+    elif (spread_seconds or 0) > cadence_seconds / 4:
+        delay = max(minimum, min(timedelta(seconds=cadence_seconds / 12), maximum))
+    else:
+        cadence = timedelta(seconds=cadence_seconds)
+        grace = timedelta(minutes=settings.feed_release_grace_minutes)
+        window = max(minimum, min(3 * timedelta(seconds=spread_seconds or 0) + grace, cadence / 4))
+        last_published_at = as_utc(last_published_at)
+        expected = last_published_at + cadence
+        
+        if now < expected - window:
+            delay = min(expected - window - now, maximum)
+        elif now <= expected + window:
+            delay = minimum
+        else:
+            # Overdue: back off the later it gets, but be back for the window
+            # of the following slot (e.g. a weekday show after the weekend)
+            delay = max(minimum, min((now - expected) / 2, maximum))
+            slots_passed = (now - last_published_at - window) // cadence
+            next_expected = last_published_at + (slots_passed + 1) * cadence
+            if now >= next_expected - window:
+                delay = minimum
+            else:
+                delay = min(delay, next_expected - window - now)
+    
+    # Spread feeds with the same cadence so they don't all come due together
+    jitter = delay.total_seconds() * 0.05 * random.random()
+    return now + delay + timedelta(seconds=jitter)
@@ -0,0 +1,68 @@
+import asyncio
+import random
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+import httpx
+
+
+# Rejected before any work was done, so safe to retry any request
+THROTTLED_STATUSES = {429}
+# Retried for idempotent requests only; the server may have acted already
+UNAVAILABLE_STATUSES = {502, 503, 504}
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 10.0) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def request_with_retry(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    idempotent: bool = True,
+    max_retries: int = 3,
+    **kwargs,
+) -> httpx.Response:
+    """Send a request, retrying transient failures with jittered backoff
+
+    Connection failures and 429s are retried for every request. Timeouts
+    and 502/503/504 are only retried when the request is idempotent. The
+    last response is returned as-is, so callers still check its status.
+    """
+    for attempt in range(max_retries + 1):
+        delay = backoff_delay(attempt)
+        try:
+            response = await client.request(method, url, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+            if attempt == max_retries:
+                raise
+        except httpx.TransportError:
+            if not idempotent or attempt == max_retries:
+                raise
+        else:
+            retryable = response.status_code in THROTTLED_STATUSES or (
+                idempotent and response.status_code in UNAVAILABLE_STATUSES
+            )
+            if not retryable or attempt == max_retries:
+                return response
+            delay = max(delay, retry_after_seconds(response) or 0.0)
+        
+        await asyncio.sleep(delay)
@@ -0,0 +1,163 @@
+import json
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import orjson
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import insert_ignoring_conflicts, upsert
+from ..models import NewsletterDraft, NewsletterFragment
+from ..queries import newsletter_related_query, weekly_newsletter_query
+from .beehiiv import BeehiivService
+from .blob_store import blob_key, get_blob_store
+
+NEWSLETTER_EPISODES = 10
+# Each issue covers the episodes processed in the week before it is built
+NEWSLETTER_PERIOD = timedelta(days=7)
+# Fragments of episodes this far out of the newsletter window are dropped
+FRAGMENT_RETENTION = timedelta(days=14)
+# How long a refresh may hold the draft before another one may take it over
+DRAFT_REFRESH_LEASE = timedelta(minutes=5)
+
+
+def newsletter_entries(db: Session, since: datetime) -> List[Dict]:
+    """The issue's episodes in order, each with the inputs of its section;
+    summaries are referenced by key, not read"""
+    rows = db.execute(weekly_newsletter_query(since, limit=NEWSLETTER_EPISODES)).all()
+    related = defaultdict(list)
+    for link in db.execute(newsletter_related_query(
+        [row.id for row in rows],
+        per_episode=settings.newsletter_related_per_episode,
+        max_score=settings.related_duplicate_score,
+    )):
+        related[link.episode_id].append({
+            'podcast_name': link.podcast_name,
+            'title': link.title,
+            'audio_url': link.audio_url,
+        })
+    return [
+        {
+            'id': row.id,
+            'podcast_name': row.podcast_name,
+            'title': row.title,
+            'audio_url': row.audio_url,
+            'summary_key': row.summary_key,
+            'related': related[row.id],
+        }
+        for row in rows
+    ]
+
+
+def inputs_hash(entry: Dict) -> str:
+    """Changes whenever anything shown in the episode's section changes"""
+    return blob_key(orjson.dumps(entry, option=orjson.OPT_SORT_KEYS))
+
+
+def open_draft(db: Session) -> NewsletterDraft:
+    """The unpublished draft, started when there is none; the unique
+    is_open index leaves racing starts with one draft"""
+    statement = select(NewsletterDraft).where(NewsletterDraft.is_open == True)
+    draft = db.scalars(statement).first()
+    if draft is None:
+        db.execute(insert_ignoring_conflicts(
+            NewsletterDraft, [{'is_open': True, 'episode_count': 0}], index_elements=['is_open'],
+        ))
+        draft = db.scalars(statement).one()
+    return draft
+
+
+def lock_draft(db: Session, wait_seconds: float = 0) -> Optional[NewsletterDraft]:
+    """The open draft, leased to this caller until it commits the refresh
+    (or DRAFT_REFRESH_LEASE passes); None if another refresh holds it for
+    longer than `wait_seconds`
+    
+    Refreshes run from Beat and after every podcast run, so they overlap.
+    The conditional UPDATE lets one of them through at a time.
+    """
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        draft = open_draft(db)
+        now = datetime.now(timezone.utc)
+        claimed = db.execute(
+            update(NewsletterDraft)
+            .where(
+                NewsletterDraft.id == draft.id,
+                or_(NewsletterDraft.refreshing_until.is_(None), NewsletterDraft.refreshing_until < now),
+            )
+            .values(refreshing_until=now + DRAFT_REFRESH_LEASE)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return draft
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(1)
+
+
+def refresh_draft(db: Session, draft: NewsletterDraft, now: datetime) -> Tuple[NewsletterDraft, int]:
+    """Bring the draft (leased with lock_draft) up to date and release it;
+    returns it with the number of episode sections that had to be rendered
+    
+    Sections are rendered only for episodes that are new to the draft or
+    whose title, summary or related episodes changed; the rest come from
+    the fragment cache. The caller commits.
+    """
+    store = get_blob_store()
+    entries = newsletter_entries(db, now - NEWSLETTER_PERIOD)
+    cached = {
+        row.episode_id: (row.inputs_hash, row.fragment_key)
+        for row in db.execute(
+            select(NewsletterFragment.episode_id, NewsletterFragment.inputs_hash, NewsletterFragment.fragment_key)
+            .where(NewsletterFragment.episode_id.in_([entry['id'] for entry in entries]))
+        )
+    }
+    
+    fragments = store.get_texts(fragment_key for _, fragment_key in cached.values())
+    stale = []
+    for entry in entries:
+        entry_hash = inputs_hash(entry)
+        cached_hash, fragment_key = cached.get(entry['id'], (None, None))
+        if cached_hash != entry_hash or fragment_key not in fragments:
+            stale.append((entry, entry_hash))
+    
+    summaries = store.get_texts(entry['summary_key'] for entry, _ in stale)
+    rows = []
+    for entry, entry_hash in stale:
+        html = BeehiivService.format_episode_fragment(
+            dict(entry, summary_mandarin=summaries.get(entry['summary_key'], ''))
+        )
+        fragment_key = store.put_text(html)
+        fragments[fragment_key] = html
+        cached[entry['id']] = (entry_hash, fragment_key)
+        rows.append({'episode_id': entry['id'], 'inputs_hash': entry_hash, 'fragment_key': fragment_key, 'updated_at': now})
+    if rows:
+        db.execute(upsert(
+            NewsletterFragment, rows, index_elements=['episode_id'],
+            update_columns=['inputs_hash', 'fragment_key', 'updated_at'],
+        ))
+    
+    content_key = store.put_text(BeehiivService.assemble_newsletter(
+        fragments[cached[entry['id']][1]] for entry in entries
+    ))
+    if content_key != draft.content_key:
+        draft.content_key = content_key
+        draft.episode_ids = json.dumps([entry['id'] for entry in entries])
+        draft.episode_count = len(entries)
+        draft.updated_at = now
+    draft.refreshing_until = None
+    return draft, len(stale)
+
+
+def finish_draft(db: Session, draft: NewsletterDraft, newsletter_id: Optional[int], now: datetime):
+    """Mark the draft published; the next refresh starts the next issue"""
+    draft.published_at = now
+    draft.newsletter_id = newsletter_id
+    draft.is_open = None
+    draft.refreshing_until = None
+    db.execute(
+        delete(NewsletterFragment)
+        .where(NewsletterFragment.updated_at < now - FRAGMENT_RETENTION)
+    )
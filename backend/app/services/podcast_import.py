@@ -0,0 +1,146 @@
+import asyncio
+import csv
+import io
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+import anyio
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import insert_ignoring_conflicts
+from ..models import Podcast
+from .feed_fetcher import FeedError, FeedFetcher
+
+
+IMPORT_CREATED = "created"
+IMPORT_EXISTS = "exists"
+IMPORT_FAILED = "failed"
+
+CSV_URL_COLUMNS = ("rss_url", "xmlurl", "url", "feed", "feed_url")
+
+
+class CatalogError(Exception):
+    """The uploaded catalog couldn't be read as OPML or CSV"""
+
+
+def parse_opml(content: bytes) -> List[Dict]:
+    """Feeds of an OPML subscription list, including nested outlines"""
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError as e:
+        raise CatalogError(f"Invalid OPML: {e}")
+    
+    feeds = []
+    for outline in root.iter("outline"):
+        rss_url = (outline.get("xmlUrl") or outline.get("xmlurl") or "").strip()
+        if rss_url:
+            feeds.append({"rss_url": rss_url, "name": outline.get("title") or outline.get("text")})
+    return feeds
+
+
+def parse_csv(content: bytes) -> List[Dict]:
+    """Feeds of a CSV with a header row: an RSS URL column and optional `name`"""
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+    url_column = next((columns[name] for name in CSV_URL_COLUMNS if name in columns), None)
+    if url_column is None:
+        raise CatalogError(f"CSV needs one of these columns: {', '.join(CSV_URL_COLUMNS)}")
+    name_column = columns.get("name") or columns.get("title")
+    
+    feeds = []
+    for row in reader:
+        rss_url = (row.get(url_column) or "").strip()
+        name = (row.get(name_column) or "").strip() if name_column else ""
+        if rss_url:
+            feeds.append({"rss_url": rss_url, "name": name or None})
+    return feeds
+
+
+def parse_catalog(content: bytes, filename: Optional[str] = None) -> List[Dict]:
+    """OPML or CSV, by file extension or else by sniffing; duplicates dropped"""
+    is_opml = filename.lower().endswith((".opml", ".xml")) if filename else content.lstrip().startswith(b"<")
+    feeds = parse_opml(content) if is_opml else parse_csv(content)
+    
+    unique = {}
+    for feed in feeds:
+        unique.setdefault(feed["rss_url"], feed)
+    return list(unique.values())
+
+
+async def fetch_catalog_metadata(feeds: List[Dict], fetcher: FeedFetcher,
+                                 concurrency: Optional[int] = None) -> List[Dict]:
+    """Fetch channel metadata for every feed concurrently, at most
+    `concurrency` at a time; each result carries either metadata or an error"""
+    semaphore = asyncio.Semaphore(concurrency or settings.feed_import_concurrency)
+    
+    async def fetch(feed: Dict) -> Dict:
+        async with semaphore:
+            try:
+                return {**feed, "metadata": await fetcher.fetch_channel(feed["rss_url"])}
+            except FeedError as e:
+                return {**feed, "error": str(e)}
+    
+    return await asyncio.gather(*(fetch(feed) for feed in feeds))
+
+
+def existing_rss_urls(db: Session, rss_urls: List[str]) -> set:
+    return set(db.execute(select(Podcast.rss_url).where(Podcast.rss_url.in_(rss_urls))).scalars())
+
+
+def save_catalog(db: Session, fetched: List[Dict]) -> List[Dict]:
+    """Insert every validated feed in one transaction; per-feed results"""
+    results = []
+    rows = []
+    for feed in fetched:
+        if "error" in feed:
+            results.append({"rss_url": feed["rss_url"], "status": IMPORT_FAILED, "error": feed["error"]})
+            continue
+        metadata = feed["metadata"]
+        rows.append({
+            "name": feed.get("name") or metadata["title"] or "Unknown Podcast",
+            "description": metadata["description"],
+            "rss_url": feed["rss_url"],
+            "cover_image_url": metadata["cover_image_url"],
+            "is_active": True,
+        })
+    
+    created = {}
+    if rows:
+        # Podcasts added while the feeds were being fetched lose quietly
+        created = dict(db.execute(
+            insert_ignoring_conflicts(Podcast, rows, index_elements=["rss_url"])
+            .returning(Podcast.rss_url, Podcast.id)
+        ).all())
+    db.commit()
+    
+    for row in rows:
+        podcast_id = created.get(row["rss_url"])
+        results.append({
+            "rss_url": row["rss_url"],
+            "status": IMPORT_CREATED if podcast_id else IMPORT_EXISTS,
+            "podcast_id": podcast_id,
+            "name": row["name"],
+        })
+    return results
+
+
+async def import_catalog(db: Session, feeds: List[Dict], fetcher: FeedFetcher,
+                         concurrency: Optional[int] = None) -> List[Dict]:
+    """Add every new feed of a parsed catalog; results follow catalog order
+    
+    Feeds already in the database are skipped without being fetched; the
+    rest are validated concurrently and inserted together.
+    """
+    if not feeds:
+        return []
+    
+    existing = await anyio.to_thread.run_sync(existing_rss_urls, db, [feed["rss_url"] for feed in feeds])
+    new_feeds = [feed for feed in feeds if feed["rss_url"] not in existing]
+    
+    fetched = await fetch_catalog_metadata(new_feeds, fetcher, concurrency)
+    saved = await anyio.to_thread.run_sync(save_catalog, db, fetched)
+    
+    results = {result["rss_url"]: result for result in saved}
+    for rss_url in existing:
+        results[rss_url] = {"rss_url": rss_url, "status": IMPORT_EXISTS}
+    return [results[feed["rss_url"]] for feed in feeds]
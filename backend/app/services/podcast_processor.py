@@ -1,85 +1,198 @@
+import asyncio
 import os
 import tempfile
 import httpx
-from openai import OpenAI
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from ..config import settings
+from ..metrics import observe_external
+from .transcription import Segment, get_transcription_engine
+
+
+SUMMARY_MODEL = "gpt-4-turbo-preview"
+# Summaries are written in English once, then translated per language
+MANDARIN = "zh"
+LANGUAGE_NAMES = {
+    "zh": "Simplified Chinese (Mandarin)",
+    "zh-Hant": "Traditional Chinese",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "pt": "Portuguese",
+}
+
+
+def summary_languages() -> List[str]:
+    """Configured translation targets; Mandarin always comes first, the
+    newsletter and the episode API are built from it"""
+    languages = [MANDARIN]
+    for language in settings.summary_languages.split(","):
+        language = language.strip()
+        if language and language not in languages:
+            languages.append(language)
+    return languages
+
+
+def summary_chat_request(transcript: str, episode_title: str) -> Dict:
+    """Chat completion parameters for one episode's English summary, shared
+    by the per-episode call and Batch API jobs"""
+    prompt = f"""
+Please analyze this podcast transcript and create a concise summary in English (300-400 words) that captures the key points, main arguments, and important insights.
+
+Episode Title: {episode_title}
+
+Transcript:
+{transcript[:8000]}...  # Truncate for API limits
+
+Please format your response exactly as follows:
+ENGLISH_SUMMARY:
+[Your English summary here]
+"""
+    return {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are a professional podcast summarizer."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 1000,
+    }
+
+
+def translation_chat_request(summary: str, language: str) -> Dict:
+    """Chat completion parameters for translating a summary into one language"""
+    language_name = LANGUAGE_NAMES.get(language, language)
+    prompt = f"""
+Translate this podcast summary to {language_name}, ensuring the translation is natural and culturally appropriate. Reply with the translation only.
+
+Summary:
+{summary}
+"""
+    return {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": "You are a professional podcast translator."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.3,
+        "max_tokens": 2000,
+    }
+
+
+def extract_english_summary(full_response: str) -> str:
+    """The summary part of a summary response"""
+    summary = full_response.split("ENGLISH_SUMMARY:", 1)[-1].strip()
+    if not summary:
+        raise Exception("Failed to extract English summary from response")
+    return summary
 
 
 class PodcastProcessor:
+    """Clients are built on first use: a download worker never pays for the
+    OpenAI SDK, and nothing needs OPENAI_API_KEY until it calls the API"""
+    
     def __init__(self):
-        self.openai_client = OpenAI(api_key=settings.openai_api_key)
-        self.http_client = httpx.Client(timeout=httpx.Timeout(300.0), follow_redirects=True)
+        self._openai_client = None
+        self._http_client = None
     
-    async def download_audio(self, audio_url: str) -> str:
-        """Download audio file to temporary location"""
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            if not settings.openai_api_key:
+                raise Exception("OPENAI_API_KEY is not configured")
+            from openai import OpenAI
+            self._openai_client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+        return self._openai_client
+    
+    def async_openai_client(self):
+        """A new client for concurrent translations, to be used with `async
+        with` inside one coroutine: its connections belong to the event loop
+        that opened them, and tasks run each call on a fresh one"""
+        if not settings.openai_api_key:
+            raise Exception("OPENAI_API_KEY is not configured")
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+    
+    @property
+    def http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(timeout=httpx.Timeout(300.0), follow_redirects=True)
+        return self._http_client
+    
+    async def download_audio(self, audio_url: str, dest_dir: Optional[str] = None) -> str:
+        """Download audio file to a temporary location (or into dest_dir)"""
         try:
-            response = self.http_client.get(audio_url)
-            response.raise_for_status()
+            if dest_dir:
+                os.makedirs(dest_dir, exist_ok=True)
             
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-                tmp_file.write(response.content)
-                return tmp_file.name
+            # Stream to disk so long episodes don't sit in worker memory
+            with observe_external("audio_host", "download"), self.http_client.stream("GET", audio_url) as response:
+                response.raise_for_status()
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3', dir=dest_dir) as tmp_file:
+                    for chunk in response.iter_bytes(chunk_size=1024 * 1024):
+                        tmp_file.write(chunk)
+                    return tmp_file.name
         except Exception as e:
             raise Exception(f"Failed to download audio: {str(e)}")
     
     async def transcribe_audio(self, audio_file_path: str) -> str:
-        """Transcribe audio using OpenAI Whisper API"""
+        """Transcribe audio with the configured transcription engine"""
         try:
-            with open(audio_file_path, 'rb') as audio_file:
-                transcript = self.openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="en"
-                )
-            return transcript.text
+            return get_transcription_engine().transcribe_text(audio_file_path)
         except Exception as e:
             raise Exception(f"Failed to transcribe audio: {str(e)}")
     
-    async def generate_summary_and_translate(self, transcript: str, episode_title: str) -> str:
-        """Generate English summary and translate to Mandarin"""
+    async def transcribe_segments(self, audio_file_path: str) -> List[Segment]:
+        """Transcribe audio as timestamped (start, end, text) segments"""
         try:
-            prompt = f"""
-Please analyze this podcast transcript and perform two tasks:
-
-1. Create a concise summary in English (300-400 words) that captures the key points, main arguments, and important insights.
-2. Translate the summary to Simplified Chinese (Mandarin), ensuring the translation is natural and culturally appropriate.
-
-Episode Title: {episode_title}
-
-Transcript:
-{transcript[:8000]}...  # Truncate for API limits
-
-Please format your response exactly as follows:
-ENGLISH_SUMMARY:
-[Your English summary here]
-
-中文摘要：
-[Your Chinese translation here]
-"""
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": "You are a professional podcast summarizer and translator."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            
-            # Extract the Mandarin summary
-            full_response = response.choices[0].message.content
-            if "中文摘要：" in full_response:
-                mandarin_summary = full_response.split("中文摘要：")[1].strip()
-                return mandarin_summary
-            else:
-                raise Exception("Failed to extract Mandarin summary from response")
-                
+            return get_transcription_engine().transcribe(audio_file_path)
+        except Exception as e:
+            raise Exception(f"Failed to transcribe audio: {str(e)}")
+    
+    async def generate_summary(self, transcript: str, episode_title: str) -> str:
+        """Generate the English summary every translation is made from"""
+        try:
+            with observe_external("openai", "chat"):
+                response = self.openai_client.chat.completions.create(
+                    **summary_chat_request(transcript, episode_title)
+                )
+            return extract_english_summary(response.choices[0].message.content)
         except Exception as e:
             raise Exception(f"Failed to generate summary: {str(e)}")
     
+    async def translate_summary(self, client, summary: str, language: str) -> str:
+        """Translate a summary into one language with an async_openai_client()"""
+        try:
+            with observe_external("openai", "translation"):
+                response = await client.chat.completions.create(
+                    **translation_chat_request(summary, language)
+                )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            raise Exception(f"Failed to translate summary to {language}: {str(e)}")
+    
+    async def translate_summaries(self, jobs: List[Tuple[str, str]]) -> List[Union[str, Exception]]:
+        """Translate (summary, language) pairs concurrently, at most
+        TRANSLATION_CONCURRENCY at a time; a failed translation is returned
+        as its exception so the others are kept"""
+        semaphore = asyncio.Semaphore(settings.translation_concurrency)
+        
+        async with self.async_openai_client() as client:
+            async def translate(summary: str, language: str) -> str:
+                async with semaphore:
+                    return await self.translate_summary(client, summary, language)
+            
+            return await asyncio.gather(
+                *(translate(summary, language) for summary, language in jobs), return_exceptions=True
+            )
+    
+    async def generate_summary_and_translate(self, transcript: str, episode_title: str) -> str:
+        """Generate English summary and translate to Mandarin"""
+        summary = await self.generate_summary(transcript, episode_title)
+        async with self.async_openai_client() as client:
+            return await self.translate_summary(client, summary, MANDARIN)
+    
     async def process_episode(self, episode_data: Dict) -> Optional[str]:
         """Process a single podcast episode"""
         audio_file_path = None
@@ -108,5 +221,5 @@ ENGLISH_SUMMARY:
                 os.remove(audio_file_path)
     
     def __del__(self):
-        if hasattr(self, 'http_client'):
-            self.http_client.close()
\ No newline at end of file
+        if getattr(self, '_http_client', None) is not None:
+            self._http_client.close()
\ No newline at end of file
@@ -0,0 +1,302 @@
+import os
+import re
+import tempfile
+import zlib
+from collections import Counter
+from typing import Iterable, List, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Episode, RelatedEpisode
+from .blob_store import get_blob_store
+
+
+# Terms are hashed into a fixed number of columns, so there is no vocabulary
+# to persist or grow, and new episodes never shift existing columns
+N_FEATURES = 1 << 20
+
+WORD_RE = re.compile(r"[a-z][a-z0-9']{2,}")
+CJK_RE = re.compile(r"[\u4e00-\u9fff]+")
+STOP_WORDS = frozenset("""
+    about after again all also and any are because been before being but can could did does doing
+    don't down each even for from get going got had has have having her here him his how i'm into
+    it's its just know like lot make more most much not now off one only other our out over really
+    right said say see she should some something than that that's the their them then there these
+    they thing things think this those through too very want was way well were what when where
+    which while who why will with would yeah yes you you're your
+""".split())
+
+# Rows of the similarity matrix computed at once: CHUNK_ROWS x indexed episodes floats
+CHUNK_ROWS = 64
+
+
+def tokenize(text: str) -> List[str]:
+    """English words, and character bigrams for Chinese (which has no spaces)"""
+    text = text.lower()
+    tokens = [word for word in WORD_RE.findall(text) if word not in STOP_WORDS]
+    for run in CJK_RE.findall(text):
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def term_frequencies(text: str, max_terms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(hashed term columns, sublinear term frequencies) of one document,
+    keeping its `max_terms` most frequent terms"""
+    token_counts = Counter(tokenize(text))
+    if not token_counts:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    
+    hashed = np.fromiter(
+        (zlib.crc32(token.encode("utf-8")) for token in token_counts), dtype=np.uint32, count=len(token_counts)
+    ) % N_FEATURES
+    columns, inverse = np.unique(hashed, return_inverse=True)
+    counts = np.bincount(inverse, weights=np.fromiter(token_counts.values(), dtype=np.float64))
+    if len(columns) > max_terms:
+        # Ties broken by column, so near-identical texts keep the same terms
+        keep = np.sort(np.lexsort((columns, -counts))[:max_terms])
+        columns, counts = columns[keep], counts[keep]
+    return columns.astype(np.int32), (1 + np.log(counts)).astype(np.float32)
+
+
+def tf_matrix(texts: Iterable[str], max_terms: int) -> sparse.csr_matrix:
+    """One sparse row of term frequencies per document"""
+    rows = [term_frequencies(text, max_terms) for text in texts]
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(columns) for columns, _ in rows])
+    indices = np.concatenate([columns for columns, _ in rows]) if rows else np.empty(0, dtype=np.int32)
+    data = np.concatenate([weights for _, weights in rows]) if rows else np.empty(0, dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), N_FEATURES))
+
+
+def top_k(scores: np.ndarray, ids: np.ndarray, k: int, min_score: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row, the `k` best (ids, scores) in descending order; slots without
+    a candidate scoring at least `min_score` hold id -1 and score 0"""
+    out_ids = np.full((scores.shape[0], k), -1, dtype=np.int64)
+    out_scores = np.zeros((scores.shape[0], k), dtype=np.float32)
+    width = min(k, scores.shape[1])
+    if width == 0:
+        return out_ids, out_scores
+    
+    best = np.argpartition(-scores, width - 1, axis=1)[:, :width]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    best_ids = np.take_along_axis(ids, best, axis=1)
+    
+    keep = best_scores >= min_score
+    out_ids[:, :width] = np.where(keep, best_ids, -1)
+    out_scores[:, :width] = np.where(keep, best_scores, 0)
+    return out_ids, out_scores
+
+
+class RelatedIndex:
+    """TF-IDF vectors of the indexed episodes and each one's nearest neighbours
+    
+    Only raw term frequencies are stored; IDF weights are derived from them
+    whenever scores are computed, so they follow the corpus as it grows.
+    Adding episodes scores them against everything indexed and merges them
+    into the neighbour lists of earlier episodes, so neighbour lists stay
+    exact except for the IDF drift of older scores, which a rebuild clears.
+    """
+    
+    def __init__(self, ids: np.ndarray, tf: sparse.csr_matrix,
+                 neighbor_ids: np.ndarray, neighbor_scores: np.ndarray):
+        self.ids = ids
+        self.tf = tf
+        self.neighbor_ids = neighbor_ids
+        self.neighbor_scores = neighbor_scores
+    
+    @classmethod
+    def empty(cls, top_k: int) -> "RelatedIndex":
+        return cls(
+            np.empty(0, dtype=np.int64),
+            sparse.csr_matrix((0, N_FEATURES), dtype=np.float32),
+            np.empty((0, top_k), dtype=np.int64),
+            np.empty((0, top_k), dtype=np.float32),
+        )
+    
+    @classmethod
+    def load(cls, path: str, top_k: int) -> "RelatedIndex":
+        """The index saved at `path`, or an empty one"""
+        if not os.path.exists(path):
+            return cls.empty(top_k)
+        with np.load(path) as saved:
+            tf = sparse.csr_matrix(
+                (saved["tf_data"], saved["tf_indices"], saved["tf_indptr"]),
+                shape=(len(saved["ids"]), N_FEATURES),
+            )
+            return cls(saved["ids"], tf, saved["neighbor_ids"], saved["neighbor_scores"])
+    
+    def save(self, path: str):
+        """Write aside and rename, so a reader never loads a partial index"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    ids=self.ids,
+                    tf_data=self.tf.data,
+                    tf_indices=self.tf.indices,
+                    tf_indptr=self.tf.indptr,
+                    neighbor_ids=self.neighbor_ids,
+                    neighbor_scores=self.neighbor_scores,
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    @property
+    def top_k(self) -> int:
+        return self.neighbor_ids.shape[1]
+    
+    def vectors(self) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF rows of every indexed episode"""
+        document_frequency = np.bincount(self.tf.indices, minlength=N_FEATURES)
+        idf = (np.log((1 + len(self.ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        
+        vectors = self.tf.copy()
+        vectors.data *= idf[vectors.indices]
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        vectors.data /= np.repeat(norms, np.diff(vectors.indptr)).astype(np.float32)
+        return vectors
+    
+    def add(self, ids: Sequence[int], tf: sparse.csr_matrix, min_score: float) -> np.ndarray:
+        """Index new episodes; returns the ids whose neighbour lists changed"""
+        start = len(self.ids)
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+        self.tf = sparse.vstack([self.tf, tf.astype(np.float32)], format="csr")
+        self.neighbor_ids = np.vstack([self.neighbor_ids, np.full((len(ids), self.top_k), -1, dtype=np.int64)])
+        self.neighbor_scores = np.vstack([self.neighbor_scores, np.zeros((len(ids), self.top_k), dtype=np.float32)])
+        return self._score_from(start, min_score)
+    
+    def rebuild(self, min_score: float) -> np.ndarray:
+        """Recompute every neighbour list with current IDF weights"""
+        self.neighbor_ids[:] = -1
+        self.neighbor_scores[:] = 0
+        return self._score_from(0, min_score)
+    
+    def _score_from(self, start: int, min_score: float) -> np.ndarray:
+        """Neighbour lists for rows `start:`, merged into the earlier rows'"""
+        vectors = self.vectors()
+        vectors_t = vectors.T.tocsr()
+        changed = np.zeros(len(self.ids), dtype=bool)
+        changed[start:] = True
+        
+        for chunk_start in range(start, len(self.ids), CHUNK_ROWS):
+            rows = np.arange(chunk_start, min(chunk_start + CHUNK_ROWS, len(self.ids)))
+            scores = (vectors[rows] @ vectors_t).toarray()
+            scores[np.arange(len(rows)), rows] = 0  # an episode is not its own neighbour
+            
+            ids = np.broadcast_to(self.ids, scores.shape)
+            self.neighbor_ids[rows], self.neighbor_scores[rows] = top_k(scores, ids, self.top_k, min_score)
+            
+            if start == 0:
+                continue
+            # Earlier rows only need the new candidates that beat their worst neighbour
+            candidates = scores[:, :start].T
+            best = candidates.max(axis=1)
+            improved = np.nonzero((best >= min_score) & (best > self.neighbor_scores[:start, -1]))[0]
+            if len(improved) == 0:
+                continue
+            merged_scores = np.hstack([self.neighbor_scores[improved], candidates[improved]])
+            merged_ids = np.hstack([
+                self.neighbor_ids[improved],
+                np.broadcast_to(self.ids[rows], (len(improved), len(rows))),
+            ])
+            self.neighbor_ids[improved], self.neighbor_scores[improved] = top_k(
+                merged_scores, merged_ids, self.top_k, min_score
+            )
+            changed[improved] = True
+        
+        return self.ids[changed]
+
+
+def unindexed_episode_ids(db: Session, indexed_ids: np.ndarray) -> np.ndarray:
+    """Ids of processed episodes missing from the index, in id order
+    
+    Compared against the whole id list rather than a high-water mark:
+    summarize workers commit concurrently, so an episode can commit after
+    one with a higher id has already been indexed.
+    """
+    episode_ids = np.fromiter(db.scalars(select(Episode.id)), dtype=np.int64)
+    return np.setdiff1d(episode_ids, indexed_ids)
+
+
+def episode_texts(db: Session, episode_ids: Sequence[int]) -> Tuple[List[int], List[str]]:
+    """(ids, transcript + summary texts) of the given episodes"""
+    rows = db.execute(
+        select(Episode.id, Episode.transcript_key, Episode.summary_key)
+        .where(Episode.id.in_(episode_ids))
+        .order_by(Episode.id)
+    ).all()
+    texts = get_blob_store().get_texts(
+        key for row in rows for key in (row.transcript_key, row.summary_key)
+    )
+    return [row.id for row in rows], [
+        "\n".join(texts.get(key, "") for key in (row.transcript_key, row.summary_key) if key)
+        for row in rows
+    ]
+
+
+def store_neighbors(db: Session, index: RelatedIndex, episode_ids: np.ndarray, batch_size: int = 500):
+    """Replace the related_episodes rows of the given episodes with their
+    current neighbour lists"""
+    positions = np.nonzero(np.isin(index.ids, episode_ids))[0]
+    for start in range(0, len(positions), batch_size):
+        batch = positions[start:start + batch_size]
+        db.execute(delete(RelatedEpisode).where(RelatedEpisode.episode_id.in_(index.ids[batch].tolist())))
+        rows = [
+            {"episode_id": int(index.ids[position]), "related_episode_id": int(related_id), "score": float(score)}
+            for position in batch
+            for related_id, score in zip(index.neighbor_ids[position], index.neighbor_scores[position])
+            if related_id >= 0
+        ]
+        if rows:
+            db.execute(insert(RelatedEpisode), rows)
+
+
+def update_related_index(db: Session, rebuild: bool = False) -> Tuple[int, int]:
+    """Index episodes processed since the last run (or rebuild every
+    neighbour list) and store what changed; returns (episodes added,
+    neighbour lists written)
+    
+    Neighbour rows are committed before the index file is replaced, so a
+    crash in between only makes the next run redo the same episodes.
+    """
+    path = settings.related_index_path
+    index = RelatedIndex.load(path, settings.related_top_k)
+    if index.top_k != settings.related_top_k:
+        index.neighbor_ids = np.full((len(index.ids), settings.related_top_k), -1, dtype=np.int64)
+        index.neighbor_scores = np.zeros((len(index.ids), settings.related_top_k), dtype=np.float32)
+        rebuild = True
+    
+    added = 0
+    written = 0
+    if rebuild and len(index.ids):
+        changed = index.rebuild(settings.related_min_score)
+        store_neighbors(db, index, changed)
+        db.commit()
+        index.save(path)
+        written += len(changed)
+    
+    missing = unindexed_episode_ids(db, index.ids)
+    for start in range(0, len(missing), settings.related_index_batch_size):
+        batch = missing[start:start + settings.related_index_batch_size]
+        ids, texts = episode_texts(db, batch.tolist())
+        if not ids:
+            continue
+        changed = index.add(ids, tf_matrix(texts, settings.related_max_terms), settings.related_min_score)
+        store_neighbors(db, index, changed)
+        db.commit()
+        index.save(path)
+        added += len(ids)
+        written += len(changed)
+    
+    return added, written
@@ -1,63 +1,225 @@
+import calendar
 import feedparser
+import re
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
 import httpx
+from ..metrics import observe_external
+
+
+# Analytics/redirect services that prepend themselves to enclosure URLs,
+# e.g. https://dts.podtrac.com/redirect.mp3/traffic.megaphone.fm/ABC.mp3
+TRACKING_PREFIXES = [
+    re.compile(r'^(www\.)?podtrac\.com/pts/redirect\.[a-z0-9]+/', re.I),
+    re.compile(r'^dts\.podtrac\.com/redirect\.[a-z0-9]+/', re.I),
+    re.compile(r'^(chtbl\.com|chrt\.fm)/track/[^/]+/', re.I),
+    re.compile(r'^pdst\.fm/e/', re.I),
+    re.compile(r'^op3\.dev/e(,[^/]*)?/', re.I),
+    re.compile(r'^verifi\.podscribe\.com/rss/p/', re.I),
+    re.compile(r'^pfx\.vpixl\.com/[^/]+/', re.I),
+    re.compile(r'^arttrk\.com/p/[^/]+/', re.I),
+    re.compile(r'^mgln\.ai/e/[^/]+/', re.I),
+    re.compile(r'^prfx\.byspotify\.com/e/', re.I),
+    re.compile(r'^claritaspod\.com/measure/', re.I),
+]
+
+
+def normalize_enclosure_url(url: str) -> str:
+    """Reduce an enclosure URL to a stable identity: no scheme, tracking
+    prefixes, query string or fragment"""
+    parts = urlsplit(url.strip())
+    normalized = f"{parts.netloc.lower()}{parts.path}"
+    
+    # Prefixes can be stacked, so strip until nothing matches
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in TRACKING_PREFIXES:
+            remainder = prefix.sub('', normalized, count=1)
+            if remainder != normalized:
+                normalized = re.sub(r'^https?://', '', remainder, flags=re.I)
+                host, _, path = normalized.partition('/')
+                normalized = f"{host.lower()}/{path}"
+                stripped = True
+    
+    return normalized
+
+
+def episode_guid(entry: Dict, audio_url: str) -> str:
+    """Feed GUID of an entry, falling back to its normalized enclosure URL"""
+    guid = (entry.get('id') or '').strip()
+    return guid or normalize_enclosure_url(audio_url)
+
+
+# Where the channel header ends: the first RSS <item> or Atom <entry>
+FIRST_ENTRY_PATTERN = re.compile(rb'<(?:[\w.-]+:)?(?:item|entry)[\s/>]')
+
+
+def local_name(tag: str) -> str:
+    """'{http://www.itunes.com/dtds/podcast-1.0.dtd}image' -> 'image'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_channel_metadata(content: bytes) -> Optional[Dict]:
+    """Title, description and cover image of an RSS/Atom feed
+    
+    Reads only the channel header: parsing stops at the first item, so
+    `content` may be just the start of the document. Returns None when it
+    isn't a feed.
+    """
+    parser = ElementTree.XMLPullParser(events=('start', 'end'))
+    fields = {}
+    path = []
+    root = None
+    
+    try:
+        parser.feed(content)
+        for event, element in parser.read_events():
+            name = local_name(element.tag)
+            if event == 'start':
+                if name in ('item', 'entry'):
+                    break
+                root = root or name
+                path.append(name)
+                # <itunes:image href="..."/> is an attribute, so take it on start
+                if name == 'image' and element.get('href') and path[-2:-1] == ['channel']:
+                    fields.setdefault('itunes_image', element.get('href'))
+                continue
+            
+            path.pop()
+            parent = path[-1] if path else None
+            text = (element.text or '').strip()
+            in_channel = parent == 'channel' or (parent == 'feed' and len(path) == 1)
+            if in_channel and text and name in ('title', 'description', 'subtitle', 'summary', 'logo'):
+                fields.setdefault(name, text)
+            elif name == 'url' and parent == 'image' and path[-2:-1] == ['channel'] and text:
+                fields.setdefault('image', text)
+    except ElementTree.ParseError:
+        # Not well-formed XML; let feedparser's lenient parser have a go
+        return parse_channel_metadata_leniently(content)
+    
+    if root not in ('rss', 'feed', 'RDF') or 'title' not in fields:
+        return parse_channel_metadata_leniently(content)
+    
+    return {
+        'title': fields['title'],
+        'description': fields.get('description') or fields.get('subtitle') or fields.get('summary', ''),
+        'cover_image_url': fields.get('image') or fields.get('logo') or fields.get('itunes_image'),
+    }
+
+
+def parse_channel_metadata_leniently(content: bytes) -> Optional[Dict]:
+    """feedparser fallback for feeds that aren't well-formed XML"""
+    feed = feedparser.parse(content).feed
+    if not feed or not feed.get('title'):
+        return None
+    
+    cover_image_url = None
+    if feed.get('image'):
+        cover_image_url = feed.image.get('href')
+    elif feed.get('logo'):
+        cover_image_url = feed.logo
+    
+    return {
+        'title': feed.get('title'),
+        'description': feed.get('description', feed.get('subtitle', '')),
+        'cover_image_url': cover_image_url,
+    }
+
+
+def parse_episodes(content: bytes) -> List[Dict]:
+    """Episodes with an audio enclosure, from a feed document"""
+    feed = feedparser.parse(content)
+    episodes = []
+    
+    for entry in feed.entries:
+        # Extract audio URL (usually in enclosures)
+        audio_url = None
+        if hasattr(entry, 'enclosures') and entry.enclosures:
+            for enclosure in entry.enclosures:
+                if enclosure.get('type', '').startswith('audio'):
+                    audio_url = enclosure.get('href')
+                    break
+        
+        # Parse publish date (feedparser normalizes it to a UTC struct_time)
+        publish_date = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            publish_date = datetime.fromtimestamp(
+                calendar.timegm(entry.published_parsed),
+                tz=timezone.utc
+            )
+        
+        if audio_url:
+            episodes.append({
+                'title': entry.get('title', 'Untitled'),
+                'description': entry.get('description', ''),
+                'audio_url': audio_url,
+                'publish_date': publish_date,
+                'guid': episode_guid(entry, audio_url),
+            })
+    
+    return episodes
+
+
+def recent_only(episodes: List[Dict], days: int = 7) -> List[Dict]:
+    """Episodes published in the last N days"""
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+    return [
+        episode for episode in episodes
+        if episode['publish_date'] and episode['publish_date'] > cutoff_date
+    ]
+
+
+@dataclass
+class FeedResponse:
+    """A feed fetch; content is empty when the server answered 304"""
+    not_modified: bool
+    content: bytes = b''
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 
 class RSSParser:
     def __init__(self):
         self.client = httpx.Client(timeout=httpx.Timeout(30.0), follow_redirects=True)
     
+    def fetch_feed(self, rss_url: str, etag: Optional[str] = None,
+                   last_modified: Optional[str] = None) -> FeedResponse:
+        """GET a feed, conditionally when validators from the last fetch are given"""
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        
+        with observe_external("feed_host", "fetch"):
+            response = self.client.get(rss_url, headers=headers)
+        if response.status_code == 304:
+            return FeedResponse(not_modified=True, etag=etag, last_modified=last_modified)
+        response.raise_for_status()
+        
+        return FeedResponse(
+            not_modified=False,
+            content=response.content,
+            etag=response.headers.get('etag'),
+            last_modified=response.headers.get('last-modified'),
+        )
+    
     def parse_feed(self, rss_url: str) -> List[Dict]:
         """Parse RSS feed and return list of episodes"""
         try:
-            feed = feedparser.parse(rss_url)
-            episodes = []
-            
-            for entry in feed.entries:
-                # Extract audio URL (usually in enclosures)
-                audio_url = None
-                if hasattr(entry, 'enclosures') and entry.enclosures:
-                    for enclosure in entry.enclosures:
-                        if enclosure.get('type', '').startswith('audio'):
-                            audio_url = enclosure.get('href')
-                            break
-                
-                # Parse publish date
-                publish_date = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    import time
-                    publish_date = datetime.fromtimestamp(
-                        time.mktime(entry.published_parsed),
-                        tz=timezone.utc
-                    )
-                
-                if audio_url:
-                    episodes.append({
-                        'title': entry.get('title', 'Untitled'),
-                        'description': entry.get('description', ''),
-                        'audio_url': audio_url,
-                        'publish_date': publish_date,
-                        'guid': entry.get('id', audio_url),
-                    })
-            
-            return episodes
+            return parse_episodes(self.fetch_feed(rss_url).content)
         except Exception as e:
             print(f"Error parsing RSS feed {rss_url}: {str(e)}")
             return []
     
     def get_recent_episodes(self, rss_url: str, days: int = 7) -> List[Dict]:
         """Get episodes published in the last N days"""
-        episodes = self.parse_feed(rss_url)
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-        
-        recent_episodes = []
-        for episode in episodes:
-            if episode['publish_date'] and episode['publish_date'] > cutoff_date:
-                recent_episodes.append(episode)
-        
-        return recent_episodes
+        return recent_only(self.parse_feed(rss_url), days)
     
     def __del__(self):
         if hasattr(self, 'client'):
-            self.client.close()
\ No newline at end of file
+            self.client.close()
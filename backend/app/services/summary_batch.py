@@ -0,0 +1,116 @@
+import httpx
+import orjson
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+from ..metrics import observe_external
+from .http import request_with_retry
+from .podcast_processor import extract_english_summary, summary_chat_request
+
+
+# Path of the endpoint every request in a job goes to, as the Batch API expects it
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+
+class BatchAPIError(Exception):
+    """The Batch API rejected a request"""
+
+
+def create_openai_client() -> httpx.AsyncClient:
+    """Client for the OpenAI REST API; the pinned SDK predates the Batch API"""
+    return httpx.AsyncClient(
+        base_url=settings.openai_base_url,
+        headers={"Authorization": f"Bearer {settings.openai_api_key}"},
+        timeout=httpx.Timeout(120.0, connect=5.0),
+    )
+
+
+def batch_request(processing_id: int, transcript: str, episode_title: str) -> Dict:
+    """One line of a job's input file; custom_id carries the pipeline row"""
+    return {
+        "custom_id": str(processing_id),
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": summary_chat_request(transcript, episode_title),
+    }
+
+
+def parse_batch_output(content: bytes) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+    """Processing id -> (English summary, error) from an output or error file"""
+    results = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        result = orjson.loads(line)
+        processing_id = int(result["custom_id"])
+        response = result.get("response") or {}
+        if result.get("error") or response.get("status_code") != 200:
+            error = result.get("error") or (response.get("body") or {}).get("error") or response.get("status_code")
+            results[processing_id] = (None, str(error))
+            continue
+        try:
+            content_text = response["body"]["choices"][0]["message"]["content"]
+            results[processing_id] = (extract_english_summary(content_text), None)
+        except Exception as e:
+            results[processing_id] = (None, str(e))
+    return results
+
+
+class SummaryBatchClient:
+    """Files and batch jobs of the Batch API"""
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._owns_client = client is None
+        self.client = client or create_openai_client()
+    
+    async def aclose(self):
+        if self._owns_client:
+            await self.client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def _json(self, operation: str, method: str, url: str, idempotent: bool, **kwargs) -> Dict:
+        with observe_external("openai", operation):
+            response = await request_with_retry(self.client, method, url, idempotent=idempotent, **kwargs)
+        if response.status_code >= 400:
+            raise BatchAPIError(f"{operation} failed ({response.status_code}): {response.text[:500]}")
+        return response.json()
+    
+    async def submit(self, requests: List[Dict]) -> Dict:
+        """Upload the requests as a JSONL file and start a job on it"""
+        content = b"\n".join(orjson.dumps(request) for request in requests) + b"\n"
+        uploaded = await self._json(
+            "batch_upload", "POST", "/files", idempotent=False,
+            data={"purpose": "batch"},
+            files={"file": ("summaries.jsonl", content, "application/jsonl")},
+        )
+        return await self._json(
+            "batch_create", "POST", "/batches", idempotent=False,
+            json={
+                "input_file_id": uploaded["id"],
+                "endpoint": BATCH_ENDPOINT,
+                "completion_window": BATCH_COMPLETION_WINDOW,
+            },
+        )
+    
+    async def get_batch(self, batch_id: str) -> Dict:
+        return await self._json("batch_status", "GET", f"/batches/{batch_id}", idempotent=True)
+    
+    async def file_content(self, file_id: str) -> bytes:
+        with observe_external("openai", "batch_download"):
+            response = await request_with_retry(self.client, "GET", f"/files/{file_id}/content")
+        if response.status_code >= 400:
+            raise BatchAPIError(f"batch_download failed ({response.status_code}): {response.text[:500]}")
+        return response.content
+    
+    async def results(self, batch: Dict) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+        """Results of a finished job, from its output and error files"""
+        results = {}
+        for file_key in ("error_file_id", "output_file_id"):
+            if batch.get(file_key):
+                results.update(parse_batch_output(await self.file_content(batch[file_key])))
+        return results
@@ -0,0 +1,137 @@
+import os
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from ..config import settings
+from ..metrics import observe_external
+
+# (start, end, text), times in seconds from the start of the audio
+Segment = Tuple[float, float, str]
+
+
+class TranscriptionEngine(ABC):
+    """Turns an audio file into English text with timestamps
+    
+    Engines are built once per process (see get_transcription_engine) and
+    load their clients or models on first use.
+    """
+    
+    name = ""
+    # Model the engine is configured with, for recording alongside transcripts
+    model_name = ""
+    # Largest file a single request takes; callers split bigger files
+    max_upload_bytes: Optional[int] = None
+    # USD per audio minute billed by the provider, for comparing engines
+    cost_per_minute = 0.0
+    
+    @abstractmethod
+    def transcribe(self, audio_path: str, language: str = "en") -> List[Segment]:
+        ...
+    
+    def transcribe_text(self, audio_path: str, language: str = "en") -> str:
+        return " ".join(text.strip() for _, _, text in self.transcribe(audio_path, language)).strip()
+
+
+class OpenAITranscriptionEngine(TranscriptionEngine):
+    """OpenAI's hosted Whisper (whisper-1)"""
+    
+    name = "openai"
+    max_upload_bytes = 25 * 1024 * 1024
+    cost_per_minute = 0.006
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "whisper-1"):
+        self.api_key = api_key
+        self.model_name = model
+        self._client = None
+    
+    @property
+    def client(self):
+        if self._client is None:
+            api_key = self.api_key or settings.openai_api_key
+            if not api_key:
+                raise Exception("OPENAI_API_KEY is not configured")
+            from openai import OpenAI
+            self._client = OpenAI(api_key=api_key, base_url=settings.openai_base_url)
+        return self._client
+    
+    def transcribe(self, audio_path: str, language: str = "en") -> List[Segment]:
+        with open(audio_path, 'rb') as audio_file, observe_external("openai", "transcription"):
+            transcript = self.client.audio.transcriptions.create(
+                model=self.model_name,
+                file=audio_file,
+                language=language,
+                response_format="verbose_json",
+            )
+        segments = []
+        for segment in transcript.segments or []:
+            if isinstance(segment, dict):
+                segments.append((segment["start"], segment["end"], segment["text"]))
+            else:
+                segments.append((segment.start, segment.end, segment.text))
+        return segments
+    
+    def transcribe_text(self, audio_path: str, language: str = "en") -> str:
+        with open(audio_path, 'rb') as audio_file, observe_external("openai", "transcription"):
+            transcript = self.client.audio.transcriptions.create(
+                model=self.model_name,
+                file=audio_file,
+                language=language,
+            )
+        return transcript.text
+
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """Whisper on this machine's CPU through faster-whisper (CTranslate2):
+    no upload limit and no per-minute bill, only cores and time"""
+    
+    name = "local"
+    
+    def __init__(self, model: str = "small.en", compute_type: str = "int8", threads: int = 0,
+                 beam_size: int = 5):
+        self.model_name = model
+        self.compute_type = compute_type
+        self.threads = threads or os.cpu_count() or 1
+        self.beam_size = beam_size
+        self._model = None
+    
+    @property
+    def model(self):
+        if self._model is None:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                raise RuntimeError("The local transcription engine needs faster-whisper: pip install faster-whisper")
+            # Downloaded into the Hugging Face cache the first time
+            self._model = WhisperModel(
+                self.model_name, device="cpu", compute_type=self.compute_type, cpu_threads=self.threads,
+            )
+        return self._model
+    
+    def transcribe(self, audio_path: str, language: str = "en") -> List[Segment]:
+        # Segments are decoded lazily; the list drives the whole transcription
+        segments, _ = self.model.transcribe(
+            audio_path, language=language, beam_size=self.beam_size, vad_filter=True,
+        )
+        return [(segment.start, segment.end, segment.text) for segment in segments]
+
+
+ENGINES = {
+    OpenAITranscriptionEngine.name: OpenAITranscriptionEngine,
+    LocalWhisperEngine.name: LocalWhisperEngine,
+}
+
+
+@lru_cache(maxsize=None)
+def get_transcription_engine(name: Optional[str] = None) -> TranscriptionEngine:
+    """The named engine, or the configured one, built on first use"""
+    name = name or settings.transcription_engine
+    if name == LocalWhisperEngine.name:
+        return LocalWhisperEngine(
+            model=settings.local_whisper_model,
+            compute_type=settings.local_whisper_compute_type,
+            threads=settings.local_whisper_threads,
+            beam_size=settings.local_whisper_beam_size,
+        )
+    if name == OpenAITranscriptionEngine.name:
+        return OpenAITranscriptionEngine()
+    raise ValueError(f"Unknown transcription engine {name!r}; expected one of {', '.join(ENGINES)}")
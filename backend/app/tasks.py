@@ -1,14 +1,35 @@
-from celery import Celery
+from celery import Celery, chain, chord, group
 from celery.schedules import crontab
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import or_, select, union, update
 from sqlalchemy.orm import Session
 from .config import settings
-from .database import SessionLocal, engine
-from .models import Podcast, Episode, Newsletter
-from .services.rss_parser import RSSParser
-from .services.podcast_processor import PodcastProcessor
+from .database import SessionLocal, engine, insert_ignoring_conflicts, track_queries
+from .models import (
+    Podcast, Episode, Newsletter, EpisodeProcessing, SubscriptionOutbox, FeedState, SummaryBatch, SummaryTranslation,
+    STAGE_PENDING, STAGE_DOWNLOADED, STAGE_TRANSCRIBED, STAGE_SUMMARIZED,
+    OUTBOX_PENDING, OUTBOX_SENT, OUTBOX_FAILED,
+    BATCH_SUBMITTING, BATCH_FAILED, BATCH_FINAL_STATUSES,
+)
+from .metrics import TRANSCRIPTION_AUDIO_SECONDS, instrument_celery, instrument_engine
+from .queries import untranslated_summaries_query
+from .services.feed_schedule import as_utc, learn_cadence, next_poll_time
+from .services.feed_refresher import FeedRefresher, FeedRequest
+from .services.rss_parser import FeedResponse, RSSParser, parse_episodes, recent_only
+from .services.podcast_processor import MANDARIN, PodcastProcessor, summary_languages
+from .services.audio_fingerprint import AudioDecodeError, annotate_transcript, load_fingerprint, plan_skips
 from .services.beehiiv import BeehiivService
+from .services.blob_store import BlobNotFound, get_blob_store
+from .services.newsletter_draft import DRAFT_REFRESH_LEASE, finish_draft, lock_draft, refresh_draft
+from .services.summary_batch import SummaryBatchClient, batch_request
+from .services.related_index import update_related_index as update_index
+from collections import defaultdict
+from typing import Optional
 import asyncio
+import httpx
+import json
+import os
+import time
 
 # Initialize Celery
 celery_app = Celery(
@@ -24,67 +45,840 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    # Each pipeline stage gets its own queue so download, transcribe and
+    # summarize workers can be scaled and tuned independently
+    task_routes={
+        'app.tasks.refresh_feeds': {'queue': 'feeds'},
+        'app.tasks.download_episode': {'queue': 'download'},
+        'app.tasks.transcribe_episode': {'queue': 'transcribe'},
+        'app.tasks.summarize_episode': {'queue': 'summarize'},
+        'app.tasks.update_related_index': {'queue': 'index'},
+    },
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
     beat_schedule={
         'weekly-newsletter': {
             'task': 'app.tasks.generate_weekly_newsletter',
             'schedule': crontab(hour=8, minute=0, day_of_week=0),  # Sunday 8 AM UTC
         },
+        'refresh-newsletter-draft': {
+            'task': 'app.tasks.refresh_newsletter_draft',
+            'schedule': float(settings.newsletter_draft_refresh_seconds),
+        },
+        'flush-subscription-outbox': {
+            'task': 'app.tasks.flush_subscription_outbox',
+            'schedule': 30.0,
+        },
+        'poll-due-feeds': {
+            'task': 'app.tasks.poll_due_feeds',
+            'schedule': 60.0,
+        },
+        'submit-summary-batches': {
+            'task': 'app.tasks.submit_summary_batches',
+            'schedule': float(settings.summary_batch_poll_seconds),
+        },
+        'poll-summary-batches': {
+            'task': 'app.tasks.poll_summary_batches',
+            'schedule': float(settings.summary_batch_poll_seconds),
+        },
+        'update-related-index': {
+            'task': 'app.tasks.update_related_index',
+            'schedule': 900.0,
+        },
+        # Before the newsletter, so its related episodes use fresh IDF weights
+        'rebuild-related-index': {
+            'task': 'app.tasks.update_related_index',
+            'schedule': crontab(hour=7, minute=0, day_of_week=0),
+            'kwargs': {'rebuild': True},
+        },
     }
 )
 
+# Task runtime and queue wait per task (so per pipeline stage), DB timings
+instrument_celery(celery_app, metrics_port=settings.worker_metrics_port)
+instrument_engine(engine)
+
+# How long an episode's pipeline lease lasts: a stage renews it when it
+# starts and when it hands off, so it covers one stage's queue wait and run
+PIPELINE_LEASE_HOURS = 6
+
+# How long a flush holds claimed outbox rows before another flush may take them
+OUTBOX_LEASE_SECONDS = 300
+
+# How long a dispatched feed poll holds its feed before it is considered lost
+FEED_POLL_LEASE_SECONDS = 900
+
+# How long a summary batch may stay unsubmitted before its episodes are released
+SUMMARY_BATCH_SUBMIT_LEASE_SECONDS = 900
+
+# Episodes translated per round when backfilling a new summary language
+TRANSLATION_BACKFILL_CHUNK = 100
+
+
+def run_async(coro):
+    """Run a coroutine to completion on a fresh event loop"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class EpisodeStageTask(celery_app.Task):
+    """Base task for pipeline stages: records failures on the processing row"""
+    autoretry_for = (Exception,)
+    retry_backoff = True
+    max_retries = 3
+    
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        db = SessionLocal()
+        try:
+            state = db.get(EpisodeProcessing, args[0])
+            if state:
+                state.last_error = f"{self.name}: {exc}"
+                db.commit()
+        finally:
+            db.close()
+
+
+def unseen_episodes(db: Session, podcast_id: int, episodes: list) -> list:
+    """Drop feed entries that are already processed or in the pipeline,
+    using one set-based query for the whole feed"""
+    by_guid = {episode['guid']: episode for episode in episodes}
+    if not by_guid:
+        return []
+    
+    guids = list(by_guid)
+    audio_urls = [episode['audio_url'] for episode in by_guid.values()]
+    seen = db.execute(union(
+        select(EpisodeProcessing.guid, EpisodeProcessing.audio_url).where(
+            EpisodeProcessing.podcast_id == podcast_id,
+            EpisodeProcessing.guid.in_(guids)
+        ),
+        # Episodes saved before GUIDs were tracked only match on audio_url
+        select(Episode.guid, Episode.audio_url).where(
+            Episode.podcast_id == podcast_id,
+            or_(Episode.guid.in_(guids), Episode.audio_url.in_(audio_urls))
+        ),
+    )).all()
+    seen_guids = {guid for guid, _ in seen}
+    seen_urls = {audio_url for _, audio_url in seen}
+    
+    return [
+        episode for guid, episode in by_guid.items()
+        if guid not in seen_guids and episode['audio_url'] not in seen_urls
+    ]
+
+
+def feed_state_for(db: Session, podcast_id: int) -> FeedState:
+    """The podcast's FeedState, created on first use"""
+    db.execute(insert_ignoring_conflicts(FeedState, [
+        {'podcast_id': podcast_id, 'polls': 0, 'not_modified_polls': 0}
+    ], index_elements=['podcast_id']))
+    return db.get(FeedState, podcast_id)
+
+
+def record_feed_poll(state: FeedState, feed: Optional[FeedResponse], episodes: Optional[list],
+                     error: Optional[str], now: datetime):
+    """Update polling state from one fetch and its parsed episodes, and
+    schedule the next poll"""
+    state.polls += 1
+    state.last_polled_at = now
+    
+    if error:
+        state.last_error = error
+    elif feed.not_modified:
+        state.not_modified_polls += 1
+    else:
+        state.etag = feed.etag
+        state.last_modified = feed.last_modified
+        state.last_error = None
+        
+        cadence_seconds, spread_seconds, last_published_at = learn_cadence(
+            episode['publish_date'] for episode in episodes
+        )
+        if last_published_at and last_published_at != as_utc(state.last_published_at):
+            state.last_changed_at = now
+        state.cadence_seconds = cadence_seconds
+        state.release_spread_seconds = spread_seconds
+        state.last_published_at = last_published_at or state.last_published_at
+    
+    state.next_poll_at = next_poll_time(
+        state.cadence_seconds, state.release_spread_seconds, state.last_published_at, now
+    )
+
+
+def pipeline_lease(now: Optional[datetime] = None) -> datetime:
+    """Expiry of a pipeline lease taken or renewed now"""
+    return (now or datetime.now(timezone.utc)) + timedelta(hours=PIPELINE_LEASE_HOURS)
+
+
+def claim_new_episodes(db: Session, podcast_id: int, episodes: list) -> list:
+    """Processing ids for the feed's recent episodes not seen before"""
+    return claim_episodes(db, podcast_id, unseen_episodes(db, podcast_id, recent_only(episodes, days=7)))
+
+
+def claim_episodes(db: Session, podcast_id: int, new_episodes: list, batch_summary: bool = False) -> list:
+    """Insert pipeline rows for unseen episodes; returns the ids this run claimed"""
+    if not new_episodes:
+        return []
+    
+    # Concurrent runs for the same feed race on the (podcast_id, guid)
+    # unique index; only the run whose insert won gets the ids back
+    return db.execute(
+        insert_ignoring_conflicts(EpisodeProcessing, [
+            {
+                'podcast_id': podcast_id,
+                'guid': episode_data['guid'],
+                'title': episode_data['title'],
+                'audio_url': episode_data['audio_url'],
+                'publish_date': episode_data['publish_date'],
+                'stage': STAGE_PENDING,
+                'attempts': 1,
+                'batch_summary': batch_summary,
+                'claimed_until': pipeline_lease(),
+            }
+            for episode_data in new_episodes
+        ], index_elements=['podcast_id', 'guid']).returning(EpisodeProcessing.id)
+    ).scalars().all()
+
+
+def claim_stalled_episodes(db: Session, podcast_ids: list) -> list:
+    """(podcast_id, processing_id) of episodes whose pipeline failed or whose
+    lease expired; the conditional UPDATE makes sure only one run claims each
+    
+    Episodes still queued or running hold an unexpired lease, so a slow
+    stage is never given a second concurrent pipeline.
+    """
+    now = datetime.now(timezone.utc)
+    return db.execute(
+        update(EpisodeProcessing)
+        .where(
+            EpisodeProcessing.podcast_id.in_(podcast_ids),
+            EpisodeProcessing.stage != STAGE_SUMMARIZED,
+            or_(
+                EpisodeProcessing.last_error.isnot(None),
+                EpisodeProcessing.claimed_until < now,
+                # Rows from before pipeline leases
+                EpisodeProcessing.claimed_until.is_(None),
+            ),
+            # Transcribed backfill episodes are waiting on their summary batch
+            or_(
+                EpisodeProcessing.batch_summary == False,
+                EpisodeProcessing.stage != STAGE_TRANSCRIBED,
+                EpisodeProcessing.english_summary_key.isnot(None),
+            )
+        )
+        .values(last_error=None, attempts=EpisodeProcessing.attempts + 1, claimed_until=pipeline_lease(now))
+        .returning(EpisodeProcessing.podcast_id, EpisodeProcessing.id)
+    ).all()
+
+
+def dispatch_pipelines(podcast_id: int, processing_ids: list):
+    """One download -> transcribe -> summarize chain per episode, each stage
+    on its own queue; the chord reports when the podcast is done"""
+    pipelines = [
+        chain(
+            download_episode.si(processing_id),
+            transcribe_episode.s(),
+            summarize_episode.s(),
+        )
+        for processing_id in processing_ids
+    ]
+    chord(pipelines)(finish_podcast_run.s(podcast_id))
+
 
 @celery_app.task
 def process_single_podcast(podcast_id: int):
-    """Process recent episodes from a single podcast"""
+    """Find new or unfinished episodes of a podcast and fan them out to the pipeline"""
     db = SessionLocal()
     try:
         podcast = db.query(Podcast).filter(Podcast.id == podcast_id).first()
         if not podcast or not podcast.is_active:
             return
         
-        # Parse RSS feed for recent episodes
-        parser = RSSParser()
-        recent_episodes = parser.get_recent_episodes(podcast.rss_url, days=7)
+        # Conditional GET: an unchanged feed costs one 304 and no parsing
+        state = feed_state_for(db, podcast.id)
+        feed, episodes, error = None, [], None
+        try:
+            feed = RSSParser().fetch_feed(podcast.rss_url, etag=state.etag, last_modified=state.last_modified)
+            if not feed.not_modified:
+                episodes = parse_episodes(feed.content)
+        except httpx.HTTPError as e:
+            print(f"Error fetching RSS feed {podcast.rss_url}: {str(e)}")
+            error = str(e) or e.__class__.__name__
+        record_feed_poll(state, feed, episodes, error, datetime.now(timezone.utc))
+        
+        processing_ids = claim_new_episodes(db, podcast.id, episodes)
+        # Reruns also resume episodes whose pipeline failed or went quiet
+        processing_ids += [processing_id for _, processing_id in claim_stalled_episodes(db, [podcast.id])]
+        db.commit()
+        
+        if not processing_ids:
+            return f"No new episodes for {podcast.name}"
+        
+        dispatch_pipelines(podcast.id, processing_ids)
+        return f"Queued {len(processing_ids)} episodes for {podcast.name}"
+        
+    except Exception as e:
+        print(f"Error processing podcast {podcast_id}: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def refresh_feeds(podcast_ids: list):
+    """Poll a batch of feeds concurrently and queue only their new episodes
+    
+    Unchanged feeds cost one 304 each; changed ones are parsed in a process
+    pool, so one worker keeps up with thousands of podcasts.
+    """
+    db = SessionLocal()
+    try:
+        podcasts = db.execute(
+            select(Podcast.id, Podcast.rss_url)
+            .where(Podcast.id.in_(podcast_ids), Podcast.is_active == True)
+        ).all()
+        if not podcasts:
+            return "No active feeds to refresh"
+        
+        db.execute(insert_ignoring_conflicts(FeedState, [
+            {'podcast_id': podcast_id, 'polls': 0, 'not_modified_polls': 0}
+            for podcast_id, _ in podcasts
+        ], index_elements=['podcast_id']))
+        # Read the validators now: commit expires loaded rows, and reloading
+        # them one by one would hold a transaction open through the fetches
+        validators = {
+            podcast_id: (etag, last_modified)
+            for podcast_id, etag, last_modified in db.execute(
+                select(FeedState.podcast_id, FeedState.etag, FeedState.last_modified)
+                .where(FeedState.podcast_id.in_([podcast_id for podcast_id, _ in podcasts]))
+            )
+        }
+        requests = [
+            FeedRequest(podcast_id, rss_url, *validators[podcast_id])
+            for podcast_id, rss_url in podcasts
+        ]
+        # Don't hold a connection (or SQLite's lock) while the network is busy
+        db.commit()
+        
+        async def refresh():
+            async with FeedRefresher() as refresher:
+                return await refresher.refresh(requests)
+        
+        results = run_async(refresh())
+        
+        states = {
+            state.podcast_id: state
+            for state in db.query(FeedState).filter(FeedState.podcast_id.in_(list(validators)))
+        }
+        now = datetime.now(timezone.utc)
+        queued = defaultdict(list)
+        changed = 0
+        for result in results:
+            if result.error:
+                print(f"Error refreshing feed of podcast {result.podcast_id}: {result.error}")
+            record_feed_poll(states[result.podcast_id], result.feed, result.episodes, result.error, now)
+            if result.episodes:
+                changed += 1
+                queued[result.podcast_id] += claim_new_episodes(db, result.podcast_id, result.episodes)
+        for podcast_id, processing_id in claim_stalled_episodes(db, list(states)):
+            queued[podcast_id].append(processing_id)
+        db.commit()
+        
+        for podcast_id, processing_ids in queued.items():
+            if processing_ids:
+                dispatch_pipelines(podcast_id, processing_ids)
+        
+        episode_count = sum(len(processing_ids) for processing_ids in queued.values())
+        return f"Refreshed {len(results)} feeds ({changed} changed), queued {episode_count} episodes"
+        
+    except Exception as e:
+        print(f"Error refreshing feeds: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(base=EpisodeStageTask)
+def download_episode(processing_id: int):
+    """Pipeline stage 1: download episode audio into the shared media dir"""
+    db = SessionLocal()
+    try:
+        state = db.get(EpisodeProcessing, processing_id)
+        if state.reached(STAGE_TRANSCRIBED):
+            return processing_id
+        if state.reached(STAGE_DOWNLOADED) and state.audio_path and os.path.exists(state.audio_path):
+            return processing_id
+        state.claimed_until = pipeline_lease()
+        db.commit()
+        
+        processor = PodcastProcessor()
+        state.audio_path = run_async(processor.download_audio(
+            state.audio_url,
+            dest_dir=os.path.join(settings.media_dir, 'audio')
+        ))
+        state.stage = STAGE_DOWNLOADED
+        state.claimed_until = pipeline_lease()
+        db.commit()
+        return processing_id
+    finally:
+        db.close()
+
+
+def podcast_fingerprints(db: Session, state: EpisodeProcessing) -> list:
+    """Audio fingerprints of the podcast's most recently transcribed episodes"""
+    keys = db.scalars(
+        select(EpisodeProcessing.fingerprint_key)
+        .where(
+            EpisodeProcessing.podcast_id == state.podcast_id,
+            EpisodeProcessing.id != state.id,
+            EpisodeProcessing.fingerprint_key.isnot(None),
+        )
+        .order_by(EpisodeProcessing.id.desc())
+        .limit(settings.recurring_history_episodes)
+    ).all()
+    history = []
+    for key in keys:
+        try:
+            history.append(load_fingerprint(get_blob_store().get(key)))
+        except BlobNotFound:
+            continue
+    return history
+
+
+@celery_app.task(base=EpisodeStageTask, rate_limit=settings.transcribe_rate_limit)
+def transcribe_episode(processing_id: int):
+    """Pipeline stage 2: transcribe downloaded audio with Whisper"""
+    db = SessionLocal()
+    try:
+        state = db.get(EpisodeProcessing, processing_id)
+        if state.reached(STAGE_SUMMARIZED):
+            return processing_id
+        if state.reached(STAGE_TRANSCRIBED) and state.transcript_key:
+            return processing_id
+        state.claimed_until = pipeline_lease()
+        db.commit()
+        if not state.audio_path or not os.path.exists(state.audio_path):
+            # Audio artifact is gone; fall back to redoing the download stage
+            state.stage = STAGE_PENDING
+            db.commit()
+            download_episode(processing_id)
+            db.refresh(state)
         
-        # Process each episode
         processor = PodcastProcessor()
-        processed_count = 0
-        
-        for episode_data in recent_episodes:
-            # Check if episode already processed
-            existing = db.query(Episode).filter(
-                Episode.podcast_id == podcast.id,
-                Episode.audio_url == episode_data['audio_url']
-            ).first()
+        plan = None
+        if settings.skip_recurring_audio:
+            try:
+                plan = plan_skips(
+                    state.audio_path, podcast_fingerprints(db, state),
+                    os.path.join(settings.media_dir, "audio"),
+                )
+            except AudioDecodeError as e:
+                print(f"Fingerprinting failed for episode {state.guid}, transcribing all of it: {e}")
+        
+        if plan and plan.audio_path:
+            try:
+                segments = run_async(processor.transcribe_segments(plan.audio_path))
+            finally:
+                os.remove(plan.audio_path)
+            transcript = annotate_transcript(segments, plan)
+        else:
+            transcript = run_async(processor.transcribe_audio(state.audio_path))
+        
+        if plan:
+            state.fingerprint_key = get_blob_store().put(plan.fingerprint.tobytes())
+            state.audio_seconds = round(plan.duration, 2)
+            state.skipped_seconds = round(plan.skipped_seconds, 2)
+            state.skipped_spans = json.dumps(plan.skipped)
+            TRANSCRIPTION_AUDIO_SECONDS.labels("transcribed").inc(plan.duration - plan.skipped_seconds)
+            TRANSCRIPTION_AUDIO_SECONDS.labels("skipped").inc(plan.skipped_seconds)
+            if plan.skipped:
+                print(f"Skipped {len(plan.skipped)} recurring segments in {state.title}: "
+                      f"{plan.skipped_seconds / 60:.1f} of {plan.duration / 60:.1f} minutes saved")
+        
+        audio_path = state.audio_path
+        state.transcript_key = get_blob_store().put_text(transcript)
+        state.audio_path = None
+        state.stage = STAGE_TRANSCRIBED
+        state.claimed_until = pipeline_lease()
+        db.commit()
+        
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+        return processing_id
+    finally:
+        db.close()
+
+
+def translate_summaries(db: Session, source_keys: list, languages: list) -> dict:
+    """Blob keys of the summaries behind `source_keys` in each language, as
+    (source_key, language) -> key; only translations not made before call
+    the API, all of them concurrently
+    
+    Each finished translation is committed on its own, so when some fail
+    (their error is raised afterwards) a retry only repeats those.
+    """
+    source_keys = list(dict.fromkeys(source_keys))
+    translated = {
+        (row.source_key, row.language): row.summary_key
+        for row in db.execute(
+            select(SummaryTranslation.source_key, SummaryTranslation.language, SummaryTranslation.summary_key)
+            .where(SummaryTranslation.source_key.in_(source_keys), SummaryTranslation.language.in_(languages))
+        )
+    }
+    missing = [
+        (source_key, language) for source_key in source_keys for language in languages
+        if (source_key, language) not in translated
+    ]
+    if not missing:
+        return translated
+    
+    store = get_blob_store()
+    sources = store.get_texts(source_key for source_key, _ in missing)
+    missing = [(source_key, language) for source_key, language in missing if source_key in sources]
+    results = run_async(PodcastProcessor().translate_summaries(
+        [(sources[source_key], language) for source_key, language in missing]
+    ))
+    rows = []
+    errors = []
+    for (source_key, language), result in zip(missing, results):
+        if isinstance(result, Exception):
+            errors.append(result)
+            continue
+        translated[source_key, language] = store.put_text(result)
+        rows.append({'source_key': source_key, 'language': language, 'summary_key': translated[source_key, language]})
+    if rows:
+        db.execute(insert_ignoring_conflicts(SummaryTranslation, rows, ['source_key', 'language']))
+        db.commit()
+    if errors:
+        raise errors[0]
+    return translated
+
+
+def save_episode(db: Session, state: EpisodeProcessing, mandarin_summary_key: str) -> Episode:
+    """Final pipeline step: the Episode row, and the checkpoint pointing at it"""
+    episode = Episode(
+        podcast_id=state.podcast_id,
+        guid=state.guid,
+        title=state.title,
+        audio_url=state.audio_url,
+        publish_date=state.publish_date,
+        transcript_key=state.transcript_key,
+        english_summary_key=state.english_summary_key,
+        summary_key=mandarin_summary_key
+    )
+    db.add(episode)
+    db.flush()
+    
+    state.episode_id = episode.id
+    state.stage = STAGE_SUMMARIZED
+    return episode
+
+
+@celery_app.task(base=EpisodeStageTask, rate_limit=settings.summarize_rate_limit)
+def summarize_episode(processing_id: int):
+    """Pipeline stage 3: summarize in English, translate into every
+    configured language and save the episode"""
+    db = SessionLocal()
+    try:
+        state = db.get(EpisodeProcessing, processing_id)
+        if state.reached(STAGE_SUMMARIZED) or (state.batch_summary and not state.english_summary_key):
+            # Batch summaries are written back by poll_summary_batches
+            return processing_id
+        state.claimed_until = pipeline_lease()
+        db.commit()
+        
+        if not state.english_summary_key:
+            try:
+                transcript = get_blob_store().get_text(state.transcript_key) if state.transcript_key else None
+            except BlobNotFound:
+                transcript = None
+            if transcript is None:
+                # Transcript artifact is gone; redo the earlier stages first
+                state.stage = STAGE_DOWNLOADED if state.audio_path else STAGE_PENDING
+                state.transcript_key = None
+                db.commit()
+                transcribe_episode(processing_id)
+                db.refresh(state)
+                transcript = get_blob_store().get_text(state.transcript_key)
             
-            if existing:
+            processor = PodcastProcessor()
+            summary = run_async(processor.generate_summary(transcript, state.title))
+            # Checkpoint: a retry only repeats the translations
+            state.english_summary_key = get_blob_store().put_text(summary)
+            db.commit()
+        
+        translated = translate_summaries(db, [state.english_summary_key], summary_languages())
+        if (state.english_summary_key, MANDARIN) not in translated:
+            # English summary artifact is gone; the retry writes it again
+            state.english_summary_key = None
+            db.commit()
+            raise Exception("English summary is missing from the blob store")
+        
+        # Episode row and the final checkpoint are committed together
+        save_episode(db, state, translated[state.english_summary_key, MANDARIN])
+        db.commit()
+        return processing_id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def finish_podcast_run(processing_ids: list, podcast_id: int):
+    """Chord callback: runs once every episode of a podcast has been processed"""
+    db = SessionLocal()
+    try:
+        processed = db.query(EpisodeProcessing).filter(
+            EpisodeProcessing.id.in_(processing_ids),
+            EpisodeProcessing.stage == STAGE_SUMMARIZED
+        ).count()
+        if processed:
+            refresh_newsletter_draft.delay()
+        return f"Processed {processed} episodes for podcast {podcast_id}"
+    finally:
+        db.close()
+
+
+@celery_app.task
+def backfill_podcast(podcast_id: int, limit: Optional[int] = None):
+    """Queue a podcast's back catalog (its newest `limit` episodes, or all of
+    them); episodes are downloaded and transcribed as usual, then summarized
+    together in Batch API jobs"""
+    db = SessionLocal()
+    try:
+        podcast = db.get(Podcast, podcast_id)
+        if not podcast:
+            return
+        
+        feed = RSSParser().fetch_feed(podcast.rss_url)
+        episodes = unseen_episodes(db, podcast.id, parse_episodes(feed.content))
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        episodes.sort(key=lambda episode: episode['publish_date'] or oldest, reverse=True)
+        processing_ids = claim_episodes(db, podcast.id, episodes[:limit], batch_summary=True)
+        db.commit()
+        
+        if processing_ids:
+            group(
+                chain(download_episode.si(processing_id), transcribe_episode.s())
+                for processing_id in processing_ids
+            ).apply_async()
+        return f"Backfilling {len(processing_ids)} episodes for {podcast.name}"
+    
+    except Exception as e:
+        print(f"Error backfilling podcast {podcast_id}: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def release_from_batch(state: EpisodeProcessing, error: str):
+    """Send an episode whose batch summary failed back to per-episode
+    summarization; the next feed run picks it up as a failed pipeline"""
+    state.batch_summary = False
+    state.last_error = error
+
+
+@celery_app.task
+def submit_summary_batches():
+    """Collect transcribed backfill episodes into a Batch API job, once there
+    are enough of them or the oldest has waited long enough"""
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        waiting = db.scalars(
+            select(EpisodeProcessing)
+            .where(
+                EpisodeProcessing.stage == STAGE_TRANSCRIBED,
+                EpisodeProcessing.batch_summary == True,
+                EpisodeProcessing.summary_batch_id.is_(None),
+            )
+            .order_by(EpisodeProcessing.id)
+            .limit(settings.summary_batch_size)
+        ).all()
+        if not waiting:
+            return "No episodes waiting for a summary batch"
+        oldest = min(as_utc(state.updated_at) for state in waiting)
+        if len(waiting) < settings.summary_batch_size and now - oldest < timedelta(minutes=settings.summary_batch_max_wait_minutes):
+            return f"{len(waiting)} episodes waiting for a summary batch"
+        
+        requests, states = [], []
+        store = get_blob_store()
+        for state in waiting:
+            try:
+                transcript = store.get_text(state.transcript_key)
+            except BlobNotFound:
+                release_from_batch(state, "summary batch: transcript missing")
                 continue
-            
-            # Process episode
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            mandarin_summary = loop.run_until_complete(
-                processor.process_episode(episode_data)
+            requests.append(batch_request(state.id, transcript, state.title))
+            states.append(state)
+        if not states:
+            db.commit()
+            return "No episodes waiting for a summary batch"
+        
+        # Claim the episodes before submitting, so a concurrent run can't send them twice
+        batch = SummaryBatch(status=BATCH_SUBMITTING, request_count=len(states))
+        db.add(batch)
+        db.flush()
+        claimed = set(db.execute(
+            update(EpisodeProcessing)
+            .where(
+                EpisodeProcessing.id.in_([state.id for state in states]),
+                EpisodeProcessing.summary_batch_id.is_(None),
+            )
+            .values(summary_batch_id=batch.id)
+            .returning(EpisodeProcessing.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all())
+        requests = [request for request in requests if int(request['custom_id']) in claimed]
+        batch.request_count = len(requests)
+        db.commit()
+        if not requests:
+            batch.status = BATCH_FAILED
+            db.commit()
+            return "Episodes were claimed by another run"
+        
+        async def submit():
+            async with SummaryBatchClient() as client:
+                return await client.submit(requests)
+        
+        try:
+            submitted = run_async(submit())
+        except Exception as e:
+            print(f"Error submitting summary batch {batch.id}: {str(e)}")
+            db.execute(
+                update(EpisodeProcessing)
+                .where(EpisodeProcessing.summary_batch_id == batch.id)
+                .values(summary_batch_id=None)
             )
-            loop.close()
+            batch.status = BATCH_FAILED
+            batch.last_error = str(e)
+            db.commit()
+            raise
+        
+        batch.provider_batch_id = submitted['id']
+        batch.status = submitted['status']
+        db.commit()
+        return f"Submitted summary batch {batch.provider_batch_id} with {len(requests)} episodes"
+    
+    finally:
+        db.close()
+
+
+@celery_app.task
+def poll_summary_batches():
+    """Check open Batch API jobs and write finished summaries back as episodes"""
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        batches = db.scalars(
+            select(SummaryBatch)
+            .where(SummaryBatch.status.notin_(BATCH_FINAL_STATUSES))
+            .order_by(SummaryBatch.id)
+        ).all()
+        
+        async def fetch():
+            """Status of every submitted job, with results for the finished ones"""
+            fetched = {}
+            async with SummaryBatchClient() as client:
+                for batch in batches:
+                    if not batch.provider_batch_id:
+                        continue
+                    try:
+                        info = await client.get_batch(batch.provider_batch_id)
+                        results = await client.results(info) if info['status'] in BATCH_FINAL_STATUSES else {}
+                    except Exception as e:
+                        print(f"Error polling summary batch {batch.provider_batch_id}: {str(e)}")
+                        continue
+                    fetched[batch.id] = (info, results)
+            return fetched
+        
+        fetched = run_async(fetch())
+        finished = summaries = 0
+        translate = []
+        for batch in batches:
+            if not batch.provider_batch_id:
+                # Submission never went through; release its episodes for the next batch
+                if now - as_utc(batch.created_at) > timedelta(seconds=SUMMARY_BATCH_SUBMIT_LEASE_SECONDS):
+                    db.execute(
+                        update(EpisodeProcessing)
+                        .where(EpisodeProcessing.summary_batch_id == batch.id)
+                        .values(summary_batch_id=None)
+                    )
+                    batch.status = BATCH_FAILED
+                    batch.last_error = "never submitted"
+                    db.commit()
+                continue
+            if batch.id not in fetched:
+                continue
             
-            if mandarin_summary:
-                # Save to database
-                episode = Episode(
-                    podcast_id=podcast.id,
-                    title=episode_data['title'],
-                    audio_url=episode_data['audio_url'],
-                    publish_date=episode_data['publish_date'],
-                    summary_mandarin=mandarin_summary
+            info, results = fetched[batch.id]
+            batch.status = info['status']
+            if batch.status not in BATCH_FINAL_STATUSES:
+                db.commit()
+                continue
+            
+            # Summaries and the batch's final state are committed together
+            states = db.scalars(
+                select(EpisodeProcessing)
+                .where(
+                    EpisodeProcessing.summary_batch_id == batch.id,
+                    EpisodeProcessing.stage == STAGE_TRANSCRIBED,
                 )
-                db.add(episode)
-                processed_count += 1
+            ).all()
+            for state in states:
+                summary, error = results.get(state.id, (None, f"no result, batch {batch.status}"))
+                if summary:
+                    state.english_summary_key = get_blob_store().put_text(summary)
+                    state.claimed_until = pipeline_lease(now)
+                    translate.append(state.id)
+                    batch.succeeded += 1
+                else:
+                    release_from_batch(state, f"summary batch {batch.provider_batch_id}: {error}")
+                    batch.failed += 1
+            batch.completed_at = now
+            db.commit()
+            finished += 1
+            summaries += batch.succeeded
         
+        # Translations are per-episode calls on the summarize queue
+        for processing_id in translate:
+            summarize_episode.delay(processing_id)
+        return f"{finished} summary batches finished, {summaries} episodes summarized"
+    
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def refresh_newsletter_draft():
+    """Bring the next issue's draft up to date with newly processed episodes;
+    only their sections are rendered, the rest come from the fragment cache"""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        draft = lock_draft(db)
+        if draft is None:
+            return "Another refresh is updating the newsletter draft"
+        draft, rendered = refresh_draft(db, draft, datetime.now(timezone.utc))
         db.commit()
-        return f"Processed {processed_count} episodes for {podcast.name}"
-        
+        return (
+            f"Newsletter draft has {draft.episode_count} episodes, {rendered} sections rendered "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
     except Exception as e:
-        print(f"Error processing podcast {podcast_id}: {str(e)}")
+        print(f"Error refreshing newsletter draft: {str(e)}")
         db.rollback()
         raise
     finally:
@@ -93,33 +887,38 @@ def process_single_podcast(podcast_id: int):
 
 @celery_app.task
 def generate_weekly_newsletter():
-    """Generate and send weekly newsletter"""
+    """Publish the weekly newsletter from its draft
+    
+    The draft is kept current as episodes finish (refresh_newsletter_draft),
+    so this only catches up on whatever changed since the last refresh.
+    """
     db = SessionLocal()
+    draft = None
     try:
-        # Get episodes from the past week
-        one_week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-        episodes = db.query(Episode).join(Podcast).filter(
-            Episode.processed_at >= one_week_ago,
-            Podcast.is_active == True
-        ).order_by(Episode.publish_date.desc()).limit(10).all()
+        started = time.perf_counter()
+        # Wait out a refresh in progress, then keep the draft leased until it
+        # is published so no refresh changes it after its content is read
+        draft = lock_draft(db, wait_seconds=DRAFT_REFRESH_LEASE.total_seconds())
+        if draft is None:
+            raise Exception("Newsletter draft is still being refreshed")
+        with track_queries() as queries:
+            draft, rendered = refresh_draft(db, draft, datetime.now(timezone.utc))
+        draft.refreshing_until = datetime.now(timezone.utc) + DRAFT_REFRESH_LEASE
+        db.commit()
         
-        if not episodes:
+        if not draft.episode_count:
+            draft.refreshing_until = None
+            db.commit()
             print("No episodes to include in newsletter")
             return
         
-        # Format episodes for newsletter
-        episode_data = []
-        for episode in episodes:
-            episode_data.append({
-                'podcast_name': episode.podcast.name,
-                'title': episode.title,
-                'audio_url': episode.audio_url,
-                'summary_mandarin': episode.summary_mandarin
-            })
-        
-        # Create newsletter with Beehiiv
-        beehiiv = BeehiivService()
-        content = beehiiv.format_newsletter_content(episode_data)
+        content = get_blob_store().get_text(draft.content_key)
+        build_stats = (
+            f"{rendered} of {draft.episode_count} sections rendered, "
+            f"{queries.count} queries, {queries.duration_ms:.1f} ms in DB, "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms total"
+        )
+        print(f"Newsletter built from {draft.episode_count} episodes ({build_stats})")
         
         # Schedule for next Sunday 9 AM
         next_sunday = datetime.now(timezone.utc)
@@ -129,31 +928,145 @@ def generate_weekly_newsletter():
         next_sunday = next_sunday + timedelta(days=days_until_sunday)
         next_sunday = next_sunday.replace(hour=9, minute=0, second=0, microsecond=0)
         
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(
-            beehiiv.create_post(
-                title=f"播客周报 - {datetime.now().strftime('%Y年%m月%d日')}",
-                content=content,
-                send_at=next_sunday
-            )
-        )
-        loop.close()
+        # Create newsletter with Beehiiv
+        async def publish():
+            async with BeehiivService() as beehiiv:
+                return await beehiiv.create_post(
+                    title=f"播客周报 - {datetime.now().strftime('%Y年%m月%d日')}",
+                    content=content,
+                    send_at=next_sunday
+                )
+        
+        result = run_async(publish())
         
         # Save newsletter record
         newsletter = Newsletter(
             beehiiv_post_id=result.get('id'),
             sent_at=next_sunday,
-            episode_count=len(episodes)
+            episode_count=draft.episode_count
         )
         db.add(newsletter)
+        db.flush()
+        finish_draft(db, draft, newsletter.id, datetime.now(timezone.utc))
         db.commit()
         
-        return f"Newsletter created with {len(episodes)} episodes"
+        return f"Newsletter created with {draft.episode_count} episodes ({build_stats})"
         
     except Exception as e:
         print(f"Error generating newsletter: {str(e)}")
         db.rollback()
+        if draft is not None:
+            # Release the lease, so refreshes and a retry needn't wait it out
+            draft.refreshing_until = None
+            db.commit()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def translate_episode_summaries(language: str, limit: Optional[int] = None):
+    """Translate already processed episodes' summaries into `language` (a
+    new market): one translation call per episode, newest first
+    
+    Add the language to SUMMARY_LANGUAGES as well, so new episodes get it.
+    """
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        translated = 0
+        while limit is None or translated < limit:
+            chunk = TRANSLATION_BACKFILL_CHUNK if limit is None else min(TRANSLATION_BACKFILL_CHUNK, limit - translated)
+            rows = db.execute(untranslated_summaries_query(
+                language, chunk, translate_mandarin=language != MANDARIN,
+            )).all()
+            if not rows:
+                break
+            # Episodes whose summary blob is gone are left out, so stop rather than loop on them
+            done = translate_summaries(db, [row.source_key for row in rows], [language])
+            translated += len(done)
+            if not done:
+                break
+        return (
+            f"Translated {translated} episode summaries to {language} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    except Exception as e:
+        print(f"Error translating summaries to {language}: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def update_related_index(rebuild: bool = False):
+    """Add newly processed episodes to the related-episodes index, or
+    recompute every neighbour list with current IDF weights
+    
+    The index file lives at RELATED_INDEX_PATH. Overlapping runs are safe
+    but repeat each other's work, so one worker on the `index` queue is enough.
+    """
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        added, written = update_index(db, rebuild=rebuild)
+        return (
+            f"Indexed {added} new episodes, wrote {written} neighbour lists "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    except Exception as e:
+        print(f"Error updating related episodes index: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task
+def poll_due_feeds():
+    """Scheduler tick: dispatch a poll for every active feed that is due"""
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        
+        # Podcasts added since the last tick get their first poll right away
+        unscheduled = db.execute(
+            select(Podcast.id)
+            .outerjoin(FeedState, FeedState.podcast_id == Podcast.id)
+            .where(Podcast.is_active == True, FeedState.podcast_id.is_(None))
+        ).scalars().all()
+        if unscheduled:
+            db.execute(insert_ignoring_conflicts(FeedState, [
+                {'podcast_id': podcast_id, 'polls': 0, 'not_modified_polls': 0, 'next_poll_at': now}
+                for podcast_id in unscheduled
+            ], index_elements=['podcast_id']))
+        
+        # Claim due feeds by leasing their next_poll_at, so overlapping ticks
+        # don't poll a feed twice; the poll itself sets the real next time
+        due = (
+            select(FeedState.podcast_id)
+            .join(Podcast, Podcast.id == FeedState.podcast_id)
+            .where(Podcast.is_active == True, FeedState.next_poll_at <= now)
+            .order_by(FeedState.next_poll_at)
+            .limit(settings.feed_poll_batch_size)
+        )
+        claimed_ids = db.execute(
+            update(FeedState)
+            .where(FeedState.podcast_id.in_(due), FeedState.next_poll_at <= now)
+            .values(next_poll_at=now + timedelta(seconds=FEED_POLL_LEASE_SECONDS))
+            .returning(FeedState.podcast_id)
+        ).scalars().all()
+        db.commit()
+        
+        # One refresher run per chunk instead of a task per feed
+        for start in range(0, len(claimed_ids), settings.feed_refresh_batch_size):
+            refresh_feeds.delay(claimed_ids[start:start + settings.feed_refresh_batch_size])
+        return f"Polling {len(claimed_ids)} due feeds"
+    
+    except Exception as e:
+        print(f"Error scheduling feed polls: {str(e)}")
+        db.rollback()
         raise
     finally:
         db.close()
@@ -164,9 +1077,127 @@ def process_all_podcasts():
     """Process all active podcasts"""
     db = SessionLocal()
     try:
-        podcasts = db.query(Podcast).filter(Podcast.is_active == True).all()
-        for podcast in podcasts:
-            process_single_podcast.delay(podcast.id)
-        return f"Started processing {len(podcasts)} podcasts"
+        podcast_ids = db.execute(select(Podcast.id).where(Podcast.is_active == True)).scalars().all()
+        for start in range(0, len(podcast_ids), settings.feed_refresh_batch_size):
+            refresh_feeds.delay(podcast_ids[start:start + settings.feed_refresh_batch_size])
+        return f"Started processing {len(podcast_ids)} podcasts"
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def send_subscriptions(subscriptions: list) -> list:
+    """Send queued signups to Beehiiv over one pooled client, pacing request
+    starts to the configured rate and stopping early once Beehiiv throttles"""
+    interval = 1.0 / settings.subscription_flush_rate
+    semaphore = asyncio.Semaphore(settings.subscription_flush_concurrency)
+    throttled = asyncio.Event()
+    
+    async with BeehiivService() as beehiiv:
+        async def send(index: int, subscription: dict):
+            await asyncio.sleep(index * interval)
+            async with semaphore:
+                if throttled.is_set():
+                    return None
+                try:
+                    response = await beehiiv.create_subscription(**subscription)
+                except httpx.HTTPError as e:
+                    return e
+                if response.status_code == 429:
+                    throttled.set()
+                return response
+        
+        return await asyncio.gather(*(
+            send(index, subscription) for index, subscription in enumerate(subscriptions)
+        ))
+
+
+def record_subscription_result(subscription: SubscriptionOutbox, result, now: datetime):
+    """Apply one Beehiiv outcome to its outbox row"""
+    if isinstance(result, httpx.Response):
+        if result.status_code == 201:
+            subscription.status = OUTBOX_SENT
+            subscription.sent_at = now
+            subscription.beehiiv_subscription_id = result.json().get("data", {}).get("id")
+            return
+        if result.status_code == 400:
+            error_message = result.json().get("errors", [{}])[0].get("message", "Invalid email address")
+            if "already exists" in error_message.lower():
+                subscription.status = OUTBOX_SENT
+                subscription.sent_at = now
+            else:
+                # Beehiiv rejected the address itself; retrying won't help
+                subscription.status = OUTBOX_FAILED
+                subscription.last_error = error_message
+            return
+        subscription.last_error = f"HTTP {result.status_code}"
+    elif result is None:
+        # Skipped because Beehiiv throttled the batch; doesn't count as an attempt
+        subscription.next_attempt_at = now + timedelta(seconds=60)
+        return
+    else:
+        subscription.last_error = str(result) or result.__class__.__name__
+    
+    subscription.attempts += 1
+    if subscription.attempts >= settings.subscription_max_attempts:
+        subscription.status = OUTBOX_FAILED
+    else:
+        subscription.next_attempt_at = now + timedelta(seconds=min(3600, 30 * 2 ** subscription.attempts))
+
+
+@celery_app.task
+def flush_subscription_outbox():
+    """Drain queued newsletter signups to Beehiiv in rate-limited batches"""
+    if not settings.beehiiv_api_key or not settings.beehiiv_publication_id:
+        return "Beehiiv is not configured"
+    
+    db = SessionLocal()
+    try:
+        # Claim a batch by pushing its next_attempt_at forward; the
+        # conditional UPDATE keeps overlapping flushes off the same rows
+        now = datetime.now(timezone.utc)
+        due = select(SubscriptionOutbox.id).where(
+            SubscriptionOutbox.status == OUTBOX_PENDING,
+            SubscriptionOutbox.next_attempt_at <= now
+        ).order_by(SubscriptionOutbox.id).limit(settings.subscription_flush_batch_size)
+        claimed_ids = db.execute(
+            update(SubscriptionOutbox)
+            .where(
+                SubscriptionOutbox.id.in_(due),
+                SubscriptionOutbox.status == OUTBOX_PENDING,
+                SubscriptionOutbox.next_attempt_at <= now
+            )
+            .values(next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+            .returning(SubscriptionOutbox.id)
+        ).scalars().all()
+        db.commit()
+        
+        if not claimed_ids:
+            return "No pending subscriptions"
+        
+        subscriptions = db.query(SubscriptionOutbox).filter(
+            SubscriptionOutbox.id.in_(claimed_ids)
+        ).order_by(SubscriptionOutbox.id).all()
+        results = run_async(send_subscriptions([
+            {
+                'email': subscription.email,
+                'name': subscription.name or "",
+                'utm_source': subscription.utm_source,
+                'utm_medium': subscription.utm_medium,
+            }
+            for subscription in subscriptions
+        ]))
+        
+        now = datetime.now(timezone.utc)
+        for subscription, result in zip(subscriptions, results):
+            record_subscription_result(subscription, result, now)
+        db.commit()
+        
+        sent = sum(1 for subscription in subscriptions if subscription.status == OUTBOX_SENT)
+        return f"Sent {sent} of {len(subscriptions)} queued subscriptions"
+        
+    except Exception as e:
+        print(f"Error flushing subscription outbox: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
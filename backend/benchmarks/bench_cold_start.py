@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+API cold start: time to import app.main and to answer the first requests.
+
+Each run is a fresh interpreter, as on a new container or scale-out: it
+imports the app, starts it (lifespan included) and sends /health followed by
+a first database-backed request. The scratch database is migrated once up
+front, since schema work is a deploy step and not part of a boot. Medians
+are checked against a budget; the exit status is non-zero when one is
+exceeded, so this can gate CI.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --runs 10 --import-budget-ms 1500 --request-budget-ms 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_episode_indexes import BACKEND_DIR, migrate
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    client.get("/health").raise_for_status()
+    health = time.perf_counter()
+    client.get("/api/podcasts").raise_for_status()
+    first_query = time.perf_counter()
+print(json.dumps({
+    "import": (imported - started) * 1000,
+    "health": (health - ready) * 1000,
+    "first query": (first_query - health) * 1000,
+}))
+"""
+
+
+def cold_start(database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    # Read-only API pods must boot without pipeline credentials
+    env.pop("OPENAI_API_KEY", None)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="Defaults to a migrated scratch SQLite database")
+    parser.add_argument("--import-budget-ms", type=float, default=2000)
+    parser.add_argument("--request-budget-ms", type=float, default=250,
+                        help="Budget for each of the first requests")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/cold_start.db"
+    if not args.database_url:
+        migrate(database_url)
+
+    runs = [cold_start(database_url) for _ in range(args.runs)]
+    budgets = {
+        "import": args.import_budget_ms,
+        "health": args.request_budget_ms,
+        "first query": args.request_budget_ms,
+    }
+
+    print(f"🥶 {args.runs} cold starts of app.main\n")
+    print(f"   {'phase':<14}{'median':>10}{'max':>10}{'budget':>10}")
+    over_budget = []
+    for phase, budget in budgets.items():
+        timings = [run[phase] for run in runs]
+        median = statistics.median(timings)
+        flag = "" if median <= budget else "  ❌ over budget"
+        if flag:
+            over_budget.append(phase)
+        print(f"   {phase:<14}{median:>8.0f} ms{max(timings):>7.0f} ms{budget:>7.0f} ms{flag}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Feed refresh throughput: one feed at a time vs the concurrent refresher.
+
+Serves synthetic podcast feeds from a few local "hosts" (one port each) that
+add a fixed latency to every response and honour ETags. The sequential run
+fetches and parses feeds one after another, as a single process_single_podcast
+worker did; the refresher runs fetch them concurrently with per-host limits
+and parse them in a process pool, first cold (every feed changed) and then
+with validators (every feed answers 304).
+
+Usage (from backend/):
+    python -m benchmarks.bench_feed_refresh
+    python -m benchmarks.bench_feed_refresh --feeds 2000 --latency-ms 200 --per-host 16
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.feed_refresher import FeedRefresher, FeedRequest
+from app.services.rss_parser import RSSParser, parse_episodes
+
+
+def feed_document(feed_id: int, items: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    entries = "".join(
+        f"<item><title>Episode {number}</title><guid>feed-{feed_id}-{number}</guid>"
+        f"<description>{'Show notes. ' * 40}</description>"
+        f"<pubDate>{format_datetime(now - timedelta(days=number * 7))}</pubDate>"
+        f'<enclosure url="https://cdn.example.com/{feed_id}/{number}.mp3" type="audio/mpeg" length="1"/></item>'
+        for number in range(items)
+    )
+    return (
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {feed_id}</title>'
+        f"<description>Synthetic feed</description>{entries}</channel></rss>"
+    ).encode()
+
+
+def start_hosts(hosts: int, items: int, latency: float):
+    """One threaded HTTP server per host; returns the servers"""
+    documents = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            feed_id = int(self.path.rsplit("/", 1)[-1])
+            etag = f'"{feed_id}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if feed_id not in documents:
+                documents[feed_id] = feed_document(feed_id, items)
+            body = documents[feed_id]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    servers = []
+    for _ in range(hosts):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler, bind_and_activate=False)
+        server.request_queue_size = 1024
+        server.server_bind()
+        server.server_activate()
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def run_sequential(requests):
+    parser = RSSParser()
+    started = time.perf_counter()
+    for request in requests:
+        parse_episodes(parser.fetch_feed(request.rss_url).content)
+    return time.perf_counter() - started
+
+
+def run_refresher(requests, concurrency: int, per_host: int, processes: int):
+    async def refresh():
+        async with FeedRefresher(concurrency, per_host, processes) as refresher:
+            return await refresher.refresh(requests)
+
+    started = time.perf_counter()
+    results = asyncio.run(refresh())
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for result in results if result.error)
+    return elapsed, results, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed refresh benchmark")
+    parser.add_argument("--feeds", type=int, default=600)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--items", type=int, default=50, help="Episodes per feed")
+    parser.add_argument("--latency-ms", type=int, default=100, help="Server delay per response")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--per-host", type=int, default=50)
+    parser.add_argument("--processes", type=int, default=2, help="Parse processes (0 = threads)")
+    parser.add_argument("--sequential-feeds", type=int, default=100,
+                        help="Feeds timed one at a time (extrapolated to --feeds)")
+    args = parser.parse_args()
+
+    servers = start_hosts(args.hosts, args.items, args.latency_ms / 1000)
+    requests = [
+        FeedRequest(feed_id, f"http://127.0.0.1:{servers[feed_id % args.hosts].server_address[1]}/feeds/{feed_id}")
+        for feed_id in range(args.feeds)
+    ]
+    print(f"📡 {args.feeds} feeds x {args.items} episodes on {args.hosts} hosts, "
+          f"{args.latency_ms} ms server latency\n")
+
+    sample = requests[:args.sequential_feeds]
+    elapsed = run_sequential(sample) * len(requests) / len(sample)
+    print(f"   {'one at a time':<26}{elapsed:>8.1f} s{len(requests) / elapsed:>10.1f} feeds/s  (from {len(sample)} feeds)")
+
+    elapsed, results, errors = run_refresher(requests, args.concurrency, args.per_host, args.processes)
+    print(f"   {'refresher, all changed':<26}{elapsed:>8.1f} s{len(requests) / elapsed:>10.1f} feeds/s  ({errors} errors)")
+
+    revalidate = [
+        FeedRequest(request.podcast_id, request.rss_url, result.feed.etag if result.feed else None)
+        for request, result in zip(requests, results)
+    ]
+    elapsed, results, errors = run_refresher(revalidate, args.concurrency, args.per_host, args.processes)
+    unchanged = sum(1 for result in results if result.feed and result.feed.not_modified)
+    print(f"   {'refresher, all 304':<26}{elapsed:>8.1f} s{len(requests) / elapsed:>10.1f} feeds/s  "
+          f"({unchanged} not modified, {errors} errors)")
+
+    for server in servers:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
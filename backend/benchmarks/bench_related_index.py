@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Related-episodes index: build time, incremental updates and lookup latency.
+
+Generates synthetic transcripts (Zipf-distributed words over a shared
+vocabulary, each episode mixing two of a set of topics) and plants
+cross-posted copies with a few edits. Reports how long vectorizing, a full
+build and an incremental update of a small batch take, whether the planted
+cross-posts come out as near-duplicates, how closely incremental neighbour
+lists match a rebuild, and the latency of the API's related-episodes query
+against a migrated scratch SQLite database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_related_index
+    python -m benchmarks.bench_related_index --episodes 50000 --words 8000
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Episode, Podcast
+from app.queries import related_episodes_query
+from app.services.related_index import RelatedIndex, store_neighbors, tf_matrix
+from benchmarks.bench_episode_indexes import migrate
+
+VOCABULARY = 50000
+TOPICS = 24
+TOPIC_WORDS = 400
+
+
+def make_corpus(episodes: int, words: int, duplicates: int, seed: int):
+    """Synthetic transcripts; returns (texts, {copy position: original position})"""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(VOCABULARY)]
+    # Common words follow Zipf's law; topic words are what sets episodes apart
+    zipf = list(np.cumsum(1 / np.arange(1, VOCABULARY + 1)))
+    topics = [rng.sample(vocabulary[1000:], TOPIC_WORDS) for _ in range(TOPICS)]
+
+    texts = []
+    for _ in range(episodes - duplicates):
+        first, second = rng.sample(topics, 2)
+        common = rng.choices(vocabulary, cum_weights=zipf, k=words // 2)
+        specific = rng.choices(first, k=words // 3) + rng.choices(second, k=words - words // 2 - words // 3)
+        texts.append(" ".join(common + specific))
+
+    copies = {}
+    for _ in range(duplicates):
+        original = rng.randrange(episodes - duplicates)
+        tokens = texts[original].split()
+        for _ in range(len(tokens) // 50):  # ad reads and intros differ between shows
+            tokens[rng.randrange(len(tokens))] = rng.choice(vocabulary)
+        copies[len(texts)] = original
+        texts.append(" ".join(tokens))
+    return texts, copies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Related-episodes index benchmark")
+    parser.add_argument("--episodes", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=3000, help="Words per transcript")
+    parser.add_argument("--duplicates", type=int, default=200, help="Planted cross-posts")
+    parser.add_argument("--increment", type=int, default=100, help="Episodes in the incremental update")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    texts, copies = make_corpus(args.episodes, args.words, args.duplicates, args.seed)
+    ids = np.arange(1, len(texts) + 1)
+    top_k, min_score = settings.related_top_k, settings.related_min_score
+    print(f"📚 {len(texts):,} episodes of {args.words:,} words, {len(copies)} cross-posts planted\n")
+
+    started = time.perf_counter()
+    tf = tf_matrix(texts, settings.related_max_terms)
+    vectorize_s = time.perf_counter() - started
+    print(f"   vectorize        {vectorize_s:8.1f} s  ({len(texts) / vectorize_s:,.0f} episodes/s)")
+
+    base = len(texts) - args.increment
+    index = RelatedIndex.empty(top_k)
+    started = time.perf_counter()
+    index.add(ids[:base], tf[:base], min_score)
+    print(f"   full build       {time.perf_counter() - started:8.1f} s  ({base:,} episodes)")
+
+    started = time.perf_counter()
+    changed = index.add(ids[base:], tf[base:], min_score)
+    print(f"   incremental add  {time.perf_counter() - started:8.2f} s  ({args.increment} episodes, "
+          f"{len(changed):,} neighbour lists changed)")
+
+    incremental = index.neighbor_ids.copy()
+    started = time.perf_counter()
+    index.rebuild(min_score)
+    print(f"   rebuild          {time.perf_counter() - started:8.1f} s")
+    overlap = [
+        len(set(a[a >= 0]) & set(b[b >= 0])) / max(1, len(b[b >= 0]))
+        for a, b in zip(incremental, index.neighbor_ids)
+    ]
+    print(f"   incremental vs rebuild: {statistics.mean(overlap):.1%} of neighbours agree")
+
+    found = sum(
+        index.neighbor_ids[copy, 0] == ids[original]
+        and index.neighbor_scores[copy, 0] >= settings.related_duplicate_score
+        for copy, original in copies.items()
+    )
+    print(f"   cross-posts flagged as near-duplicates: {found}/{len(copies)}")
+
+    database_url = f"sqlite:///{tempfile.mkdtemp()}/related.db"
+    migrate(database_url)
+    engine = create_engine(database_url)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(Podcast), [{"id": 1, "name": "Bench", "rss_url": "https://feeds.example.com/1.xml"}])
+        conn.execute(insert(Episode), [
+            {"id": int(episode_id), "podcast_id": 1, "guid": str(episode_id), "title": f"Episode {episode_id}",
+             "audio_url": f"https://media.example.com/{episode_id}.mp3", "publish_date": now}
+            for episode_id in ids
+        ])
+    with Session(engine) as db:
+        store_neighbors(db, index, index.ids)
+        db.commit()
+
+    rng = random.Random(args.seed)
+    latencies = []
+    with engine.connect() as conn:
+        for _ in range(args.lookups):
+            started = time.perf_counter()
+            conn.execute(related_episodes_query(int(rng.choice(ids)), 5)).all()
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(f"\n🔎 related lookup: p50 {statistics.median(latencies):.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms ({args.lookups} queries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Backfill summarization: one chat call per episode vs Batch API jobs.
+
+Runs both modes end to end against the local OpenAI stand-in
+(benchmarks/openai_stand_in.py) and a migrated scratch SQLite database
+seeded with transcribed episodes. Per-episode mode runs summarize_episode
+for each one, as the pipeline does today. Batch mode marks them as a
+backfill and runs submit_summary_batches and poll_summary_batches until
+every episode is written back and translated. A few episodes are made to fail, to show
+them being handed back to per-episode summarization.
+
+The report gives worker time, API requests and the list-price cost of
+each mode (token counts estimated at 4 characters per token; Batch API
+jobs cost half).
+
+Usage (from backend/):
+    python -m benchmarks.bench_summary_batch
+    python -m benchmarks.bench_summary_batch --episodes 500 --chat-latency 2
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# GPT-4 Turbo list prices, USD per 1M tokens
+INPUT_PRICE = 10.0
+OUTPUT_PRICE = 30.0
+BATCH_DISCOUNT = 0.5
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def stand_in_server(chat_latency: float, batch_seconds: float):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.openai_stand_in", "--port", str(port),
+         "--chat-latency", str(chat_latency), "--batch-seconds", str(batch_seconds)],
+        cwd=BACKEND_DIR,
+    )
+    base_url = f"http://127.0.0.1:{port}/v1"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/batches/none")
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("stand-in server did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-episode vs Batch API summarization")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--failures", type=int, default=3, help="Episodes the stand-in rejects")
+    parser.add_argument("--words", type=int, default=6000, help="Words per transcript")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="Seconds per chat call")
+    parser.add_argument("--batch-seconds", type=float, default=5.0, help="Seconds until a batch job completes")
+    args = parser.parse_args()
+
+    scratch_dir = tempfile.mkdtemp()
+    database_url = f"sqlite:///{scratch_dir}/summary_batch.db"
+    with stand_in_server(args.chat_latency, args.batch_seconds) as base_url:
+        # Settings are read when the app is first imported, so configure it before that
+        os.environ.update(
+            DATABASE_URL=database_url,
+            BLOB_STORE_DIR=os.path.join(scratch_dir, "blobs"),
+            OPENAI_API_KEY="stand-in",
+            OPENAI_BASE_URL=base_url,
+            SUMMARY_BATCH_SIZE=str(args.episodes),
+            SUMMARY_BATCH_MAX_WAIT_MINUTES="0",
+        )
+        from benchmarks.bench_episode_indexes import migrate
+        from sqlalchemy import func, select
+        from app import tasks
+        from app.database import SessionLocal
+        from app.models import EpisodeProcessing, Podcast, SummaryBatch, STAGE_SUMMARIZED, STAGE_TRANSCRIBED
+        from app.services.blob_store import get_blob_store
+        from app.services.podcast_processor import summary_chat_request
+        migrate(database_url)
+        # The translations poll_summary_batches queues run inline, as worker time
+        tasks.celery_app.conf.task_always_eager = True
+
+        rng = random.Random(42)
+        words = [f"word{i}" for i in range(5000)]
+        failing = set(rng.sample(range(args.episodes), args.failures))
+        db = SessionLocal()
+        db.add(Podcast(id=1, name="Bench", rss_url="https://feeds.example.com/bench.xml"))
+        prompt_chars = 0
+        for mode in ("sync", "batch"):
+            for i in range(args.episodes):
+                transcript = " ".join(rng.choices(words, k=args.words))
+                title = f"{mode} episode {i}" + (" FAIL" if i in failing else "")
+                if mode == "sync":
+                    prompt_chars += len(summary_chat_request(transcript, title)["messages"][-1]["content"])
+                db.add(EpisodeProcessing(
+                    podcast_id=1, guid=f"{mode}-{i}", title=title, audio_url=f"https://media.example.com/{mode}/{i}.mp3",
+                    stage=STAGE_TRANSCRIBED, transcript_key=get_blob_store().put_text(transcript),
+                    batch_summary=mode == "batch", attempts=1,
+                ))
+        db.commit()
+        completion_tokens = 500
+        cost = (prompt_chars / 4 * INPUT_PRICE + args.episodes * completion_tokens * OUTPUT_PRICE) / 1e6
+
+        print(f"📝 {args.episodes} transcribed episodes per mode, {args.failures} rejected by the API\n")
+        sync_ids = db.scalars(select(EpisodeProcessing.id).where(EpisodeProcessing.batch_summary == False)).all()
+        started = time.perf_counter()
+        errors = 0
+        for processing_id in sync_ids:
+            try:
+                tasks.summarize_episode.run(processing_id)
+            except Exception:
+                errors += 1
+        sync_s = time.perf_counter() - started
+        print(f"   per-episode  {sync_s:7.1f} s worker time, {len(sync_ids)} summary requests, "
+              f"{errors} failed, ~${cost:.2f}")
+
+        started = time.perf_counter()
+        tasks.submit_summary_batches.run()
+        worker_s = time.perf_counter() - started
+        polls = 0
+        while True:
+            polled = time.perf_counter()
+            tasks.poll_summary_batches.run()
+            polls += 1
+            worker_s += time.perf_counter() - polled
+            open_batches = db.scalar(
+                select(func.count()).select_from(SummaryBatch).where(SummaryBatch.completed_at.is_(None))
+            )
+            if not open_batches:
+                break
+            time.sleep(1)
+        db.expire_all()
+        batch = db.scalars(select(SummaryBatch)).one()
+        summarized = db.scalar(
+            select(func.count()).select_from(EpisodeProcessing)
+            .where(EpisodeProcessing.guid.like("batch-%"), EpisodeProcessing.stage == STAGE_SUMMARIZED)
+        )
+        handed_back = db.scalar(
+            select(func.count()).select_from(EpisodeProcessing)
+            .where(EpisodeProcessing.guid.like("batch-%"), EpisodeProcessing.batch_summary == False)
+        )
+        print(f"   batch        {worker_s:7.1f} s worker time ({time.perf_counter() - started:.1f} s until done), "
+              f"1 job ({polls} status checks), {batch.failed} failed, ~${cost * BATCH_DISCOUNT:.2f}")
+        print(f"\n✅ {summarized}/{args.episodes} batch episodes summarized; "
+              f"{handed_back} handed back to per-episode summarization")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Multi-language summaries: one English summary fanned out to translations.
+
+Runs the summarize stage end to end against the local OpenAI stand-in
+(benchmarks/openai_stand_in.py) and a migrated scratch SQLite database
+seeded with transcribed episodes, with several SUMMARY_LANGUAGES:
+
+- fan-out: each episode's translations one after another
+  (TRANSLATION_CONCURRENCY=1) vs all at once, in worker time per episode
+- new market: translating every saved summary into one more language with
+  translate_episode_summaries vs summarizing every transcript again
+- cache: re-running the stage for finished translations makes no calls
+
+Costs are list prices with token counts estimated at 4 characters per token.
+
+Usage (from backend/):
+    python -m benchmarks.bench_summary_languages
+    python -m benchmarks.bench_summary_languages --episodes 50 --languages zh,ja,es,fr,de --chat-latency 1
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.bench_summary_batch import INPUT_PRICE, OUTPUT_PRICE, stand_in_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="English summary fanned out to translations")
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--languages", default="zh,ja,es,fr", help="SUMMARY_LANGUAGES")
+    parser.add_argument("--new-language", default="de", help="Language added for the new-market run")
+    parser.add_argument("--words", type=int, default=6000, help="Words per transcript")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="Seconds per chat call")
+    args = parser.parse_args()
+
+    scratch_dir = tempfile.mkdtemp()
+    database_url = f"sqlite:///{scratch_dir}/summary_languages.db"
+    with stand_in_server(args.chat_latency, batch_seconds=5.0) as base_url:
+        # Settings are read when the app is first imported, so configure it before that
+        os.environ.update(
+            DATABASE_URL=database_url,
+            BLOB_STORE_DIR=os.path.join(scratch_dir, "blobs"),
+            OPENAI_API_KEY="stand-in",
+            OPENAI_BASE_URL=base_url,
+            SUMMARY_LANGUAGES=args.languages,
+        )
+        from benchmarks.bench_episode_indexes import migrate
+        from sqlalchemy import func, select
+        from app import tasks
+        from app.config import settings
+        from app.database import SessionLocal
+        from app.models import EpisodeProcessing, Podcast, SummaryTranslation, STAGE_TRANSCRIBED
+        from app.services import podcast_processor
+        from app.services.blob_store import get_blob_store
+        migrate(database_url)
+
+        # Count calls and prompt characters on their way to the API
+        calls, prompt_chars = Counter(), Counter()
+        for name, build in (("summary", "summary_chat_request"), ("translation", "translation_chat_request")):
+            def counted(*request_args, _name=name, _build=getattr(podcast_processor, build)):
+                request = _build(*request_args)
+                calls[_name] += 1
+                prompt_chars[_name] += len(request["messages"][-1]["content"])
+                return request
+            setattr(podcast_processor, build, counted)
+
+        languages = podcast_processor.summary_languages()
+        rng = random.Random(42)
+        words = [f"word{i}" for i in range(5000)]
+        db = SessionLocal()
+        db.add(Podcast(id=1, name="Bench", rss_url="https://feeds.example.com/bench.xml"))
+        for i in range(args.episodes):
+            db.add(EpisodeProcessing(
+                podcast_id=1, guid=f"episode-{i}", title=f"Episode {i}", audio_url=f"https://media.example.com/{i}.mp3",
+                stage=STAGE_TRANSCRIBED, transcript_key=get_blob_store().put_text(" ".join(rng.choices(words, k=args.words))),
+                attempts=1,
+            ))
+        db.commit()
+        processing_ids = db.scalars(select(EpisodeProcessing.id).order_by(EpisodeProcessing.id)).all()
+        print(f"📝 {args.episodes} transcribed episodes, summaries in {', '.join(languages)}\n")
+
+        half = len(processing_ids) // 2
+        for label, concurrency, ids in (("one by one", 1, processing_ids[:half]),
+                                        ("concurrent", len(languages), processing_ids[half:])):
+            settings.translation_concurrency = concurrency
+            started = time.perf_counter()
+            for processing_id in ids:
+                tasks.summarize_episode.run(processing_id)
+            per_episode = (time.perf_counter() - started) / max(len(ids), 1)
+            print(f"   translations {label:10}  {per_episode:5.2f} s worker time per episode")
+        summary_calls, summary_chars = calls["summary"], prompt_chars["summary"]
+        translation_calls = calls["translation"]
+        print(f"   {summary_calls} summary calls, {translation_calls} translation calls "
+              f"({translation_calls / max(summary_calls, 1):.1f} per episode)")
+
+        # A new market: translate what is there vs summarize everything again
+        calls.clear()
+        prompt_chars.clear()
+        settings.translation_concurrency = len(languages)
+        started = time.perf_counter()
+        tasks.translate_episode_summaries.run(args.new_language)
+        backfill_s = time.perf_counter() - started
+        completion_tokens = 500
+        translate_cost = (prompt_chars["translation"] / 4 * INPUT_PRICE
+                          + calls["translation"] * completion_tokens * OUTPUT_PRICE) / 1e6
+        resummarize_cost = translate_cost + (summary_chars / 4 * INPUT_PRICE
+                                             + summary_calls * completion_tokens * OUTPUT_PRICE) / 1e6
+        print(f"\n🌍 adding {args.new_language}: {calls['translation']} translation calls in {backfill_s:.1f} s, "
+              f"~{prompt_chars['translation'] / 4 / max(calls['translation'], 1):,.0f} prompt tokens each, "
+              f"~${translate_cost:.2f}")
+        print(f"   summarizing every transcript again would send "
+              f"~{summary_chars / 4 / max(summary_calls, 1):,.0f} prompt tokens per episode first, "
+              f"~${resummarize_cost:.2f}")
+
+        # Nothing left to translate: finished translations are never repeated
+        calls.clear()
+        tasks.translate_episode_summaries.run(args.new_language)
+        cached = tasks.translate_summaries(
+            db, db.scalars(select(EpisodeProcessing.english_summary_key)).all(), languages
+        )
+        stored = db.scalar(select(func.count()).select_from(SummaryTranslation))
+        print(f"\n✅ {stored} translations stored; re-running both made {calls['translation']} calls "
+              f"({len(cached)} served from the cache)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
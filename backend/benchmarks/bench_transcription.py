@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Transcription engines compared on speed, cost and agreement.
+
+Transcribes the same audio files with each engine and reports, per engine,
+wall time, the real-time factor (seconds of audio per second of work), the
+cost per audio hour and the word error rate against the first engine's
+transcript. The OpenAI engine is billed per minute; the local engine is
+costed at `--cpu-hour-price` per hour of wall time on this machine.
+
+Needs real speech, e.g. a few downloaded episodes; the OpenAI engine needs
+OPENAI_API_KEY and the local engine `pip install faster-whisper`.
+
+Usage (from backend/):
+    python -m benchmarks.bench_transcription episode1.mp3 episode2.mp3
+    python -m benchmarks.bench_transcription --engines local,openai --cpu-hour-price 0.10 episode.mp3
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.audio_fingerprint import SAMPLE_RATE, AudioDecodeError, decode_audio
+from app.services.transcription import ENGINES, get_transcription_engine
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance over the reference length"""
+    reference, hypothesis = reference.lower().split(), hypothesis.lower().split()
+    if not reference:
+        return float(bool(hypothesis))
+    vocabulary = {word: i for i, word in enumerate(set(reference) | set(hypothesis))}
+    hyp = np.array([vocabulary[word] for word in hypothesis], dtype=np.int64)
+    positions = np.arange(len(hyp) + 1)
+    row = positions.copy()
+    for i, word in enumerate(reference, 1):
+        substitution = row[:-1] + (hyp != vocabulary[word])
+        candidates = np.concatenate([[i], np.minimum(row[1:] + 1, substitution)])
+        # Insertions chain left to right: row[j] = min(candidates[j], row[j - 1] + 1)
+        row = np.minimum.accumulate(candidates - positions) + positions
+    return row[-1] / len(reference)
+
+
+def audio_seconds(path: str, segments) -> float:
+    try:
+        return len(decode_audio(path)) / SAMPLE_RATE
+    except AudioDecodeError:
+        return max((end for _, end, _ in segments), default=0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcription engine benchmark")
+    parser.add_argument("audio", nargs="+", help="Audio files to transcribe")
+    parser.add_argument("--engines", default="openai,local",
+                        help=f"Comma-separated, the first is the WER reference ({', '.join(ENGINES)})")
+    parser.add_argument("--cpu-hour-price", type=float, default=0.05,
+                        help="USD per hour of this machine, for local engines")
+    args = parser.parse_args()
+
+    names = args.engines.split(",")
+    results = {name: {"seconds": 0.0, "audio": 0.0, "texts": []} for name in names}
+    for path in args.audio:
+        for name in names:
+            engine = get_transcription_engine(name)
+            started = time.perf_counter()
+            segments = engine.transcribe(path)
+            elapsed = time.perf_counter() - started
+            result = results[name]
+            result["seconds"] += elapsed
+            result["audio"] += audio_seconds(path, segments)
+            result["texts"].append(" ".join(text.strip() for _, _, text in segments))
+            print(f"   {name:8s} {path}: {elapsed:7.1f} s, {len(result['texts'][-1].split()):,} words")
+
+    reference = results[names[0]]["texts"]
+    print(f"\n🎙️  {len(args.audio)} file(s), WER against {names[0]}\n")
+    print("   engine     wall s  x realtime  USD/audio h     WER")
+    for name in names:
+        result, engine = results[name], get_transcription_engine(name)
+        hours = result["audio"] / 3600
+        cost = engine.cost_per_minute * result["audio"] / 60 or args.cpu_hour_price * result["seconds"] / 3600
+        errors = np.mean([word_error_rate(ref, text) for ref, text in zip(reference, result["texts"])])
+        print(f"   {name:8s} {result['seconds']:8.1f}  {result['audio'] / result['seconds']:10.1f}"
+              f"  {cost / hours if hours else 0:11.3f}  {errors:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
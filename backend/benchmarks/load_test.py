@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request load test for the API.
+
+Drives a fixed mix of public and admin requests (first and deep episode
+pages, per-podcast and date-filtered listings, podcast listing, admin pages,
+/health) at several concurrency levels. For each level it reports requests
+per second and latency percentiles per endpoint, plus the database
+statements and time per request that the server recorded in /metrics.
+/health never touches the database, so its latency under load shows whether
+slow handlers are stalling the event loop. Request choice is seeded, so runs
+against the same data are comparable.
+
+Without --base-url it starts uvicorn locally: on --database-url if given
+(e.g. a database loaded once with benchmarks.seed_data, with the same
+BLOB_STORE_DIR), otherwise on a throwaway SQLite database and blob store
+seeded with --podcasts/--episodes.
+
+Usage (from backend/):
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --concurrency 1,16,64 --duration 15
+    python -m benchmarks.seed_data --database-url sqlite:////tmp/pod_digest_large.db
+    python -m benchmarks.load_test --database-url sqlite:////tmp/pod_digest_large.db --workers 4
+    python -m benchmarks.load_test --base-url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.bench_episode_indexes import BACKEND_DIR, migrate
+from app.services.blob_store import LocalBlobStore
+from benchmarks.seed_data import seed_dataset
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_server(database_url, podcasts: int, episodes: int, workers: int):
+    """Run uvicorn against the given database, or a freshly seeded scratch one"""
+    from sqlalchemy import create_engine
+
+    # Shared metric files, so /metrics covers every uvicorn worker
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp())
+    if not database_url:
+        scratch_dir = tempfile.mkdtemp()
+        database_url = f"sqlite:///{scratch_dir}/load_test.db"
+        env["BLOB_STORE_DIR"] = os.path.join(scratch_dir, "blobs")
+        migrate(database_url)
+        seed_dataset(create_engine(database_url), podcasts, episodes,
+                     blob_store=LocalBlobStore(env["BLOB_STORE_DIR"]))
+        print(f"🌱 Seeded {episodes:,} episodes into {database_url}")
+    env["DATABASE_URL"] = database_url
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/health").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+class Scenario:
+    """Weighted request mix; a seeded RNG keeps runs comparable"""
+
+    def __init__(self, podcast_ids, seed: int):
+        self.podcast_ids = podcast_ids
+        self.rng = random.Random(seed)
+        # Cursors from earlier responses, to page deep like a scrolling user
+        self.episode_cursors = []
+        self.admin_cursors = []
+        self.requests = [
+            (30, "episodes", self.episodes),
+            (10, "episodes deep page", self.episodes_deep),
+            (20, "podcast episodes", self.podcast_episodes),
+            (5, "episodes by date", self.episodes_by_date),
+            (15, "podcasts", lambda: ("/api/podcasts", {})),
+            (5, "admin podcasts", self.admin_podcasts),
+            (15, "health", lambda: ("/health", {})),
+        ]
+        self.weights = list(itertools.accumulate(weight for weight, _, _ in self.requests))
+
+    def next(self):
+        """(label, path, params) for the next request"""
+        _, label, build = self.rng.choices(self.requests, cum_weights=self.weights)[0]
+        return (label, *build())
+
+    def remember(self, label: str, response: httpx.Response):
+        if label not in ("episodes", "episodes deep page", "admin podcasts"):
+            return
+        cursor = response.json().get("next_cursor")
+        cursors = self.admin_cursors if label == "admin podcasts" else self.episode_cursors
+        if cursor and len(cursors) < 1000:
+            cursors.append(cursor)
+
+    def episodes(self):
+        return "/api/episodes", {"limit": 20}
+
+    def episodes_deep(self):
+        if not self.episode_cursors:
+            return self.episodes()
+        return "/api/episodes", {"limit": 20, "cursor": self.rng.choice(self.episode_cursors)}
+
+    def podcast_episodes(self):
+        return "/api/episodes", {"podcast_id": self.rng.choice(self.podcast_ids), "limit": 20}
+
+    def episodes_by_date(self):
+        before = datetime.now(timezone.utc) - timedelta(days=self.rng.randint(0, 3 * 365))
+        return "/api/episodes", {
+            "published_before": before.isoformat(),
+            "published_after": (before - timedelta(days=30)).isoformat(),
+            "limit": 20,
+        }
+
+    def admin_podcasts(self):
+        params = {"limit": 200}
+        if self.admin_cursors and self.rng.random() < 0.5:
+            params["cursor"] = self.rng.choice(self.admin_cursors)
+        return "/api/admin/podcasts", params
+
+
+def scrape_db_usage(base_url: str):
+    """{route: (requests, statements, DB seconds)} from the server's /metrics"""
+    usage = defaultdict(lambda: [0.0, 0.0, 0.0])
+    try:
+        response = httpx.get(f"{base_url}/metrics")
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return {}
+    for family in text_string_to_metric_families(response.text):
+        if family.name not in ("http_request_db_queries", "http_request_db_seconds"):
+            continue
+        for sample in family.samples:
+            route = sample.labels.get("route")
+            if sample.name == "http_request_db_queries_count":
+                usage[route][0] += sample.value
+            elif sample.name == "http_request_db_queries_sum":
+                usage[route][1] += sample.value
+            elif sample.name == "http_request_db_seconds_sum":
+                usage[route][2] += sample.value
+    return usage
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, scenario: Scenario):
+    latencies = defaultdict(list)
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            label, path, params = scenario.next()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                response.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies[label].append((time.perf_counter() - start) * 1000)
+            scenario.remember(label, response)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def percentile(values, pct: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def report(concurrency: int, latencies, errors: int, elapsed: float, db_before, db_after):
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n👥 concurrency {concurrency}: {total / elapsed:,.0f} req/s "
+          f"({total:,} requests, {errors} errors, {elapsed:.1f}s)")
+    print(f"   {'endpoint':<20}{'count':>8}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for label in sorted(latencies):
+        values = latencies[label]
+        print(f"   {label:<20}{len(values):>8}{len(values) / elapsed:>8.1f}{percentile(values, 50):>10.1f}"
+              f"{percentile(values, 95):>10.1f}{percentile(values, 99):>10.1f}")
+
+    if not db_after:
+        return
+    print(f"   {'server route':<28}{'queries/req':>12}{'DB ms/req':>12}")
+    for route in sorted(db_after):
+        requests, statements, seconds = (
+            after - before for after, before in zip(db_after[route], db_before.get(route, (0, 0, 0)))
+        )
+        if requests:
+            print(f"   {route:<28}{statements / requests:>12.1f}{seconds * 1000 / requests:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument("--base-url", help="Test a running server instead of starting one")
+    parser.add_argument("--database-url", help="Serve this (already seeded) database locally")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--podcasts", type=int, default=200)
+    parser.add_argument("--episodes", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42, help="Seeds the request mix")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    if args.base_url:
+        server = nullcontext(args.base_url)
+    else:
+        server = local_server(args.database_url, args.podcasts, args.episodes, args.workers)
+
+    with server as base_url:
+        podcasts = httpx.get(f"{base_url}/api/podcasts").json()
+        podcast_ids = [podcast["id"] for podcast in podcasts] or [1]
+        print(f"🎯 Target: {base_url}")
+        for concurrency in levels:
+            scenario = Scenario(podcast_ids, args.seed)
+            db_before = scrape_db_usage(base_url)
+            results = asyncio.run(run_level(base_url, concurrency, args.duration, scenario))
+            report(concurrency, *results, db_before, scrape_db_usage(base_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the OpenAI API the summarize stage uses.
+
+Serves chat completions (after --chat-latency seconds, like a real call)
+and the Batch API: file upload, batch creation and status, and output
+download. A batch is "validating", then "in_progress", and completes
+--batch-seconds after it was created. Summary replies follow the summary
+prompt's format and echo the episode title; episodes whose title contains
+"FAIL" get an error instead, so failure handling can be exercised, and
+a batch with an "EXPIRE" episode expires before answering that one.
+Translation requests get the summary back, tagged with the language.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:PORT/v1.
+
+Usage (from backend/):
+    python -m benchmarks.openai_stand_in --port 8765
+"""
+
+import argparse
+import asyncio
+import itertools
+import re
+import time
+
+import orjson
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import Response
+
+CHAT_LATENCY = 0.5
+BATCH_SECONDS = 5.0
+
+app = FastAPI()
+files = {}
+batches = {}
+ids = itertools.count(1)
+
+
+def completion(body: dict):
+    """(status code, response body) for one chat completion request"""
+    prompt = body["messages"][-1]["content"]
+    translation = re.search(r"Translate this podcast summary to (.*?), .*\n\nSummary:\n(.*)", prompt, re.S)
+    match = re.search(r"Episode Title: (.*)", prompt)
+    title = match.group(1) if match else ""
+    if "FAIL" in title:
+        return 400, {"error": {"message": f"Rejected: {title}", "type": "invalid_request_error"}}
+    if translation:
+        content = f"[{translation.group(1)}] {translation.group(2).strip()}"
+    else:
+        content = f"ENGLISH_SUMMARY:\nSummary of {title}, from a transcript of {len(prompt)} characters."
+    return 200, {
+        "id": f"chatcmpl-{next(ids)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                  "total_tokens": (len(prompt) + len(content)) // 4},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: dict):
+    await asyncio.sleep(CHAT_LATENCY)
+    status, response = completion(body)
+    if status != 200:
+        raise HTTPException(status_code=status, detail=response["error"])
+    return response
+
+
+@app.post("/v1/files")
+async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+    file_id = f"file-{next(ids)}"
+    files[file_id] = await file.read()
+    return {"id": file_id, "object": "file", "bytes": len(files[file_id]), "purpose": purpose,
+            "filename": file.filename, "created_at": int(time.time())}
+
+
+@app.get("/v1/files/{file_id}/content")
+def file_content(file_id: str):
+    if file_id not in files:
+        raise HTTPException(status_code=404, detail="No such file")
+    return Response(files[file_id], media_type="application/jsonl")
+
+
+@app.post("/v1/batches")
+def create_batch(body: dict):
+    if body.get("input_file_id") not in files:
+        raise HTTPException(status_code=400, detail="No such input file")
+    batch_id = f"batch_{next(ids)}"
+    batches[batch_id] = {
+        "id": batch_id, "object": "batch", "endpoint": body["endpoint"], "status": "validating",
+        "input_file_id": body["input_file_id"], "completion_window": body["completion_window"],
+        "output_file_id": None, "error_file_id": None, "created_at": time.time(),
+        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+    }
+    return batches[batch_id]
+
+
+def run_batch(batch: dict) -> str:
+    """Answer every request of the input file into output and error files;
+    returns the batch's final status"""
+    output, errors = [], []
+    status_after = "completed"
+    for line in files[batch["input_file_id"]].splitlines():
+        request = orjson.loads(line)
+        if "EXPIRE" in request["body"]["messages"][-1]["content"]:
+            # Left unanswered when the completion window ran out, as the API reports it
+            status_after = "expired"
+            result = {"id": f"batch_req_{next(ids)}", "custom_id": request["custom_id"], "response": None,
+                      "error": {"code": "batch_expired", "message": "This request could not be executed "
+                                "before the completion window expired."}}
+            errors.append(orjson.dumps(result))
+            continue
+        status, body = completion(request["body"])
+        result = {"id": f"batch_req_{next(ids)}", "custom_id": request["custom_id"],
+                  "response": {"status_code": status, "body": body}, "error": None}
+        (output if status == 200 else errors).append(orjson.dumps(result))
+    for key, lines in (("output_file_id", output), ("error_file_id", errors)):
+        if lines:
+            batch[key] = f"file-{next(ids)}"
+            files[batch[key]] = b"\n".join(lines) + b"\n"
+    batch["request_counts"] = {"total": len(output) + len(errors), "completed": len(output), "failed": len(errors)}
+    return status_after
+
+
+@app.get("/v1/batches/{batch_id}")
+def get_batch(batch_id: str):
+    batch = batches.get(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="No such batch")
+    elapsed = time.time() - batch["created_at"]
+    if batch["status"] not in ("completed", "expired"):
+        if elapsed >= BATCH_SECONDS:
+            batch["status"] = run_batch(batch)
+        elif elapsed >= BATCH_SECONDS / 5:
+            batch["status"] = "in_progress"
+    return batch
+
+
+def main():
+    global CHAT_LATENCY, BATCH_SECONDS
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI API stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chat-latency", type=float, default=CHAT_LATENCY, help="Seconds per chat completion")
+    parser.add_argument("--batch-seconds", type=float, default=BATCH_SECONDS, help="Seconds until a batch completes")
+    args = parser.parse_args()
+    CHAT_LATENCY, BATCH_SECONDS = args.chat_latency, args.batch_seconds
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
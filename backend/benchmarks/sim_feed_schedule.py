@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Simulate feed polling: fixed interval vs the adaptive scheduler.
+
+Generates feeds with daily, weekday, weekly, biweekly, monthly and irregular
+release patterns (with release-time noise), then replays a stretch of time
+under each policy. Reports the fetches made and how long new episodes took
+to be noticed. Pure simulation with the real scheduling functions: no
+database or network.
+
+Usage (from backend/):
+    python -m benchmarks.sim_feed_schedule
+    python -m benchmarks.sim_feed_schedule --feeds 2000 --days 90 --fixed-minutes 30
+"""
+
+import argparse
+import bisect
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+
+from app.services.feed_schedule import learn_cadence, next_poll_time
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def release_times(rng: random.Random, pattern: str, days: int):
+    """Release timestamps from 60 days of back catalog through the simulation"""
+    history = timedelta(days=60)
+    hour = rng.randint(0, 23)
+    noise = lambda: timedelta(minutes=rng.gauss(0, 20))
+    releases = []
+    day = START - history
+    while day < START + timedelta(days=days):
+        base = day.replace(hour=hour, minute=0)
+        if pattern == "daily":
+            releases.append(base + noise())
+            day += timedelta(days=1)
+        elif pattern == "weekdays":
+            if base.weekday() < 5:
+                releases.append(base + noise())
+            day += timedelta(days=1)
+        elif pattern == "weekly":
+            releases.append(base + noise())
+            day += timedelta(days=7)
+        elif pattern == "biweekly":
+            releases.append(base + noise())
+            day += timedelta(days=14)
+        elif pattern == "monthly":
+            releases.append(base + noise())
+            day += timedelta(days=30)
+        else:  # irregular
+            releases.append(base + timedelta(hours=rng.uniform(0, 24)))
+            day += timedelta(days=rng.expovariate(1 / 5))
+    return sorted(releases)
+
+
+def simulate(releases, days: int, policy: str, fixed_minutes: int):
+    """Replay one feed; returns (fetches, detection delays in minutes)"""
+    end = START + timedelta(days=days)
+    seen = bisect.bisect_right(releases, START)
+    now = START
+    fetches = 0
+    delays = []
+    while now < end:
+        fetches += 1
+        published = bisect.bisect_right(releases, now)
+        delays += [(now - release).total_seconds() / 60 for release in releases[seen:published]]
+        seen = published
+
+        if policy == "fixed":
+            now += timedelta(minutes=fixed_minutes)
+        else:
+            cadence, spread, last = learn_cadence(releases[:published])
+            now = next_poll_time(cadence, spread, last, now)
+    return fetches, delays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed polling simulation")
+    parser.add_argument("--feeds", type=int, default=600)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--fixed-minutes", type=int, default=15, help="Interval of the fixed policy")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    patterns = ["daily", "weekdays", "weekly", "weekly", "weekly", "biweekly", "monthly", "irregular"]
+    feeds = [(pattern, release_times(rng, pattern, args.days))
+             for pattern in (rng.choice(patterns) for _ in range(args.feeds))]
+
+    print(f"📡 {args.feeds} feeds over {args.days} days\n")
+    print(f"   {'policy':<18}{'fetches':>10}{'per feed/day':>14}{'p50 delay':>12}{'p95 delay':>12}{'max delay':>12}")
+    for policy in ("fixed", "adaptive"):
+        total_fetches = 0
+        delays = []
+        for _, releases in feeds:
+            fetches, feed_delays = simulate(releases, args.days, policy, args.fixed_minutes)
+            total_fetches += fetches
+            delays += feed_delays
+        label = f"fixed {args.fixed_minutes} min" if policy == "fixed" else "adaptive"
+        quantiles = statistics.quantiles(delays, n=20)
+        print(f"   {label:<18}{total_fetches:>10,}{total_fetches / args.feeds / args.days:>14.1f}"
+              f"{statistics.median(delays):>10.0f} m{quantiles[18]:>10.0f} m{max(delays):>10.0f} m")
+
+    print("\nAdaptive delay by release pattern (p50 / p95 minutes):")
+    for pattern in sorted(set(patterns)):
+        delays = []
+        for feed_pattern, releases in feeds:
+            if feed_pattern == pattern:
+                delays += simulate(releases, args.days, "adaptive", args.fixed_minutes)[1]
+        if len(delays) > 1:
+            quantiles = statistics.quantiles(delays, n=20)
+            print(f"   {pattern:<12}{statistics.median(delays):>6.0f} / {quantiles[18]:.0f}")
+
+
+if __name__ == "__main__":
+    main()
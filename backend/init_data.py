@@ -3,8 +3,10 @@
 Script to initialize the database with sample podcast data
 """
 
-from app.database import SessionLocal, engine
-from app.models import Base, Podcast
+from alembic import command
+from alembic.config import Config
+from app.database import SessionLocal
+from app.models import Podcast
 
 # Sample podcast data
 SAMPLE_PODCASTS = [
@@ -49,8 +51,8 @@ SAMPLE_PODCASTS = [
 
 def init_database():
     """Initialize database with sample data"""
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create / upgrade tables through the migrations
+    command.upgrade(Config("alembic.ini"), "head")
     
     # Add sample podcasts
     db = SessionLocal()
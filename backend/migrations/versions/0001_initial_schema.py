@@ -0,0 +1,72 @@
+"""Initial schema: podcasts, episodes and newsletters
+
+Databases created by Base.metadata.create_all before migrations existed
+already have this schema; mark them with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'podcasts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('cover_image_url', sa.Text(), nullable=True),
+        sa.Column('rss_url', sa.Text(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('rss_url'),
+    )
+    op.create_index('ix_podcasts_id', 'podcasts', ['id'])
+
+    op.create_table(
+        'episodes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('podcast_id', sa.Integer(), nullable=True),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('audio_url', sa.Text(), nullable=True),
+        sa.Column('publish_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('summary_mandarin', sa.Text(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['podcast_id'], ['podcasts.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_episodes_id', 'episodes', ['id'])
+
+    op.create_table(
+        'newsletters',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('beehiiv_post_id', sa.String(length=255), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('episode_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_newsletters_id', 'newsletters', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_newsletters_id', table_name='newsletters')
+    op.drop_table('newsletters')
+    op.drop_index('ix_episodes_id', table_name='episodes')
+    op.drop_table('episodes')
+    op.drop_index('ix_podcasts_id', table_name='podcasts')
+    op.drop_table('podcasts')
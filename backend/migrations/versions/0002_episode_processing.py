@@ -0,0 +1,57 @@
+"""Episode pipeline checkpoints and GUID identity
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.add_column(sa.Column('guid', sa.String(length=512), nullable=True))
+        batch_op.create_index('ux_episodes_podcast_guid', ['podcast_id', 'guid'], unique=True)
+
+    op.create_table(
+        'episode_processing',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('podcast_id', sa.Integer(), nullable=False),
+        sa.Column('guid', sa.String(length=512), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('audio_url', sa.Text(), nullable=False),
+        sa.Column('publish_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('stage', sa.String(length=20), nullable=False),
+        sa.Column('audio_path', sa.Text(), nullable=True),
+        sa.Column('transcript_path', sa.Text(), nullable=True),
+        sa.Column('episode_id', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['episode_id'], ['episodes.id']),
+        sa.ForeignKeyConstraint(['podcast_id'], ['podcasts.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_episode_processing_id', 'episode_processing', ['id'])
+    op.create_index('ux_episode_processing_podcast_guid', 'episode_processing', ['podcast_id', 'guid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_episode_processing_podcast_guid', table_name='episode_processing')
+    op.drop_index('ix_episode_processing_id', table_name='episode_processing')
+    op.drop_table('episode_processing')
+
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_index('ux_episodes_podcast_guid')
+        batch_op.drop_column('guid')
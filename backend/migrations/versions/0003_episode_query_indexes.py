@@ -0,0 +1,35 @@
+"""Indexes for the newsletter, dedup and per-podcast episode queries
+
+- ix_episodes_processed_at: weekly newsletter range filter on processed_at
+- ix_episodes_podcast_publish_date: per-podcast listings ordered by date,
+  and the podcasts -> episodes join
+- ix_episodes_podcast_audio_url: dedup lookup for episodes saved before
+  GUIDs were tracked
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_episodes_processed_at', 'episodes', ['processed_at'])
+    op.create_index('ix_episodes_podcast_publish_date', 'episodes', ['podcast_id', 'publish_date'])
+    op.create_index('ix_episodes_podcast_audio_url', 'episodes', ['podcast_id', 'audio_url'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_episodes_podcast_audio_url', table_name='episodes')
+    op.drop_index('ix_episodes_podcast_publish_date', table_name='episodes')
+    op.drop_index('ix_episodes_processed_at', table_name='episodes')
@@ -0,0 +1,32 @@
+"""Keyset pagination indexes on (publish_date, id)
+
+Widens the per-podcast date index with id so filtered pages are served
+from the index in Postgres too, where id is not implicitly part of it.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_episodes_publish_date_id', 'episodes', ['publish_date', 'id'])
+    op.create_index('ix_episodes_podcast_publish_date_id', 'episodes', ['podcast_id', 'publish_date', 'id'])
+    op.drop_index('ix_episodes_podcast_publish_date', table_name='episodes')
+
+
+def downgrade() -> None:
+    op.create_index('ix_episodes_podcast_publish_date', 'episodes', ['podcast_id', 'publish_date'])
+    op.drop_index('ix_episodes_podcast_publish_date_id', table_name='episodes')
+    op.drop_index('ix_episodes_publish_date_id', table_name='episodes')
@@ -0,0 +1,44 @@
+"""Feed polling state for the adaptive scheduler
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'feed_states',
+        sa.Column('podcast_id', sa.Integer(), nullable=False),
+        sa.Column('etag', sa.Text(), nullable=True),
+        sa.Column('last_modified', sa.String(length=64), nullable=True),
+        sa.Column('cadence_seconds', sa.Integer(), nullable=True),
+        sa.Column('release_spread_seconds', sa.Integer(), nullable=True),
+        sa.Column('last_published_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_polled_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_changed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('next_poll_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('polls', sa.Integer(), nullable=False),
+        sa.Column('not_modified_polls', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['podcast_id'], ['podcasts.id']),
+        sa.PrimaryKeyConstraint('podcast_id'),
+    )
+    op.create_index('ix_feed_states_next_poll_at', 'feed_states', ['next_poll_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feed_states_next_poll_at', table_name='feed_states')
+    op.drop_table('feed_states')
@@ -0,0 +1,132 @@
+"""Transcripts and summaries move to the content-addressed blob store
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 19:00:00
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+from app.services.blob_store import BlobNotFound, get_blob_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+episodes = sa.table(
+    'episodes',
+    sa.column('id', sa.Integer),
+    sa.column('summary_mandarin', sa.Text),
+    sa.column('summary_key', sa.String),
+)
+episode_processing = sa.table(
+    'episode_processing',
+    sa.column('id', sa.Integer),
+    sa.column('stage', sa.String),
+    sa.column('transcript_path', sa.Text),
+    sa.column('transcript_key', sa.String),
+)
+
+
+def copy_in_batches(source, target, convert) -> None:
+    """Fill `target` from `source` for every row where `source` is set,
+    through `convert`; rows it returns None for are left empty"""
+    conn = op.get_bind()
+    table = source.table
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.id, source)
+            .where(table.c.id > last_id, source.isnot(None))
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        updates = [
+            {'row_id': row_id, 'value': value}
+            for row_id, value in ((row_id, convert(row_id, value)) for row_id, value in rows)
+            if value is not None
+        ]
+        if updates:
+            conn.execute(
+                table.update().where(table.c.id == sa.bindparam('row_id')).values({target.name: sa.bindparam('value')}),
+                updates,
+            )
+        last_id = rows[-1].id
+
+
+def read_transcript_file(processing_id, path):
+    if not os.path.exists(path):
+        return None  # the pipeline redoes its earlier stages
+    with open(path, encoding='utf-8') as f:
+        return get_blob_store().put_text(f.read())
+
+
+def write_transcript_file(processing_id, key):
+    try:
+        transcript = get_blob_store().get_text(key)
+    except BlobNotFound:
+        return None
+    transcript_dir = os.path.join(settings.media_dir, 'transcripts')
+    os.makedirs(transcript_dir, exist_ok=True)
+    path = os.path.join(transcript_dir, f"{processing_id}.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(transcript)
+    return path
+
+
+def upgrade() -> None:
+    store = get_blob_store()
+
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.add_column(sa.Column('transcript_key', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('summary_key', sa.String(length=64), nullable=True))
+    copy_in_batches(episodes.c.summary_mandarin, episodes.c.summary_key, lambda _, text: store.put_text(text))
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_column('summary_mandarin')
+
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.add_column(sa.Column('transcript_key', sa.String(length=64), nullable=True))
+    copy_in_batches(episode_processing.c.transcript_path, episode_processing.c.transcript_key, read_transcript_file)
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.drop_column('transcript_path')
+
+
+def downgrade() -> None:
+    store = get_blob_store()
+
+    def read_summary(episode_id, key):
+        try:
+            return store.get_text(key)
+        except BlobNotFound:
+            return None
+
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.add_column(sa.Column('transcript_path', sa.Text(), nullable=True))
+    # Only pipelines still waiting to summarize need their transcript file back
+    op.execute(
+        episode_processing.update()
+        .where(episode_processing.c.stage == 'summarized')
+        .values(transcript_key=None)
+    )
+    copy_in_batches(episode_processing.c.transcript_key, episode_processing.c.transcript_path, write_transcript_file)
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.drop_column('transcript_key')
+
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.add_column(sa.Column('summary_mandarin', sa.Text(), nullable=True))
+    copy_in_batches(episodes.c.summary_key, episodes.c.summary_mandarin, read_summary)
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_column('summary_key')
+        batch_op.drop_column('transcript_key')
@@ -0,0 +1,36 @@
+"""Precomputed related episodes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 21:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'related_episodes',
+        sa.Column('episode_id', sa.Integer(), nullable=False),
+        sa.Column('related_episode_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['episode_id'], ['episodes.id']),
+        sa.ForeignKeyConstraint(['related_episode_id'], ['episodes.id']),
+        sa.PrimaryKeyConstraint('episode_id', 'related_episode_id'),
+    )
+    op.create_index('ix_related_episodes_score', 'related_episodes', ['score'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_related_episodes_score', table_name='related_episodes')
+    op.drop_table('related_episodes')
@@ -0,0 +1,34 @@
+"""Audio fingerprints and skipped recurring spans per pipeline row
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.add_column(sa.Column('fingerprint_key', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('audio_seconds', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('skipped_seconds', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('skipped_spans', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.drop_column('skipped_spans')
+        batch_op.drop_column('skipped_seconds')
+        batch_op.drop_column('audio_seconds')
+        batch_op.drop_column('fingerprint_key')
@@ -0,0 +1,56 @@
+"""Batch API summary jobs for backfills
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'summary_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('provider_batch_id', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False),
+        sa.Column('succeeded', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_summary_batches_id'), 'summary_batches', ['id'], unique=False)
+    op.create_index('ix_summary_batches_status', 'summary_batches', ['status'], unique=False)
+
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.add_column(sa.Column('batch_summary', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.add_column(sa.Column('summary_batch_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_episode_processing_summary_batch_id', 'summary_batches', ['summary_batch_id'], ['id']
+        )
+        batch_op.create_index('ix_episode_processing_summary_batch', ['summary_batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.drop_index('ix_episode_processing_summary_batch')
+        batch_op.drop_constraint('fk_episode_processing_summary_batch_id', type_='foreignkey')
+        batch_op.drop_column('summary_batch_id')
+        batch_op.drop_column('batch_summary')
+
+    op.drop_index('ix_summary_batches_status', table_name='summary_batches')
+    op.drop_index(op.f('ix_summary_batches_id'), table_name='summary_batches')
+    op.drop_table('summary_batches')
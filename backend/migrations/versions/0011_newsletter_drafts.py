@@ -0,0 +1,53 @@
+"""Incrementally maintained newsletter draft and cached episode fragments
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'newsletter_drafts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_key', sa.String(length=64), nullable=True),
+        sa.Column('episode_ids', sa.Text(), nullable=True),
+        sa.Column('episode_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('newsletter_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['newsletter_id'], ['newsletters.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_newsletter_drafts_id'), 'newsletter_drafts', ['id'], unique=False)
+    op.create_index('ix_newsletter_drafts_published_at', 'newsletter_drafts', ['published_at'], unique=False)
+
+    op.create_table(
+        'newsletter_fragments',
+        sa.Column('episode_id', sa.Integer(), nullable=False),
+        sa.Column('inputs_hash', sa.String(length=64), nullable=False),
+        sa.Column('fragment_key', sa.String(length=64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['episode_id'], ['episodes.id']),
+        sa.PrimaryKeyConstraint('episode_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('newsletter_fragments')
+    op.drop_index('ix_newsletter_drafts_published_at', table_name='newsletter_drafts')
+    op.drop_index(op.f('ix_newsletter_drafts_id'), table_name='newsletter_drafts')
+    op.drop_table('newsletter_drafts')
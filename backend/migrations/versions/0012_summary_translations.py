@@ -0,0 +1,45 @@
+"""English summaries and per-language summary translations
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'summary_translations',
+        sa.Column('source_key', sa.String(length=64), nullable=False),
+        sa.Column('language', sa.String(length=16), nullable=False),
+        sa.Column('summary_key', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('source_key', 'language'),
+    )
+
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.add_column(sa.Column('english_summary_key', sa.String(length=64), nullable=True))
+
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.add_column(sa.Column('english_summary_key', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('episode_processing') as batch_op:
+        batch_op.drop_column('english_summary_key')
+
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_column('english_summary_key')
+
+    op.drop_table('summary_translations')
@@ -0,0 +1,40 @@
+"""One open newsletter draft, and a lease for refreshing it
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-20 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('newsletter_drafts') as batch_op:
+        batch_op.add_column(sa.Column('is_open', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('refreshing_until', sa.DateTime(timezone=True), nullable=True))
+
+    # Overlapping refreshes could have started more than one draft; the newest stays open
+    op.execute(
+        "UPDATE newsletter_drafts SET is_open = true WHERE id = "
+        "(SELECT max(id) FROM newsletter_drafts WHERE published_at IS NULL)"
+    )
+
+    with op.batch_alter_table('newsletter_drafts') as batch_op:
+        batch_op.create_index('ux_newsletter_drafts_open', ['is_open'], unique=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('newsletter_drafts') as batch_op:
+        batch_op.drop_index('ux_newsletter_drafts_open')
+        batch_op.drop_column('refreshing_until')
+        batch_op.drop_column('is_open')
@@ -12,6 +12,9 @@ export FRONTEND_URL="http://localhost:3000"
 source test_env/bin/activate
 
 # 启动服务器
+# 应用数据库迁移（API启动时不再建表）
+alembic upgrade head
+
 echo "🚀 启动Podcast API服务器..."
 echo "📡 访问地址: http://localhost:8000"
 echo "📚 API文档: http://localhost:8000/docs"
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when the app is first imported, so point it at scratch
+# storage before any test module imports it
+SCRATCH_DIR = tempfile.mkdtemp()
+DATABASE_URL = f"sqlite:///{SCRATCH_DIR}/test.db"
+os.environ.update(
+    DATABASE_URL=DATABASE_URL,
+    BLOB_STORE_DIR=os.path.join(SCRATCH_DIR, "blobs"),
+    MEDIA_DIR=os.path.join(SCRATCH_DIR, "media"),
+    RELATED_INDEX_PATH=os.path.join(SCRATCH_DIR, "related_index.npz"),
+    OPENAI_API_KEY="stand-in",
+)
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The scratch database, migrated to head"""
+    from benchmarks.bench_episode_indexes import migrate
+    migrate(DATABASE_URL)
+    return DATABASE_URL
+
+
+@pytest.fixture
+def db(database):
+    from app.database import SessionLocal
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def openai_stand_in():
+    """Every OpenAI call goes to the local stand-in; its batches finish in a second"""
+    from benchmarks.bench_summary_batch import stand_in_server
+    from app.config import settings
+    with stand_in_server(chat_latency=0.0, batch_seconds=1.0) as base_url:
+        settings.openai_base_url = base_url
+        yield base_url
+
+
+@pytest.fixture
+def eager_celery():
+    """Tasks queued with .delay() run inline"""
+    from app.tasks import celery_app
+    celery_app.conf.task_always_eager = True
+    yield
+    celery_app.conf.task_always_eager = False
@@ -0,0 +1,77 @@
+import time
+
+from sqlalchemy import select
+
+from app import tasks
+from app.config import settings
+from app.models import (
+    Episode, EpisodeProcessing, Podcast, SummaryBatch, STAGE_SUMMARIZED, STAGE_TRANSCRIBED,
+)
+from app.services.blob_store import get_blob_store
+
+
+def add_backfill(db, titles):
+    """Transcribed backfill episodes waiting for a summary batch"""
+    podcast = Podcast(name="Backfill", rss_url=f"https://feeds.example.com/{time.time_ns()}.xml")
+    db.add(podcast)
+    db.flush()
+    states = [
+        EpisodeProcessing(
+            podcast_id=podcast.id, guid=f"episode-{i}", title=title,
+            audio_url=f"https://media.example.com/{i}.mp3", stage=STAGE_TRANSCRIBED,
+            transcript_key=get_blob_store().put_text(f"Transcript of {title}."),
+            batch_summary=True, attempts=1,
+        )
+        for i, title in enumerate(titles)
+    ]
+    db.add_all(states)
+    db.commit()
+    return states
+
+
+def poll_until_finished(db, batch_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        tasks.poll_summary_batches.run()
+        db.expire_all()
+        batch = db.get(SummaryBatch, batch_id)
+        if batch.completed_at is not None:
+            return batch
+        assert time.monotonic() < deadline, f"batch still {batch.status}"
+        time.sleep(0.2)
+
+
+def test_batch_summaries_are_written_back_and_failures_handed_back(db, openai_stand_in, eager_celery, monkeypatch):
+    monkeypatch.setattr(settings, "summary_batch_size", 4)
+    summarized = add_backfill(db, ["Interest rates", "Tariffs"])
+    rejected, expired = add_backfill(db, ["Rejected FAIL", "Slow EXPIRE"])
+    
+    tasks.submit_summary_batches.run()
+    db.expire_all()
+    batch = db.scalars(select(SummaryBatch)).one()
+    assert batch.provider_batch_id
+    assert batch.request_count == 4
+    assert {state.summary_batch_id for state in summarized + [rejected, expired]} == {batch.id}
+    
+    batch = poll_until_finished(db, batch.id)
+    assert batch.status == "expired"
+    assert (batch.succeeded, batch.failed) == (2, 2)
+    
+    store = get_blob_store()
+    for state in summarized:
+        assert state.stage == STAGE_SUMMARIZED
+        episode = db.get(Episode, state.episode_id)
+        # The stand-in echoes the title, so each summary landed on its own episode
+        assert state.title in store.get_text(episode.english_summary_key)
+        assert store.get_text(episode.summary_key)
+    
+    for state, error in ((rejected, "Rejected FAIL"), (expired, "batch_expired")):
+        assert state.stage == STAGE_TRANSCRIBED
+        assert state.batch_summary is False
+        assert batch.provider_batch_id in state.last_error
+        assert error in state.last_error
+    
+    # The next feed run sends them through per-episode summarization
+    claimed = {processing_id for _, processing_id in tasks.claim_stalled_episodes(db, [rejected.podcast_id])}
+    db.commit()
+    assert claimed == {rejected.id, expired.id}
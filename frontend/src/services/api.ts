@@ -42,6 +42,11 @@ export interface SubscribeResponse {
   subscriber_id?: string;
 }
 
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
 export const api = {
   getPodcasts: async (): Promise<Podcast[]> => {
     const response = await axios.get(`${API_BASE_URL}/podcasts`);
@@ -50,8 +55,16 @@ export const api = {
 
   // Admin functions
   getAllPodcasts: async (): Promise<PodcastFull[]> => {
-    const response = await axios.get(`${API_BASE_URL}/admin/podcasts`);
-    return response.data;
+    const podcasts: PodcastFull[] = [];
+    let cursor: string | null = null;
+    do {
+      const response: { data: Page<PodcastFull> } = await axios.get(`${API_BASE_URL}/admin/podcasts`, {
+        params: { limit: 200, cursor: cursor || undefined },
+      });
+      podcasts.push(...response.data.items);
+      cursor = response.data.next_cursor;
+    } while (cursor);
+    return podcasts;
   },
 
   createPodcast: async (podcast: PodcastCreate): Promise<PodcastFull> => {
@@ -14,6 +14,9 @@ import re
 import argparse
 import tempfile
 import sqlite3
+import json
+import hashlib
+import zlib
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -42,17 +45,114 @@ except ImportError as e:
     print("      - Ubuntu: sudo apt install ffmpeg") 
     print("      - Windows: 下載 ffmpeg 並添加到 PATH")
 
+# 轉錄文字存入內容定址 blob 存儲（相同內容只存一份，壓縮保存）；
+# 將 BLOB_STORE_DIR 設為後端使用的目錄即可與後端共用
+BLOB_DIR = Path(os.environ.get("BLOB_STORE_DIR", "downloads/blobs"))
+TRANSCRIPT_INDEX = Path("downloads/transcripts/index.jsonl")
+
+
+class BlobNotFound(Exception):
+    """blob 存儲中沒有這個 key"""
+
+
+class LocalBlobStore:
+    """內容定址的本地 blob 存儲
+    
+    key 為未壓縮內容的 SHA-256，文件以 zlib 壓縮保存在 root/ab/cd/abcd...，
+    與後端 LocalBlobStore 的佈局相同，所以兩邊可以共用同一個目錄。
+    """
+    
+    def __init__(self, root):
+        self.root = Path(root)
+    
+    def path(self, key):
+        return self.root / key[:2] / key[2:4] / key
+    
+    def put_text(self, text):
+        data = text.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+        path = self.path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 先寫臨時文件再改名，讀取方不會看到寫了一半的 blob
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        return key
+    
+    def get_text(self, key):
+        try:
+            return zlib.decompress(self.path(key).read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+
+class OpenAITranscriptionEngine:
+    """OpenAI 的 Whisper API，單個文件上限 25MB"""
+    
+    name = "openai"
+    max_upload_bytes = 25 * 1024 * 1024
+    
+    def __init__(self, api_key, model="whisper-1"):
+        self.model_name = model
+        self.client = OpenAI(api_key=api_key)
+    
+    def transcribe_text(self, audio_path, language="en"):
+        with open(audio_path, 'rb') as audio_file:
+            transcript = self.client.audio.transcriptions.create(
+                model=self.model_name,
+                file=audio_file,
+                language=language
+            )
+        return transcript.text
+
+
+class LocalWhisperEngine:
+    """本機 CPU 上的 faster-whisper，沒有上傳上限；設定與後端相同的環境變量"""
+    
+    name = "local"
+    max_upload_bytes = None
+    
+    def __init__(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ValueError("本機轉錄引擎需要 faster-whisper: pip install faster-whisper")
+        self.model_name = os.environ.get("LOCAL_WHISPER_MODEL", "small.en")
+        self.beam_size = int(os.environ.get("LOCAL_WHISPER_BEAM_SIZE", "5"))
+        # 第一次使用時下載到 Hugging Face 緩存
+        self.model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=os.environ.get("LOCAL_WHISPER_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(os.environ.get("LOCAL_WHISPER_THREADS", "0")) or os.cpu_count() or 1,
+        )
+    
+    def transcribe_text(self, audio_path, language="en"):
+        segments, _ = self.model.transcribe(
+            audio_path, language=language, beam_size=self.beam_size, vad_filter=True
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
 
 class UnifiedPodcastProcessor:
     """統一的Podcast處理器 - 增強轉錄版本"""
     
-    def __init__(self):
-        # 檢查OpenAI API Key
-        self.openai_api_key = os.environ.get("OPENAI_API_KEY")
-        if not self.openai_api_key:
-            raise ValueError("請設置 OPENAI_API_KEY 環境變量")
-        
-        self.openai_client = OpenAI(api_key=self.openai_api_key)
+    def __init__(self, engine_name=None):
+        # 轉錄引擎: openai（Whisper API）或 local（本機 CPU 上的 faster-whisper）
+        engine_name = engine_name or os.environ.get("TRANSCRIPTION_ENGINE", "openai")
+        if engine_name == OpenAITranscriptionEngine.name:
+            # 檢查OpenAI API Key
+            self.openai_api_key = os.environ.get("OPENAI_API_KEY")
+            if not self.openai_api_key:
+                raise ValueError("請設置 OPENAI_API_KEY 環境變量")
+            self.engine = OpenAITranscriptionEngine(api_key=self.openai_api_key)
+        elif engine_name == LocalWhisperEngine.name:
+            self.engine = LocalWhisperEngine()
+        else:
+            raise ValueError(f"未知的轉錄引擎: {engine_name}（可選 openai 或 local）")
+        print(f"🎙️ 轉錄引擎: {self.engine.name}")
         
         # 設置數據庫路徑
         self.db_path = "backend/test.db"
@@ -60,6 +160,7 @@ class UnifiedPodcastProcessor:
         # 確保基本輸出目錄存在
         self.audio_dir = Path("downloads/audio")
         self.transcripts_base_dir = Path("downloads/transcripts")
+        self.blob_store = LocalBlobStore(str(BLOB_DIR))
         
         # 創建基本目錄
         for directory in [self.audio_dir, self.transcripts_base_dir]:
@@ -401,7 +502,7 @@ class UnifiedPodcastProcessor:
             
             # 保存轉錄
             print(f"\n💾 步驟3: 保存轉錄文件")
-            transcript_filepath = self.save_transcript(
+            transcript_key = self.save_transcript(
                 transcript, episode, podcast['name'], 
                 transcript_time, file_size, directories
             )
@@ -409,7 +510,8 @@ class UnifiedPodcastProcessor:
             # 完成
             total_time = time.time() - directories['start_time']
             print(f"\n🎉 處理完成!")
-            print(f"📁 轉錄文件: {transcript_filepath}")
+            print(f"🔑 轉錄 key: {transcript_key}")
+            print(f"📖 查看: python3 {os.path.basename(__file__)} --show-transcript {transcript_key}")
             print(f"⏱️ 總耗時: {total_time:.1f} 秒")
             
         except Exception as e:
@@ -424,7 +526,7 @@ class UnifiedPodcastProcessor:
                 pass
     
     def create_podcast_directories(self, episode, podcast_name):
-        """創建podcast專屬目錄結構"""
+        """決定episode的目錄名稱（日期_Podcast名稱），用於轉錄索引"""
         # 解析發布日期
         publish_date_str = self.parse_podcast_publish_date(
             episode.get('publish_date', ''), 
@@ -437,20 +539,8 @@ class UnifiedPodcastProcessor:
         dir_name = f"{publish_date_str}_{podcast_name.replace(' ', '_')}"
         print(f"  📂 目錄名稱: {dir_name}")
         
-        # 創建目錄結構
-        transcript_dir = self.transcripts_base_dir / podcast_name / dir_name
-        
-        # 創建語言子目錄
-        transcript_english_dir = transcript_dir / 'english'
-        
-        # 創建所有目錄
-        transcript_english_dir.mkdir(parents=True, exist_ok=True)
-        
-        print(f"  📂 目錄結構: {podcast_name}/{dir_name}/english")
-        
         return {
-            'transcript_dir': transcript_dir,
-            'transcript_english_dir': transcript_english_dir,
+            'episode_dir': f"{podcast_name}/{dir_name}",
             'start_time': time.time()
         }
     
@@ -508,10 +598,10 @@ class UnifiedPodcastProcessor:
         
         print(f"🎤 開始轉錄音頻...")
         
-        # Whisper API 限制 25MB
+        # Whisper API 限制 25MB，本機引擎沒有上限
         MAX_FILE_SIZE_MB = 24  # 留點餘地
         
-        if file_size_mb > MAX_FILE_SIZE_MB:
+        if self.engine.max_upload_bytes and file_size_mb > MAX_FILE_SIZE_MB:
             print(f"  📏 文件大小: {file_size_mb:.1f}MB，超過限制，開始切割處理...")
             
             if AUDIO_SPLITTING_AVAILABLE:
@@ -525,15 +615,9 @@ class UnifiedPodcastProcessor:
         else:
             # 直接轉錄
             try:
-                with open(audio_filepath, 'rb') as audio_file:
-                    transcript = self.openai_client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        language="en"
-                    )
+                text = self.engine.transcribe_text(audio_filepath)
                 
                 transcribe_time = time.time() - start_time
-                text = transcript.text
                 
                 print(f"  ✅ 轉錄完成!")
                 print(f"  ⏱️ 轉錄耗時: {transcribe_time:.1f} 秒")
@@ -579,14 +663,9 @@ class UnifiedPodcastProcessor:
             for i, chunk_path in enumerate(chunks):
                 print(f"  🎤 轉錄片段 {i+1}/{len(chunks)}...")
                 try:
-                    with open(chunk_path, 'rb') as audio_file:
-                        transcript = self.openai_client.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=audio_file,
-                            language="en"
-                        )
-                    all_transcripts.append(transcript.text)
-                    print(f"    ✅ 片段{i+1}完成: {len(transcript.text):,}字符")
+                    text = self.engine.transcribe_text(chunk_path)
+                    all_transcripts.append(text)
+                    print(f"    ✅ 片段{i+1}完成: {len(text):,}字符")
                 except Exception as e:
                     print(f"    ❌ 片段{i+1}轉錄失敗: {e}")
                     all_transcripts.append("")
@@ -649,14 +728,9 @@ class UnifiedPodcastProcessor:
         for i, chunk_path in enumerate(chunks):
             print(f"  🎤 轉錄片段 {i+1}/{len(chunks)}...")
             try:
-                with open(chunk_path, 'rb') as audio_file:
-                    transcript = self.openai_client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        language="en"
-                    )
-                all_transcripts.append(transcript.text)
-                print(f"    ✅ 片段{i+1}完成: {len(transcript.text):,}字符, {len(transcript.text.split()):,}單詞")
+                text = self.engine.transcribe_text(chunk_path)
+                all_transcripts.append(text)
+                print(f"    ✅ 片段{i+1}完成: {len(text):,}字符, {len(text.split()):,}單詞")
             except Exception as e:
                 print(f"    ❌ 片段{i+1}轉錄失敗: {e}")
                 all_transcripts.append("")
@@ -680,35 +754,29 @@ class UnifiedPodcastProcessor:
         return full_transcript, transcribe_time
     
     def save_transcript(self, transcript, episode, podcast_name, transcript_time, file_size, directories):
-        """保存轉錄文件到podcast專屬目錄"""
-        safe_title = self.sanitize_filename(episode['title'])
-        timestamp = datetime.now().strftime('%H%M')
-        
-        filename = f"{safe_title}_{timestamp}_transcript.txt"
-        filepath = directories['transcript_english_dir'] / filename
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(f"# {podcast_name} 播客轉錄文字稿\n")
-            f.write(f"集數標題: {episode['title']}\n")
-            f.write(f"發布日期: {episode['publish_date']}\n")
-            f.write(f"音頻URL: {episode['audio_url']}\n")
-            f.write(f"轉錄時間: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"轉錄耗時: {transcript_time:.1f} 秒\n")
-            f.write(f"文件大小: {file_size / (1024*1024):.1f} MB\n")
-            f.write(f"字符數: {len(transcript):,}\n")
-            f.write(f"單詞數: {len(transcript.split()):,}\n")
-            f.write(f"使用模型: whisper-1\n")
-            f.write("\n" + "="*50 + "\n")
-            f.write("轉錄內容:\n")
-            f.write("="*50 + "\n\n")
-            f.write(transcript)
+        """保存轉錄到blob存儲，並在轉錄索引中記錄元數據；返回轉錄key"""
+        transcript_key = self.blob_store.put_text(transcript)
+        
+        entry = {
+            'podcast': podcast_name,
+            'episode_dir': directories['episode_dir'],
+            'title': episode['title'],
+            'publish_date': str(episode['publish_date']),
+            'audio_url': episode['audio_url'],
+            'transcribed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'transcribe_seconds': round(transcript_time, 1),
+            'file_size_mb': round(file_size / (1024*1024), 1),
+            'chars': len(transcript),
+            'words': len(transcript.split()),
+            'engine': self.engine.name,
+            'model': self.engine.model_name,
+            'transcript_key': transcript_key,
+        }
+        with open(TRANSCRIPT_INDEX, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
         
-        try:
-            relative_path = filepath.relative_to(Path.cwd())
-            print(f"  📄 英文轉錄文件已保存: {relative_path}")
-        except ValueError:
-            print(f"  📄 英文轉錄文件已保存: {filepath}")
-        return filepath
+        print(f"  📄 英文轉錄已保存: {directories['episode_dir']} ({transcript_key[:12]})")
+        return transcript_key
     
     def process_podcast_episode(self, podcast_name=None, episode_index=0):
         """處理指定podcast的指定集數"""
@@ -809,6 +877,40 @@ def parse_episode_indices(episodes_str):
     return sorted(list(set(indices)))  # 去重並排序
 
 
+def list_transcripts(podcast_name=None):
+    """列出轉錄索引中的轉錄"""
+    if not TRANSCRIPT_INDEX.exists():
+        print("📭 還沒有轉錄")
+        return
+    
+    with open(TRANSCRIPT_INDEX, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    
+    if podcast_name:
+        entries = [e for e in entries if podcast_name.lower() in e['podcast'].lower()]
+    
+    for entry in entries:
+        print(f"  🔑 {entry['transcript_key'][:12]}  {entry['episode_dir']}")
+        print(f"     📝 {entry['title']} ({entry['words']:,} 單詞)")
+
+
+def show_transcript(key_prefix):
+    """按key（或唯一的key前綴）輸出轉錄文字"""
+    keys = set()
+    if TRANSCRIPT_INDEX.exists():
+        with open(TRANSCRIPT_INDEX, encoding='utf-8') as f:
+            keys = {json.loads(line)['transcript_key'] for line in f if line.strip()}
+    matches = [key for key in keys if key.startswith(key_prefix)] or [key_prefix]
+    if len(matches) > 1:
+        print(f"❌ key前綴 {key_prefix} 不唯一，請提供更長的前綴")
+        return
+    
+    try:
+        print(LocalBlobStore(str(BLOB_DIR)).get_text(matches[0]))
+    except BlobNotFound:
+        print(f"❌ 找不到轉錄: {key_prefix}")
+
+
 def main():
     """主函數"""
     parser = argparse.ArgumentParser(description='統一的Podcast處理腳本 - 增強轉錄版本')
@@ -820,11 +922,22 @@ def main():
     parser.add_argument('--date-range', type=str, help='處理日期範圍內的episodes，格式: YYYY-MM-DD:YYYY-MM-DD')
     parser.add_argument('--start-date', type=str, help='開始日期 (YYYY-MM-DD)')
     parser.add_argument('--end-date', type=str, help='結束日期 (YYYY-MM-DD)')
+    parser.add_argument('--list-transcripts', action='store_true', help='列出已保存的轉錄（可配合 --podcast）')
+    parser.add_argument('--show-transcript', type=str, metavar='KEY', help='按key（或前綴）輸出轉錄文字')
+    parser.add_argument('--engine', choices=['openai', 'local'], help='轉錄引擎 (默認: TRANSCRIPTION_ENGINE 或 openai)')
     
     args = parser.parse_args()
     
+    # 查看轉錄不需要 OpenAI API Key
+    if args.list_transcripts:
+        list_transcripts(args.podcast)
+        return
+    if args.show_transcript:
+        show_transcript(args.show_transcript)
+        return
+    
     try:
-        processor = UnifiedPodcastProcessor()
+        processor = UnifiedPodcastProcessor(args.engine)
         
         if args.list:
             print("📋 數據庫中的podcast:")